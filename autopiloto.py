@@ -0,0 +1,180 @@
+# autopiloto.py
+"""Piloto automático y autojuego sin pantalla para pruebas de resistencia.
+
+Autopilot decide cada tick con trayectoria.LookaheadOracle y maneja el
+dinosaurio con handle_duck/handle_jump, como lo haría el teclado. soak()
+lo pone a jugar partida tras partida a toda velocidad durante millones de
+frames, opcionalmente empezando cada partida en un puntaje alto
+(warp) para probar el motor a velocidades de final de partida: la
+velocidad sube 0.5 cada 10 puntos sin límite. interfaz.main(ai=True) (--ai)
+usa el mismo piloto con pantalla.
+"""
+import argparse
+import multiprocessing
+import time
+from collections import Counter
+
+from eventos import EventCounter
+from generador import SpawnSchedule
+from logica import GameEngine, ACTION_DUCK, ACTION_JUMP
+from repeticion import ACTION_INPUTS
+from simulador import summarize
+from trayectoria import JumpTrajectory, LookaheadOracle
+
+
+class Autopilot:
+    """Controlador integrado: elige la acción de cada tick a partir de los obstáculos."""
+
+    def __init__(self):
+        self.oracles = {} # Por física del dinosaurio (x, suelo, fuerza de salto, gravedad)
+
+    def decide(self, game):
+        """Acción discreta (ACTION_*) para el tick siguiente."""
+        dino = game.dino
+        key = (dino.x, dino.ground, dino.jump_force, dino.gravity)
+        oracle = self.oracles.get(key)
+        if oracle is None:
+            oracle = self.oracles[key] = LookaheadOracle(JumpTrajectory.from_dino(dino))
+        return oracle.action(game)
+
+    def inputs(self, game):
+        """La decisión como bits de entrada de repeticion (para grabarla o reproducirla)."""
+        return ACTION_INPUTS[self.decide(game)]
+
+    def control(self, game):
+        """Aplica la decisión al motor igual que el teclado y la devuelve."""
+        action = self.decide(game)
+        game.handle_duck(action == ACTION_DUCK)
+        if action == ACTION_JUMP:
+            game.handle_jump()
+        return action
+
+
+def warp(game, score):
+    """Lleva una partida recién empezada a score con la velocidad que tendría al llegar jugando."""
+    steps = score // game.speed_increase_interval
+    game.score = score
+    game.speed += steps * game.speed_increase
+    game.ground.speed = game.speed
+    game.next_speed_increase_score = (steps + 1) * game.speed_increase_interval
+    if game.spawn_schedule is not None:
+        # El programa predice la velocidad: se vuelve a generar desde aquí
+        game.spawn_interval = game.spawn_schedule.start(game)
+
+
+def soak(frames, seed=0, start_score=0, max_run_frames=None, fair_spawns=False,
+         engine_class=GameEngine, count_events=False):
+    """Juega partidas seguidas con el piloto durante frames ticks y devuelve las estadísticas.
+
+    Al morir (o tras max_run_frames ticks, 'timeout') la partida se reinicia
+    con restart(), que deriva la semilla siguiente de la anterior. Con
+    count_events cuenta además los eventos del motor (ver eventos.py).
+    """
+    game = engine_class(data_file=None, seed=seed,
+                        spawn_schedule=SpawnSchedule() if fair_spawns else None)
+    counter = EventCounter(game.events) if count_events else None
+    autopilot = Autopilot()
+    runs = []
+    game.start_game()
+    warp(game, start_score)
+    run_frames = 0
+    max_speed = game.speed
+    start = time.perf_counter()
+    for _ in range(frames):
+        autopilot.control(game)
+        game.update()
+        run_frames += 1
+        if game.game_over or run_frames == max_run_frames:
+            runs.append({'seed': game.seed, 'score': game.score, 'frames': run_frames,
+                         'speed': game.speed,
+                         'cause': game.death_cause if game.game_over else 'timeout'})
+            max_speed = max(max_speed, game.speed)
+            game.restart()
+            warp(game, start_score)
+            run_frames = 0
+    elapsed = time.perf_counter() - start
+    max_speed = max(max_speed, game.speed)
+    if run_frames:
+        runs.append({'seed': game.seed, 'score': game.score, 'frames': run_frames,
+                     'speed': game.speed, 'cause': 'unfinished'})
+    return {'frames': frames, 'elapsed': elapsed, 'runs': runs, 'max_speed': max_speed,
+            'events': dict(counter.counts) if counter is not None else {}}
+
+
+def _soak_chunk(args):
+    return soak(*args)
+
+
+def soak_parallel(frames, workers=None, seed=0, start_score=0, max_run_frames=None,
+                  fair_spawns=False, count_events=False):
+    """soak() repartido entre procesos, cada uno con su semilla; une los resultados."""
+    workers = workers or multiprocessing.cpu_count()
+    shares = [frames // workers + (i < frames % workers) for i in range(workers)]
+    chunks = [(share, seed + i, start_score, max_run_frames, fair_spawns, GameEngine, count_events)
+              for i, share in enumerate(shares) if share]
+    start = time.perf_counter()
+    if len(chunks) == 1:
+        results = [_soak_chunk(chunks[0])]
+    else:
+        with multiprocessing.Pool(len(chunks)) as pool:
+            results = pool.map(_soak_chunk, chunks)
+    return {'frames': frames, 'elapsed': time.perf_counter() - start,
+            'runs': [run for result in results for run in result['runs']],
+            'max_speed': max(result['max_speed'] for result in results),
+            'events': dict(sum((Counter(result['events']) for result in results), Counter()))}
+
+
+def report(result):
+    """Resumen de soak(): frames por segundo, la partida más larga y las causas de muerte."""
+    runs = result['runs']
+    summary = summarize(runs)
+    longest = max(runs, key=lambda run: run['frames'], default=None)
+    return {
+        'frames': result['frames'],
+        'elapsed': result['elapsed'],
+        'frames_per_second': result['frames'] / result['elapsed'] if result['elapsed'] else 0.0,
+        'runs': summary['episodes'],
+        'mean_score': summary['mean_score'],
+        'max_score': summary['max_score'],
+        'mean_frames': summary['mean_frames'],
+        'max_speed': result['max_speed'],
+        'longest': longest,
+        'causes': summary['causes'],
+        'events': result.get('events', {})
+    }
+
+
+def print_report(stats):
+    print(f"{stats['frames']:,} frames en {stats['elapsed']:.1f} s "
+          f"({stats['frames_per_second']:,.0f} frames/s), {stats['runs']} partidas")
+    longest = stats['longest']
+    if longest:
+        print(f"Partida más larga: {longest['frames']:,} frames, puntaje {longest['score']}, "
+              f"velocidad {longest['speed']}, semilla {longest['seed']} ({longest['cause']})")
+    print(f"Puntaje medio {stats['mean_score']:.1f}, máximo {stats['max_score']}, "
+          f"velocidad máxima {stats['max_speed']}")
+    total = sum(stats['causes'].values())
+    for cause, count in sorted(stats['causes'].items(), key=lambda item: -item[1]):
+        print(f"  {cause}: {count} ({count / total:.0%})")
+    if stats['events']:
+        print("Eventos: " + ", ".join(f"{name} {count:,}"
+                                      for name, count in sorted(stats['events'].items())))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autojuego sin pantalla con el piloto automático. "
+                                                 "Con pantalla: interfaz.py --ai")
+    parser.add_argument('--frames', type=int, default=1000000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start-score', type=int, default=0,
+                        help="puntaje (y velocidad) con que empieza cada partida")
+    parser.add_argument('--max-run-frames', type=int, default=None,
+                        help="reinicia una partida que dure más que esto")
+    parser.add_argument('--fair-spawns', action='store_true',
+                        help="obstáculos precalculados y comprobados (generador.SpawnSchedule)")
+    parser.add_argument('--events', action='store_true',
+                        help="cuenta los eventos del motor (saltos, puntos, power-ups...)")
+    args = parser.parse_args()
+    print_report(report(soak_parallel(args.frames, args.workers, args.seed, args.start_score,
+                                      args.max_run_frames, args.fair_spawns, args.events)))
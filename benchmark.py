@@ -0,0 +1,404 @@
+# benchmark.py
+"""Mediciones de rendimiento del motor y del renderizado sin ventana (driver de vídeo dummy).
+
+Además de comparar los renderizadores, la suite de escenarios mide ticks por
+segundo de GameEngine.update, ms por frame de render y memoria asignada por
+tick con semillas y entradas fijas, guarda los resultados en JSON y los
+compara con una línea base guardada.
+"""
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+import interfaz
+from carrera import RaceEngine, PolicyGhost
+from logica import GameEngine, ACTION_JUMP
+from pantalla import ScaledDisplay
+from simulador import jump_when_close_policy
+
+
+def _screen():
+    """Pantalla (dummy) de interfaz, creada la primera vez que se necesita."""
+    return interfaz.screen or interfaz.init()
+
+
+DRAW_FUNCTIONS = ('rect', 'ellipse', 'polygon', 'circle', 'line')
+
+
+class CountingSurface(pygame.Surface):
+    """Superficie que cuenta sus llamadas a blit, blits y fill."""
+
+    def __init__(self, size):
+        super().__init__(size)
+        self.calls = 0
+
+    def blit(self, *args, **kwargs):
+        self.calls += 1
+        return super().blit(*args, **kwargs)
+
+    def blits(self, *args, **kwargs):
+        self.calls += 1
+        return super().blits(*args, **kwargs)
+
+    def fill(self, *args, **kwargs):
+        self.calls += 1
+        return super().fill(*args, **kwargs)
+
+
+def play(frames, seed=0, start_time_of_day=0, paused=False, ghosts=0):
+    """Juega frames ticks con una política fija y produce el estado de cada uno.
+
+    Con ghosts, la partida es una carrera con esa cantidad de fantasmas que
+    juegan con la misma política (y siguen vivos mientras viva el jugador).
+    """
+    if ghosts:
+        game = RaceEngine(interfaz.WIDTH, interfaz.HEIGHT, data_file=None, seed=seed)
+        for _ in range(ghosts):
+            game.add_ghost(PolicyGhost(jump_when_close_policy))
+    else:
+        game = GameEngine(interfaz.WIDTH, interfaz.HEIGHT, data_file=None, seed=seed)
+    game.start_game()
+    game.time_of_day = start_time_of_day
+    if paused:
+        game.update()
+        game.toggle_pause()
+    for _ in range(frames):
+        game.apply_action(jump_when_close_policy(game))
+        game.update()
+        if game.game_over:
+            game.restart()
+        yield game.get_game_state()
+
+
+# Escenarios de la suite. La política decide la entrada de cada tick a partir
+# del estado, así que con la misma semilla la traza de entradas es siempre la
+# misma. setup se aplica al empezar y tras cada reinicio; each_tick antes de
+# cada update.
+
+def always_jump_policy(game):
+    """Salta en cuanto toca el suelo: diez partículas por aterrizaje."""
+    return ACTION_JUMP
+
+
+HOP_FORCE = -4 # Salto de unos 11 ticks en lugar de 38
+
+
+def _setup_hops(game):
+    """Saltos cortos con el power-up: aterriza cada pocos ticks y los cactus no lo paran.
+
+    Con saltos normales hay menos partículas que corriendo (un aterrizaje
+    cada 38 ticks frente a una partícula cada 4).
+    """
+    game.dino.jump_force = HOP_FORCE
+    game.dino.activate_powerup()
+
+
+def _keep_powerup(game):
+    if game.dino.powerup_timer <= 1:
+        game.dino.activate_powerup()
+
+
+def _setup_night(game):
+    game.time_of_day = int(game.cycle_duration * 0.56) # Recién anochecido
+
+
+def _keep_night(game):
+    if game.time_of_day >= game.cycle_duration * 0.94: # Antes del amanecer
+        _setup_night(game)
+
+
+def _setup_late_game(game):
+    game.score = 300
+    game.speed = 8 + 0.5 * 30 # La velocidad tras 300 puntos
+    game.ground.speed = game.speed
+    game.next_speed_increase_score = game.score + game.speed_increase_interval
+
+
+def _inject_bird_groups(game):
+    """Repite la rama del 15% de _spawn_obstacles (grupo de 3 pájaros) cada 40 ticks."""
+    if game.time_of_day % 40 == 0:
+        for i in range(3):
+            game._add_obstacle(game.pools['obstacles'].acquire(
+                game.width + i * 80, 'bird', game.ground_y, speed=game.speed, rng=game.rng))
+
+
+SCENARIOS = {
+    'steady': {'policy': jump_when_close_policy},
+    'landing_bursts': {'policy': always_jump_policy, 'setup': _setup_hops, 'each_tick': _keep_powerup},
+    'bird_groups': {'policy': jump_when_close_policy, 'each_tick': _inject_bird_groups},
+    'late_game': {'policy': jump_when_close_policy, 'setup': _setup_late_game},
+    'night': {'policy': jump_when_close_policy, 'setup': _setup_night, 'each_tick': _keep_night},
+}
+
+
+def run_scenario_ticks(name, ticks, seed=0, engine_class=GameEngine):
+    """Avanza un escenario ticks veces y produce el motor tras cada tick."""
+    scenario = SCENARIOS[name]
+    policy = scenario['policy']
+    setup = scenario.get('setup')
+    each_tick = scenario.get('each_tick')
+    game = engine_class(interfaz.WIDTH, interfaz.HEIGHT, data_file=None, seed=seed)
+    game.start_game()
+    if setup:
+        setup(game)
+    for _ in range(ticks):
+        if each_tick:
+            each_tick(game)
+        game.apply_action(policy(game))
+        game.update()
+        if game.game_over:
+            game.restart()
+            if setup:
+                setup(game)
+        yield game
+
+
+def measure_scenario(name, ticks=3000, seed=0, renderer_class=interfaz.GameRenderer, repeats=5):
+    """Ticks/s del motor, ms/frame de render y bytes asignados por tick en un escenario.
+
+    Son tres pasadas por la misma partida. La primera cronometra solo la
+    lógica (incluida la política) y se queda con la mejor de repeats
+    repeticiones para reducir el ruido. La segunda renderiza cada estado. La
+    tercera usa tracemalloc para medir el pico de memoria asignada durante
+    cada tick por encima de la que ya estaba en uso: es la memoria temporal
+    que crea un tick, no el total acumulado.
+    """
+    engine_seconds = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in run_scenario_ticks(name, ticks, seed):
+            pass
+        engine_seconds = min(engine_seconds, time.perf_counter() - start)
+
+    renderer = renderer_class(_screen())
+    render_seconds = 0.0
+    entities = 0
+    particles = 0
+    for game in run_scenario_ticks(name, ticks, seed):
+        state = game.get_game_state()
+        particles += len(state.particles)
+        entities += len(state.obstacles) + len(state.particles) + len(state.clouds)
+        start = time.perf_counter()
+        renderer.render(state)
+        render_seconds += time.perf_counter() - start
+
+    allocated = 0
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in run_scenario_ticks(name, ticks, seed):
+            current, peak = tracemalloc.get_traced_memory()
+            allocated += max(peak - baseline, 0)
+            tracemalloc.reset_peak()
+            baseline = current
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'ticks': ticks,
+        'ticks_per_second': ticks / engine_seconds,
+        'ms_per_frame': render_seconds / ticks * 1000,
+        'alloc_bytes_per_tick': allocated / ticks,
+        'mean_entities': entities / ticks,
+        'mean_particles': particles / ticks
+    }
+
+
+def run_suite(ticks=3000, seed=0, renderer_class=interfaz.GameRenderer, scenarios=None):
+    """Mide todos los escenarios y devuelve un diccionario listo para guardar en JSON."""
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'renderer': renderer_class.__name__,
+            'ticks': ticks,
+            'seed': seed
+        },
+        'scenarios': {name: measure_scenario(name, ticks, seed, renderer_class)
+                      for name in (scenarios or SCENARIOS)}
+    }
+
+
+# Métrica -> True si cuanto más alta mejor
+METRICS = {'ticks_per_second': True, 'ms_per_frame': False, 'alloc_bytes_per_tick': False}
+
+
+def compare_results(results, baseline, threshold=0.15):
+    """Lista de regresiones de results frente a baseline que superan threshold (fracción)."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            if metric not in previous or not previous[metric]:
+                continue
+            change = (current[metric] - previous[metric]) / previous[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f"{name}.{metric}: {previous[metric]:.4g} -> {current[metric]:.4g} "
+                                   f"({change:+.0%})")
+    return regressions
+
+
+def count_draw_calls(renderer_class, frames=600, seed=0, start_time_of_day=0, paused=False, ghosts=0):
+    """Llamadas de dibujo por frame: pygame.draw.* y blit/blits/fill sobre la pantalla.
+
+    El renderer se crea antes de empezar a contar, así que el prerenderizado
+    de cachés y atlas no entra en la cifra.
+    """
+    renderer = renderer_class(CountingSurface((interfaz.WIDTH, interfaz.HEIGHT)))
+    counts = dict.fromkeys(DRAW_FUNCTIONS, 0)
+    originals = {name: getattr(pygame.draw, name) for name in DRAW_FUNCTIONS}
+
+    def counting(name):
+        def draw(*args, **kwargs):
+            counts[name] += 1
+            return originals[name](*args, **kwargs)
+        return draw
+
+    for name in DRAW_FUNCTIONS:
+        setattr(pygame.draw, name, counting(name))
+    try:
+        for state in play(frames, seed, start_time_of_day, paused, ghosts):
+            renderer.render(state)
+    finally:
+        for name, function in originals.items():
+            setattr(pygame.draw, name, function)
+    return {
+        'renderer': renderer_class.__name__,
+        'draw_calls': sum(counts.values()) / frames,
+        'blit_calls': renderer.screen.calls / frames
+    }
+
+
+def time_renderer(renderer_class, frames=600, seed=0, start_time_of_day=0, paused=False, ghosts=0):
+    """Juega frames ticks con una política fija y mide el tiempo de render por frame."""
+    renderer = renderer_class(_screen())
+    samples = []
+    pixels = 0
+    for state in play(frames, seed, start_time_of_day, paused, ghosts):
+        start = time.perf_counter()
+        renderer.render(state)
+        samples.append(time.perf_counter() - start)
+        pixels += renderer.pixels_presented
+    samples.sort()
+    return {
+        'renderer': renderer_class.__name__,
+        'frames': frames,
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p95_ms': samples[int(len(samples) * 0.95)] * 1000,
+        # Con el driver dummy presentar es casi gratis; esta cifra indica cuánto
+        # se ahorra al copiar a una pantalla real
+        'pixels_per_frame': pixels / frames
+    }
+
+
+def time_scaled(renderer_class, display_size, frames=600, seed=0, smooth=False, integer=False):
+    """ms por frame dibujando a la resolución lógica y escalando a display_size al presentar.
+
+    La ventana es una superficie aparte del tamaño pedido, así que se mide el
+    escalado real aunque el driver dummy no muestre nada.
+    """
+    _screen()
+    display = ScaledDisplay(pygame.Surface(display_size), (interfaz.WIDTH, interfaz.HEIGHT), smooth, integer)
+    renderer = renderer_class(display.surface, display)
+    samples = []
+    pixels = 0
+    for state in play(frames, seed):
+        start = time.perf_counter()
+        renderer.render(state)
+        samples.append(time.perf_counter() - start)
+        pixels += display.pixels_presented
+    samples.sort()
+    return {
+        'renderer': renderer_class.__name__,
+        'display': f"{display_size[0]}x{display_size[1]}",
+        'scale': display.scale,
+        'smooth': smooth,
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p95_ms': samples[int(len(samples) * 0.95)] * 1000,
+        'pixels_per_frame': pixels / frames
+    }
+
+
+DISPLAY_SIZES = ((1920, 1080), (3840, 2160))
+
+
+def compare_scaling(frames=600, seed=0):
+    """Cada renderizador a 1080p y 4K: factor ajustado (nítido y suavizado) y factor entero."""
+    results = []
+    for display_size in DISPLAY_SIZES:
+        for smooth, integer in ((False, False), (True, False), (False, True)):
+            for renderer_class in interfaz.RENDERERS.values():
+                results.append(time_scaled(renderer_class, display_size, frames, seed, smooth, integer))
+    return results
+
+
+def compare_renderers(frames=600, seed=0, ghosts=0):
+    """Compara los renderizadores de interfaz.RENDERERS de día, de noche y en pausa."""
+    results = []
+    for label, time_of_day, paused in (('day', 0, False), ('night', 3000, False), ('pause', 0, True)):
+        for renderer_class in interfaz.RENDERERS.values():
+            result = time_renderer(renderer_class, frames, seed, time_of_day, paused, ghosts)
+            result.update(count_draw_calls(renderer_class, frames, seed, time_of_day, paused, ghosts))
+            result['phase'] = label
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara el tiempo por frame de los renderizadores "
+                                                 "o, con --suite, mide los escenarios del motor.")
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--suite', action='store_true', help="ejecuta la suite de escenarios")
+    parser.add_argument('--ticks', type=int, default=3000, help="ticks por escenario de la suite")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--renderer', choices=sorted(interfaz.RENDERERS), default='basic')
+    parser.add_argument('--output', metavar='PATH', help="guarda los resultados de la suite en JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="JSON de referencia con el que comparar")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="empeoramiento relativo tolerado antes de fallar")
+    parser.add_argument('--ghosts', type=int, default=0,
+                        help="compara los renderizadores en una carrera con tantos fantasmas")
+    parser.add_argument('--scaling', action='store_true',
+                        help="mide los renderizadores escalados a 1080p y 4K (ver pantalla.py)")
+    args = parser.parse_args()
+    if args.scaling:
+        for result in compare_scaling(args.frames, args.seed):
+            mode = 'suavizado' if result['smooth'] else 'nítido'
+            print(f"{result['display']:9} x{result['scale']:.2f} {mode:9} {result['renderer']:20} "
+                  f"{result['mean_ms']:.3f} ms/frame (p95 {result['p95_ms']:.3f} ms), "
+                  f"{result['pixels_per_frame']:,.0f} px escalados")
+        pygame.quit()
+        raise SystemExit(0)
+    if args.suite:
+        results = run_suite(args.ticks, args.seed, interfaz.RENDERERS[args.renderer])
+        for name, result in results['scenarios'].items():
+            print(f"{name:15} {result['ticks_per_second']:9,.0f} ticks/s {result['ms_per_frame']:7.3f} ms/frame "
+                  f"{result['alloc_bytes_per_tick']:8,.0f} B/tick {result['mean_entities']:6.1f} entidades "
+                  f"({result['mean_particles']:.1f} partículas)")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+        pygame.quit()
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare_results(results, json.load(f), args.threshold)
+            if regressions:
+                raise SystemExit("Regresiones:\n  " + "\n  ".join(regressions))
+            print("Sin regresiones")
+        raise SystemExit(0)
+    for result in compare_renderers(args.frames, args.seed, args.ghosts):
+        print(f"{result['phase']:5} {result['renderer']:20} {result['mean_ms']:.3f} ms/frame "
+              f"(p95 {result['p95_ms']:.3f} ms), {result['draw_calls']:.1f} draw + "
+              f"{result['blit_calls']:.1f} blit/fill por frame, "
+              f"{result['pixels_per_frame']:,.0f} px presentados")
+    pygame.quit()
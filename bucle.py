@@ -0,0 +1,146 @@
+# bucle.py
+"""Bucle de paso fijo: la lógica avanza a ritmo constante y se dibuja a cualquier ritmo.
+
+Toda la física del motor está expresada por tick (gravedad 0.8, velocidad en
+píxeles por tick), así que la lógica debe correr siempre a la misma
+frecuencia. FixedTimestepLoop acumula el tiempo real transcurrido y dice
+cuántos ticks tocan en cada frame: si el dibujo se atrasa se recuperan ticks
+hasta un máximo (más allá se descartan y el juego va más lento en lugar de
+congelarse), y si el dibujo va más rápido que la lógica hay frames sin
+ticks. Interpolator dibuja esos frames intermedios mezclando las posiciones
+del tick anterior y del actual.
+"""
+import time
+
+from logica import GameStateView
+
+DEFAULT_TICK_RATE = 60
+DEFAULT_MAX_TICKS_PER_FRAME = 5
+
+
+class FixedTimestepLoop:
+    """Acumulador de tiempo para correr la lógica a tick_rate ticks por segundo.
+
+    Con uncapped=True cada frame ejecuta exactamente un tick sin mirar el
+    reloj, para medir cuánto dan de sí la lógica y el dibujo.
+    """
+
+    def __init__(self, tick_rate=DEFAULT_TICK_RATE, max_ticks_per_frame=DEFAULT_MAX_TICKS_PER_FRAME,
+                 uncapped=False, clock=time.perf_counter):
+        self.tick_rate = tick_rate
+        self.dt = 1.0 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.uncapped = uncapped
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.start_time = self.last_time = self.clock()
+        self.accumulator = 0.0
+        self.alpha = 0.0 # Fracción de tick transcurrida desde el último, para interpolar
+        self.ticks = 0
+        self.frames = 0
+        self.dropped_ticks = 0
+
+    def advance(self):
+        """Cuántos ticks de lógica hay que ejecutar antes de dibujar este frame."""
+        now = self.clock()
+        elapsed = now - self.last_time
+        self.last_time = now
+        self.frames += 1
+        if self.uncapped:
+            self.ticks += 1
+            self.alpha = 1.0
+            return 1
+
+        self.accumulator += elapsed
+        ticks = int(self.accumulator / self.dt)
+        self.accumulator -= ticks * self.dt
+        if ticks > self.max_ticks_per_frame:
+            # Demasiado atraso: se descarta en lugar de intentar ponerse al día
+            self.dropped_ticks += ticks - self.max_ticks_per_frame
+            ticks = self.max_ticks_per_frame
+        self.ticks += ticks
+        self.alpha = self.accumulator / self.dt
+        return ticks
+
+    def stats(self):
+        """Ticks y frames por segundo desde el último reset."""
+        elapsed = max(self.clock() - self.start_time, 1e-9)
+        return {
+            'ticks': self.ticks,
+            'frames': self.frames,
+            'dropped_ticks': self.dropped_ticks,
+            'elapsed': elapsed,
+            'ticks_per_second': self.ticks / elapsed,
+            'frames_per_second': self.frames / elapsed
+        }
+
+
+class Interpolated:
+    """Vista de una entidad con la posición interpolada; el resto se lee de la entidad."""
+    __slots__ = ('entity', 'x', 'y')
+
+    def __init__(self, entity, x, y):
+        self.entity = entity
+        self.x = x
+        self.y = y
+
+    def __getattr__(self, name):
+        return getattr(self.entity, name)
+
+
+class Interpolator:
+    """Guarda las posiciones antes del último tick y las mezcla con las actuales."""
+    KEYS = ('obstacles', 'clouds', 'powerups', 'ghosts')
+
+    def __init__(self):
+        self.previous = {}
+        self.blended = GameStateView() # Se reutiliza en cada frame (ver state)
+
+    def capture(self, game_state):
+        """Llamar justo antes del último tick de cada frame."""
+        # Se guarda la propia entidad para comprobar que sigue siendo la misma:
+        # así un id reutilizado por una entidad nueva no se interpola
+        previous = {}
+        for entity in self._entities(GameStateView.wrap(game_state)):
+            previous[id(entity)] = (entity, entity.x, entity.y)
+        self.previous = previous
+
+    def _entities(self, game_state):
+        yield game_state.dino
+        yield game_state.ground
+        for key in self.KEYS:
+            yield from getattr(game_state, key) or ()
+
+    def _blend(self, entity, alpha, period=0):
+        entry = self.previous.get(id(entity))
+        if entry is None or entry[0] is not entity:
+            return entity # Apareció en este tick
+        _, prev_x, prev_y = entry
+        x, y = entity.x, entity.y
+        if x > prev_x:
+            # Todo avanza hacia la izquierda: un salto a la derecha es el suelo
+            # volviendo a su origen, que se repite cada period píxeles
+            if not period:
+                return entity
+            x -= period
+        return Interpolated(entity, prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha)
+
+    def state(self, game_state, alpha):
+        """Copia del estado con las posiciones interpoladas entre el tick anterior y el actual.
+
+        La copia es siempre el mismo GameStateView, válido hasta la siguiente llamada.
+        """
+        if not self.previous or alpha >= 1.0:
+            return game_state
+        game_state = GameStateView.wrap(game_state)
+        state = self.blended.copy_from(game_state)
+        state.dino = self._blend(game_state.dino, alpha)
+        ground = game_state.ground
+        state.ground = self._blend(ground, alpha, -ground.reset_point)
+        for key in self.KEYS:
+            entities = getattr(game_state, key)
+            if entities is not None: # ghosts solo en carrera.RaceEngine
+                setattr(state, key, [self._blend(entity, alpha) for entity in entities])
+        return state
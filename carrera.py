@@ -0,0 +1,312 @@
+# carrera.py
+"""Carreras de varios dinosaurios contra la misma pista de obstáculos.
+
+RaceEngine es un GameEngine con fantasmas: dinosaurios extra que corren sobre
+los mismos obstáculos, suelo y temporizadores que el jugador, cada uno con
+su controlador, su puntaje, su tick de muerte y su power-up. Los fantasmas no
+tocan el mundo: no destruyen cactus ni se llevan los power-ups, así que la
+pista es exactamente la que tendría el jugador solo. La partida termina
+cuando muere el jugador.
+
+La pista se genera con isolated_effects (ver GameEngine): las partículas no
+consumen el generador de los obstáculos, así que una repetición grabada así
+ve los mismos obstáculos aunque el jugador juegue distinto. Solo cambian si
+el jugador rompe un cactus con el power-up (no suma punto y la velocidad
+sube más tarde).
+
+Los choques de todos los fantasmas se comprueban a la vez con
+colisiones.CollisionIndex.first_hits; como todos comparten x, en la mayoría
+de los ticks ningún obstáculo pasa por su franja y la comprobación se
+descarta sin crear una sola hitbox.
+
+Un controlador es un objeto con __call__(juego) -> bits de entrada de
+repeticion y reset(). Dentro del controlador, juego.dino es el dinosaurio del
+fantasma, así que las políticas de simulador y autopiloto funcionan tal cual.
+"""
+import argparse
+import time
+from itertools import dropwhile
+
+from colisiones import CollisionIndex, rects_overlap
+from logica import GameEngine, Dino
+from repeticion import Replay, ACTION_INPUTS, INPUT_JUMP, INPUT_DUCK, INPUT_PAUSE, INPUT_START
+from simulador import POLICIES
+
+DUCK_WIDTH = 55 # Ancho del hitbox agachado (Dino.hitbox), el más ancho
+
+
+class ReplayGhost:
+    """Repite las entradas de una repetición grabada con la misma semilla."""
+
+    def __init__(self, replay):
+        self.replay = replay
+        self.reset()
+
+    def reset(self):
+        # La partida grabada empieza en el frame con INPUT_START
+        self.frames = dropwhile(lambda inputs: not inputs & INPUT_START, self.replay.frames())
+        self.paused = False
+
+    def __call__(self, game):
+        # Los frames en pausa no fueron ticks de la partida grabada
+        for inputs in self.frames:
+            if inputs & INPUT_PAUSE:
+                self.paused = not self.paused
+            if not self.paused:
+                return inputs
+        return 0
+
+
+class PolicyGhost:
+    """Juega con una política de acciones discretas (simulador.POLICIES, autopiloto.Autopilot.decide)."""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def reset(self):
+        pass
+
+    def __call__(self, game):
+        return ACTION_INPUTS[self.policy(game)]
+
+
+class RacerView:
+    """El juego visto por un fantasma: dino es el suyo, el resto se lee del motor."""
+    __slots__ = ('game', 'dino')
+
+    def __init__(self, game, dino):
+        self.game = game
+        self.dino = dino
+
+    def __getattr__(self, name):
+        return getattr(self.game, name)
+
+
+class Racer:
+    """Un fantasma de la carrera y su resultado."""
+    __slots__ = ('name', 'controller', 'dino', 'view', 'alive', 'score', 'death_tick', 'death_cause')
+
+    def __init__(self, name, controller, game):
+        self.name = name
+        self.controller = controller
+        self.reset(game)
+
+    def reset(self, game):
+        self.dino = Dino(game.dino.x, game.ground_y)
+        self.view = RacerView(game, self.dino)
+        self.alive = True
+        self.score = 0
+        self.death_tick = None
+        self.death_cause = None
+        self.controller.reset()
+
+
+class RaceEngine(GameEngine):
+    """GameEngine con fantasmas que comparten la pista del jugador.
+
+    restart() vuelve a correr la misma pista (misma semilla), que es lo que
+    esperan los fantasmas grabados. snapshot() y fork() copian solo la
+    partida del jugador, sin los fantasmas.
+    """
+
+    def __init__(self, width=800, height=400, *, events=None, data_file="game_data.json",
+                 seed=None, spawn_schedule=None, isolated_effects=True):
+        super().__init__(width, height, events=events, data_file=data_file, seed=seed,
+                         spawn_schedule=spawn_schedule, isolated_effects=isolated_effects)
+        self.ghosts = []
+        self.alive_ghosts = []
+        self.tick = 0
+        self.death_tick = None
+        self.collision_index = CollisionIndex()
+
+    def fork(self):
+        clone = super().fork()
+        # Los fantasmas, sus vistas y el índice son de esta carrera
+        clone.ghosts = []
+        clone.alive_ghosts = []
+        clone.collision_index = CollisionIndex()
+        return clone
+
+    def add_ghost(self, controller, name=None):
+        racer = Racer(name or f"fantasma {len(self.ghosts) + 1}", controller, self)
+        self.ghosts.append(racer)
+        self.alive_ghosts.append(racer)
+        return racer
+
+    def _next_seed(self):
+        return self.seed
+
+    def restart(self):
+        super().restart()
+        self.tick = 0
+        self.death_tick = None
+        for racer in self.ghosts:
+            racer.reset(self)
+        self.alive_ghosts = list(self.ghosts)
+
+    def update(self):
+        if self.started and not self.game_over and not self.paused:
+            self.tick += 1
+        super().update()
+
+    def _update_dino(self):
+        super()._update_dino()
+        for racer in self.alive_ghosts:
+            # Las entradas se aplican antes de mover, como apply_inputs
+            inputs = racer.controller(racer.view)
+            dino = racer.dino
+            dino.duck(bool(inputs & INPUT_DUCK))
+            if inputs & INPUT_JUMP:
+                dino.jump()
+            dino.update()
+            dino.just_landed = False # Sin polvo: las partículas son del jugador
+
+    def _update_powerups(self):
+        super()._update_powerups()
+        if not self.powerups:
+            return
+        for racer in self.alive_ghosts:
+            dino = racer.dino
+            if dino.powerup_active:
+                continue
+            box = dino.hitbox()
+            if any(rects_overlap(box, pu.hitbox()) for pu in self.powerups):
+                dino.activate_powerup()
+
+    def _update_obstacles(self):
+        super()._update_obstacles()
+        if self.alive_ghosts:
+            self._collide_ghosts()
+
+    def _collide_ghosts(self):
+        """Comprueba todos los fantasmas vivos contra los obstáculos en una sola consulta."""
+        index = self.collision_index
+        index.rebuild(obs for obs in self.obstacles if not obs.destroyed)
+        left = self.dino.x
+        if not len(index.candidates(left, left + DUCK_WIDTH)):
+            return
+        alive = self.alive_ghosts
+        boxes = [racer.dino.hitbox() for racer in alive]
+        hits = index.first_hits(boxes)
+        dead = False
+        for i, hit in enumerate(hits.tolist()):
+            if hit < 0:
+                continue
+            racer = alive[i]
+            if racer.dino.powerup_active:
+                # Con el power-up solo los choques que no son cactus cuentan
+                others = [obs for obs in index.query(boxes[i]) if 'cactus' not in obs.type]
+                if not others:
+                    continue
+                cause = others[0].type
+            else:
+                cause = index.items[hit].type
+            racer.alive = False
+            racer.score = self.score
+            racer.death_tick = self.tick
+            racer.death_cause = cause
+            dead = True
+        if dead:
+            self.alive_ghosts = [racer for racer in alive if racer.alive]
+
+    def _end_game(self, cause):
+        self.death_tick = self.tick
+        super()._end_game(cause)
+
+    def results(self):
+        """Clasificación: jugador y fantasmas ordenados por puntaje y luego por tiempo vivo."""
+        entries = [{'name': 'jugador', 'score': self.score, 'death_tick': self.death_tick,
+                    'cause': self.death_cause}]
+        for racer in self.ghosts:
+            entries.append({'name': racer.name,
+                            'score': racer.score if not racer.alive else self.score,
+                            'death_tick': racer.death_tick, 'cause': racer.death_cause})
+        # Vivo (sin tick de muerte) cuenta como el que más aguantó
+        return sorted(entries, key=lambda entry: (-entry['score'],
+                                                  -(entry['death_tick'] or self.tick + 1)))
+
+    def get_game_state(self):
+        state = super().get_game_state()
+        state.ghosts = [racer.dino for racer in self.alive_ghosts]
+        return state
+
+
+def load_ghosts(paths=(), policies=()):
+    """Fantasmas (nombre, controlador) para repeticiones guardadas y políticas por nombre.
+
+    Devuelve también la primera repetición, cuya pista (semilla y
+    generador de obstáculos) hay que usar en la carrera, o None.
+    """
+    ghosts = []
+    course = None
+    for path in paths:
+        replay = Replay.load(path)
+        if not replay.isolated_effects:
+            raise ValueError(f"{path} se grabó con una pista que depende del jugador; "
+                             "hay que grabarla con isolated_effects (interfaz.py --record)")
+        course = course or replay
+        if (replay.seed, replay.spawn_schedule) != (course.seed, course.spawn_schedule):
+            raise ValueError(f"{path} es de otra pista que {paths[0]}")
+        ghosts.append((path, ReplayGhost(replay)))
+    for name in policies:
+        ghosts.append((name, PolicyGhost(POLICIES[name])))
+    return ghosts, course
+
+
+def benchmark(ghost_counts=(0, 1, 10, 100), ticks=3000, seed=0, policy='lookahead'):
+    """ms por tick del motor con distinto número de fantasmas.
+
+    El jugador y todos los fantasmas repiten las mismas entradas, grabadas
+    antes con la política: todos siguen vivos toda la medición y el coste del
+    controlador es despreciable, así que se mide solo el del motor.
+    """
+    game = GameEngine(data_file=None, seed=seed, isolated_effects=True)
+    game.start_game()
+    policy_function = POLICIES[policy]
+    inputs = []
+    while not game.game_over and len(inputs) < ticks:
+        action = policy_function(game)
+        inputs.append(ACTION_INPUTS[action])
+        game.apply_action(action)
+        game.update()
+    replay = Replay(seed, [(1, INPUT_START | inputs[0])] + [(1, bits) for bits in inputs[1:]],
+                    isolated_effects=True)
+
+    results = []
+    for count in ghost_counts:
+        game = RaceEngine(data_file=None, seed=seed)
+        for _ in range(count):
+            game.add_ghost(ReplayGhost(replay))
+        player = ReplayGhost(replay)
+        game.start_game()
+        start = time.perf_counter()
+        for _ in inputs:
+            bits = player(game)
+            if bits & INPUT_JUMP:
+                game.handle_jump()
+            game.handle_duck(bool(bits & INPUT_DUCK))
+            game.update()
+        elapsed = time.perf_counter() - start
+        results.append({'ghosts': count, 'ticks': len(inputs), 'alive': len(game.alive_ghosts),
+                        'ms_per_tick': elapsed * 1000 / len(inputs)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide el coste por tick de los fantasmas de una carrera. "
+                                                 "Para jugar: interfaz.py --ghost/--bot")
+    parser.add_argument('--ghosts', type=int, nargs='+', default=[0, 1, 10, 100])
+    parser.add_argument('--ticks', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='lookahead',
+                        help="política con que se graban las entradas de la medición")
+    args = parser.parse_args()
+    base = None
+    for result in benchmark(args.ghosts, args.ticks, args.seed, args.policy):
+        if not result['ghosts']:
+            base = result['ms_per_tick']
+        extra = ''
+        if result['ghosts'] and base is not None:
+            extra = f", {(result['ms_per_tick'] - base) * 1000 / result['ghosts']:.1f} µs por fantasma"
+        print(f"{result['ghosts']:4} fantasmas ({result['alive']} vivos al final, {result['ticks']} ticks): "
+              f"{result['ms_per_tick']:.3f} ms/tick{extra}")
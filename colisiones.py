@@ -0,0 +1,84 @@
+# colisiones.py
+"""Detección de colisiones con hitboxes en tuplas e índice ordenado por x.
+
+Las hitboxes son tuplas (x, y, ancho, alto), sin diccionarios. CollisionIndex
+mantiene los obstáculos ordenados por su borde izquierdo: como todos avanzan
+hacia la izquierda y aparecen siempre por la derecha, la lista casi nunca se
+desordena y reordenarla cuesta O(n). Una consulta solo prueba los
+obstáculos cuya franja x se solapa con la del dinosaurio.
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+def rects_overlap(a, b):
+    """Verifica colisión entre dos hitboxes (x, y, ancho, alto)."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and ax + aw > bx and ay < by + bh and ay + ah > by
+
+
+class CollisionIndex:
+    """Hitboxes de un conjunto de entidades, ordenadas por x."""
+
+    def __init__(self, entities=()):
+        self.items = []
+        self.boxes = []
+        self.xs = []
+        self.max_width = 0
+        self.rebuild(entities)
+
+    def __len__(self):
+        return len(self.items)
+
+    def rebuild(self, entities):
+        """Recalcula las hitboxes; solo reordena si la lista no está ordenada."""
+        items = list(entities)
+        boxes = [entity.hitbox() for entity in items]
+        xs = [box[0] for box in boxes]
+        if any(xs[i] > xs[i + 1] for i in range(len(xs) - 1)):
+            order = sorted(range(len(items)), key=xs.__getitem__)
+            items = [items[i] for i in order]
+            boxes = [boxes[i] for i in order]
+            xs = [xs[i] for i in order]
+        self.items = items
+        self.boxes = boxes
+        self.xs = xs
+        self.max_width = max((box[2] for box in boxes), default=0)
+
+    def candidates(self, left, right):
+        """Rango de índices cuya franja x puede solaparse con (left, right)."""
+        return range(bisect_right(self.xs, left - self.max_width), bisect_left(self.xs, right))
+
+    def query(self, box):
+        """Entidades del índice que colisionan con box."""
+        boxes = self.boxes
+        return [self.items[i] for i in self.candidates(box[0], box[0] + box[2])
+                if rects_overlap(box, boxes[i])]
+
+    def first_hits(self, boxes):
+        """Para muchas hitboxes a la vez (p. ej. varios dinosaurios), el índice
+        del primer elemento con el que colisiona cada una, o -1.
+
+        Primero se descartan por x los obstáculos que no tocan la franja de
+        ninguna hitbox; los pocos candidatos restantes se prueban contra todas
+        en una sola operación de NumPy.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        hits = np.full(len(boxes), -1, dtype=np.int64)
+        if not len(boxes) or not self.items:
+            return hits
+        left = boxes[:, 0]
+        right = left + boxes[:, 2]
+        candidates = self.candidates(left.min(), right.max())
+        if not len(candidates):
+            return hits
+        other = np.asarray(self.boxes[candidates.start:candidates.stop], dtype=np.float64)
+        overlap = ((left[:, None] < other[:, 0] + other[:, 2]) &
+                   (right[:, None] > other[:, 0]) &
+                   (boxes[:, 1, None] < other[:, 1] + other[:, 3]) &
+                   (boxes[:, 1, None] + boxes[:, 3, None] > other[:, 1]))
+        any_hit = overlap.any(axis=1)
+        hits[any_hit] = overlap[any_hit].argmax(axis=1) + candidates.start
+        return hits
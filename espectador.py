@@ -0,0 +1,654 @@
+# espectador.py
+"""Transmisión de partidas en vivo a espectadores por TCP.
+
+Cada tick, FrameEncoder convierte GameEngine.get_game_state() en un frame
+binario: posiciones en cuartos de píxel, un id corto por entidad y, en lugar
+de las listas completas, solo lo que cambió respecto al frame anterior
+(entidades que salen, que aparecen y, de las demás, los campos que cambiaron
+como diferencias). Los enteros van en varint (zigzag si pueden ser
+negativos), así que una entidad que solo avanza cuesta unos 3 bytes.
+
+Los obstáculos solo se emparejan por id cuando GameStateView avisa de que
+apareció o desapareció alguno (CHANGED_OBSTACLES); si no, son los mismos y
+en el mismo orden que en el frame anterior.
+
+El frame se codifica una sola vez y se envía igual a todos los clientes; por
+cliente solo queda el write. Un cliente que se conecta, o que se atrasa y
+tiene demasiado pendiente de enviar, recibe un keyframe (el estado completo)
+y vuelve a recibir diferencias desde ahí.
+
+En el cable cada frame va precedido de su longitud (uint32). Es TCP sin
+más: la biblioteca estándar no trae WebSocket y todos los clientes son
+Python; para un navegador bastaría un puente como websockify delante.
+
+El cliente (FrameDecoder) reconstruye un game_state con objetos que se
+actualizan en el sitio, listo para GameRenderer.render.
+
+    python espectador.py serve                 # partida del piloto automático
+    python interfaz.py --broadcast 5555        # o la que se está jugando
+    python interfaz.py --watch 5555            # espectador con ventana
+    python espectador.py bench --clients 300   # clientes locales, ancho de banda y CPU
+"""
+import argparse
+import asyncio
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+from autopiloto import Autopilot
+from logica import CHANGED_OBSTACLES, GameEngine, GameStateView, OBSTACLE_TYPES, OBSTACLE_CODES
+from repeticion import _write_varint, _read_varint
+
+DEFAULT_PORT = 5555
+LENGTH = struct.Struct('<I')
+KEYFRAME = 0
+DELTA = 1
+MAX_PENDING_BYTES = 64 * 1024 # Más pendiente de enviar: el cliente se salta frames
+BACKLOG = 1024 # Conexiones por aceptar; cientos de espectadores llegan a la vez
+
+# Cómo viaja cada campo: entero tal cual, en cuartos de píxel, booleano,
+# código de tipo, o solo lo que el renderizador mira de un temporizador
+INT, QUARTER, BOOL, OBSTACLE_TYPE, STAR_BLINK, POWERUP_BLINK = range(6)
+
+_ENCODE = {
+    INT: int,
+    QUARTER: lambda value: round(value * 4),
+    BOOL: int,
+    OBSTACLE_TYPE: OBSTACLE_CODES.__getitem__,
+    STAR_BLINK: lambda timer: int(timer < 5), # Visible (ver draw_stars)
+    POWERUP_BLINK: lambda timer: int(timer % 20 > 10) # Parpadeo (ver draw_dino)
+}
+_DECODE = {
+    INT: int,
+    QUARTER: lambda value: value / 4,
+    BOOL: bool,
+    OBSTACLE_TYPE: OBSTACLE_TYPES.__getitem__,
+    STAR_BLINK: lambda visible: 0 if visible else 5,
+    POWERUP_BLINK: lambda blink: 15 if blink else 0
+}
+
+DINO_FIELDS = (('x', QUARTER), ('y', QUARTER), ('width', INT), ('height', INT), ('jumping', BOOL),
+               ('ducking', BOOL), ('anim_frame', INT), ('powerup_active', BOOL),
+               ('powerup_timer', POWERUP_BLINK))
+# Listas de entidades del game_state, en el orden en que viajan
+CHANNELS = (
+    ('obstacles', (('x', QUARTER), ('y', QUARTER), ('width', INT), ('height', INT),
+                   ('type', OBSTACLE_TYPE), ('anim_frame', INT), ('destroyed', BOOL))),
+    ('clouds', (('x', QUARTER), ('y', QUARTER), ('width', INT), ('height', INT))),
+    ('powerups', (('x', QUARTER), ('y', QUARTER), ('width', INT), ('height', INT))),
+    ('particles', (('x', QUARTER), ('y', QUARTER), ('size', INT))),
+    ('stars', (('x', INT), ('y', INT), ('size', INT), ('blink_timer', STAR_BLINK))),
+    ('ghosts', DINO_FIELDS) # Solo en carrera.RaceEngine
+)
+# Valores sueltos: (clave del game_state, campo o None, tipo)
+SCALARS = (
+    ('score', None, INT), ('high_score', None, INT), ('started', None, BOOL),
+    ('game_over', None, BOOL), ('paused', None, BOOL), ('new_high_score_achieved', None, BOOL),
+    ('time_of_day', None, INT), ('cycle_duration', None, INT), ('width', None, INT),
+    ('height', None, INT), ('ground', 'x', QUARTER), ('ground', 'y', INT)
+) + tuple(('dino', name, kind) for name, kind in DINO_FIELDS)
+
+
+def _zigzag(value):
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value):
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_values(buf, values):
+    for value in values:
+        _write_varint(buf, _zigzag(value))
+
+
+def _write_changes(buf, values, previous):
+    """Máscara de los campos que cambiaron y sus diferencias."""
+    mask = 0
+    for i, (value, old) in enumerate(zip(values, previous)):
+        if value != old:
+            mask |= 1 << i
+    _write_varint(buf, mask)
+    for value, old in zip(values, previous):
+        if value != old:
+            _write_varint(buf, _zigzag(value - old))
+
+
+def _scalar_values(game_state):
+    values = []
+    for key, name, kind in SCALARS:
+        value = getattr(game_state, key) if name is None else getattr(getattr(game_state, key), name)
+        values.append(_ENCODE[kind](value))
+    return tuple(values)
+
+
+class _EncoderChannel:
+    """Ids y últimos valores enviados de una lista de entidades."""
+
+    def __init__(self, fields):
+        self.names = tuple(name for name, _ in fields)
+        self.encoders = tuple(_ENCODE[kind] for _, kind in fields)
+        # id(objeto) -> (id de red, objeto); guardar el objeto impide que
+        # Python reutilice su id para otro mientras se le sigue la pista
+        self.ids = {}
+        self.values = {} # id de red -> valores enviados
+        self.free_ids = [] # Se reutilizan para que los ids sigan siendo cortos
+        self.next_id = 0
+        self.order = [] # Ids de red en el orden del último encode
+
+    def encode(self, entities, buf):
+        names, encoders = self.names, self.encoders
+        ids, values = self.ids, self.values
+        seen = {}
+        added = []
+        changed = []
+        order = [] # None en el lugar de cada entidad nueva
+        for entity in entities:
+            current = tuple([encode(getattr(entity, name)) for name, encode in zip(names, encoders)])
+            entry = ids.get(id(entity))
+            if entry is None or entry[0] in seen:
+                added.append((entity, current))
+                order.append(None)
+                continue
+            net_id = entry[0]
+            seen[net_id] = entity
+            order.append(net_id)
+            previous = values[net_id]
+            if current != previous:
+                changed.append((net_id, current, previous))
+                values[net_id] = current
+
+        removed = [net_id for net_id, _ in ids.values() if net_id not in seen]
+        _write_varint(buf, len(removed))
+        for net_id in removed:
+            _write_varint(buf, net_id)
+            del values[net_id]
+            self.free_ids.append(net_id)
+        self.ids = ids = {id(entity): (net_id, entity) for net_id, entity in seen.items()}
+
+        _write_varint(buf, len(added))
+        new_ids = []
+        for entity, current in added:
+            if self.free_ids:
+                net_id = self.free_ids.pop()
+            else:
+                net_id = self.next_id
+                self.next_id += 1
+            ids[id(entity)] = (net_id, entity)
+            values[net_id] = current
+            new_ids.append(net_id)
+            _write_varint(buf, net_id)
+            _write_values(buf, current)
+        if new_ids:
+            new_ids = iter(new_ids)
+            order = [net_id if net_id is not None else next(new_ids) for net_id in order]
+        self.order = order
+        self._write_changed(buf, changed)
+
+    def encode_same(self, entities, buf):
+        """Como encode, para las mismas entidades y en el mismo orden que en el último."""
+        names, encoders, values = self.names, self.encoders, self.values
+        changed = []
+        for net_id, entity in zip(self.order, entities):
+            current = tuple([encode(getattr(entity, name)) for name, encode in zip(names, encoders)])
+            previous = values[net_id]
+            if current != previous:
+                changed.append((net_id, current, previous))
+                values[net_id] = current
+        _write_varint(buf, 0) # Ninguna sale
+        _write_varint(buf, 0) # Ninguna aparece
+        self._write_changed(buf, changed)
+
+    @staticmethod
+    def _write_changed(buf, changed):
+        _write_varint(buf, len(changed))
+        for net_id, current, previous in changed:
+            _write_varint(buf, net_id)
+            _write_changes(buf, current, previous)
+
+    def keyframe(self, buf):
+        """Todas las entidades actuales como nuevas."""
+        _write_varint(buf, 0)
+        _write_varint(buf, len(self.values))
+        for net_id, current in self.values.items():
+            _write_varint(buf, net_id)
+            _write_values(buf, current)
+        _write_varint(buf, 0)
+
+
+class FrameEncoder:
+    """Codifica game_states sucesivos como diferencias con el anterior."""
+
+    def __init__(self):
+        self.channels = [(key, _EncoderChannel(fields)) for key, fields in CHANNELS]
+        self.scalars = (0,) * len(SCALARS)
+        self.tick = 0
+        self.source = None # GameStateView del último encode
+        self.frame = 0 # Y su frame entonces (ver GameStateView.changed_since)
+
+    def encode(self, game_state):
+        """Frame de diferencias respecto al último codificado."""
+        game_state = GameStateView.wrap(game_state)
+        # El primer frame es respecto a un estado vacío: ya es un keyframe
+        buf = bytearray((DELTA if self.tick else KEYFRAME,))
+        self.tick += 1
+        _write_varint(buf, self.tick)
+        scalars = _scalar_values(game_state)
+        _write_changes(buf, scalars, self.scalars)
+        self.scalars = scalars
+        # Los obstáculos sin altas ni bajas desde el último encode son los mismos
+        same_obstacles = (game_state is self.source
+                          and not game_state.changed_since(CHANGED_OBSTACLES, self.frame))
+        self.source = game_state
+        self.frame = game_state.frame
+        for key, channel in self.channels:
+            entities = getattr(game_state, key) or ()
+            if key == 'obstacles' and same_obstacles and len(entities) == len(channel.order):
+                channel.encode_same(entities, buf)
+            else:
+                channel.encode(entities, buf)
+        return bytes(buf)
+
+    def keyframe(self):
+        """Frame con el estado completo del último encode(), para un cliente que empieza."""
+        buf = bytearray((KEYFRAME,))
+        _write_varint(buf, self.tick)
+        _write_changes(buf, self.scalars, (0,) * len(SCALARS))
+        for _, channel in self.channels:
+            channel.keyframe(buf)
+        return bytes(buf)
+
+
+class FrameDecoder:
+    """Reconstruye el game_state a partir de los frames, reutilizando los objetos."""
+
+    def __init__(self):
+        self.channels = [(key, tuple(name for name, _ in fields),
+                          tuple(_DECODE[kind] for _, kind in fields), {}) for key, fields in CHANNELS]
+        self.scalars = [0] * len(SCALARS)
+        self.values = {key: {} for key, _ in CHANNELS} # id de red -> valores recibidos
+        self.synced = False # Hasta el primer keyframe las diferencias no sirven
+        self.tick = 0
+        self.state = GameStateView()
+        self.state.dino = SimpleNamespace()
+        self.state.ground = SimpleNamespace(reset_point=-50)
+        for key, _ in CHANNELS:
+            setattr(self.state, key, [])
+
+    def decode(self, frame):
+        """Aplica un frame y devuelve el game_state, o None si aún no hay keyframe."""
+        kind = frame[0]
+        if kind == KEYFRAME:
+            self.synced = True
+            self.scalars = [0] * len(SCALARS)
+            for _, _, _, entities in self.channels:
+                entities.clear()
+            for values in self.values.values():
+                values.clear()
+        elif not self.synced:
+            return None
+        self.tick, pos = _read_varint(frame, 1)
+        pos = self._read_changes(frame, pos, self.scalars)
+        self._apply_scalars()
+        changes = 0
+        for key, names, decoders, entities in self.channels:
+            values = self.values[key]
+            count, pos = _read_varint(frame, pos)
+            membership = kind == KEYFRAME or count
+            for _ in range(count):
+                net_id, pos = _read_varint(frame, pos)
+                del entities[net_id]
+                del values[net_id]
+            count, pos = _read_varint(frame, pos)
+            membership = membership or count
+            for _ in range(count):
+                net_id, pos = _read_varint(frame, pos)
+                current = []
+                for _ in names:
+                    value, pos = _read_varint(frame, pos)
+                    current.append(_unzigzag(value))
+                values[net_id] = current
+                entities[net_id] = entity = SimpleNamespace()
+                self._apply(entity, names, decoders, current)
+            count, pos = _read_varint(frame, pos)
+            for _ in range(count):
+                net_id, pos = _read_varint(frame, pos)
+                current = values[net_id]
+                pos = self._read_changes(frame, pos, current)
+                self._apply(entities[net_id], names, decoders, current)
+            if membership: # Si no, la lista anterior tiene los mismos objetos
+                setattr(self.state, key, list(entities.values()))
+                if key == 'obstacles':
+                    changes |= CHANGED_OBSTACLES
+        self.state.advance(changes)
+        return self.state
+
+    @staticmethod
+    def _read_changes(frame, pos, values):
+        mask, pos = _read_varint(frame, pos)
+        i = 0
+        while mask:
+            if mask & 1:
+                delta, pos = _read_varint(frame, pos)
+                values[i] += _unzigzag(delta)
+            mask >>= 1
+            i += 1
+        return pos
+
+    @staticmethod
+    def _apply(entity, names, decoders, values):
+        for name, decode, value in zip(names, decoders, values):
+            setattr(entity, name, decode(value))
+
+    def _apply_scalars(self):
+        state = self.state
+        for (key, name, kind), value in zip(SCALARS, self.scalars):
+            if name is None:
+                setattr(state, key, _DECODE[kind](value))
+            else:
+                setattr(getattr(state, key), name, _DECODE[kind](value))
+
+
+class _Client:
+    __slots__ = ('writer', 'task', 'needs_keyframe', 'bytes_sent', 'frames_sent', 'frames_skipped')
+
+    def __init__(self, writer, task):
+        self.writer = writer
+        self.task = task
+        self.needs_keyframe = True
+        self.bytes_sent = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+
+
+class SpectatorServer:
+    """Servidor asyncio que envía a todos los clientes los frames de publish().
+
+    publish() se llama una vez por tick desde el bucle del juego: en el
+    mismo bucle de asyncio o, con start_in_thread(), desde otro hilo.
+    """
+
+    def __init__(self, max_pending=MAX_PENDING_BYTES):
+        self.encoder = FrameEncoder()
+        self.max_pending = max_pending
+        self.clients = []
+        self.server = None
+        self.loop = None
+        self.frames = 0
+        self.encode_seconds = 0.0
+        self.send_seconds = 0.0
+        self.bytes_sent = 0
+
+    async def start(self, host='127.0.0.1', port=DEFAULT_PORT):
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._connected, host, port, backlog=BACKLOG)
+        return self.server.sockets[0].getsockname()[1]
+
+    def start_in_thread(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Corre el servidor en un hilo propio; publish() sigue llamándose desde el juego."""
+        started = threading.Event()
+        result = {}
+
+        def run():
+            async def main():
+                result['port'] = await self.start(host, port)
+                started.set()
+                await self.server.serve_forever()
+            asyncio.run(main())
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return result['port']
+
+    async def _connected(self, reader, writer):
+        client = _Client(writer, asyncio.current_task())
+        self.clients.append(client)
+        try:
+            while await reader.read(1024): # Los espectadores no envían nada útil
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.remove(client)
+            writer.close()
+
+    def publish(self, game_state):
+        """Codifica el estado del tick y lo envía (desde cualquier hilo)."""
+        start = time.perf_counter()
+        frame = self.encoder.encode(game_state)
+        # El keyframe se codifica aquí porque lee el estado del encoder
+        keyframe = None
+        if any(client.needs_keyframe for client in self.clients):
+            keyframe = self.encoder.keyframe()
+        self.encode_seconds += time.perf_counter() - start
+        if self.loop is None or self.loop is _running_loop():
+            self._send(frame, keyframe)
+        else:
+            self.loop.call_soon_threadsafe(self._send, frame, keyframe)
+
+    def _send(self, frame, keyframe):
+        start = time.perf_counter()
+        packet = LENGTH.pack(len(frame)) + frame
+        key_packet = LENGTH.pack(len(keyframe)) + keyframe if keyframe is not None else None
+        for client in self.clients:
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > self.max_pending:
+                # Atrasado: se salta frames y luego se pone al día con un keyframe
+                client.needs_keyframe = True
+                client.frames_skipped += 1
+                continue
+            if client.needs_keyframe:
+                if key_packet is None:
+                    continue # Llega en el siguiente publish()
+                data = key_packet
+                client.needs_keyframe = False
+            else:
+                data = packet
+            client.writer.write(data)
+            client.bytes_sent += len(data)
+            client.frames_sent += 1
+            self.bytes_sent += len(data)
+        self.frames += 1
+        self.send_seconds += time.perf_counter() - start
+
+    async def close(self):
+        tasks = [client.task for client in self.clients]
+        for client in self.clients:
+            client.writer.close()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    def stats(self):
+        frames = self.frames or 1
+        return {
+            'clients': len(self.clients),
+            'frames': self.frames,
+            'bytes_sent': self.bytes_sent,
+            'encode_us_per_frame': self.encode_seconds / frames * 1e6,
+            'send_us_per_frame': self.send_seconds / frames * 1e6
+        }
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+async def receive(reader, decoder):
+    """Lee el siguiente frame del servidor; devuelve (game_state o None, bytes recibidos)."""
+    header = await reader.readexactly(LENGTH.size)
+    frame = await reader.readexactly(LENGTH.unpack(header)[0])
+    return decoder.decode(frame), LENGTH.size + len(frame)
+
+
+async def serve_autopilot(host, port, tick_rate, seed=None):
+    """Transmite una partida del piloto automático, que se reinicia al morir."""
+    server = SpectatorServer()
+    port = await server.start(host, port)
+    print(f"Transmitiendo en {host}:{port}")
+    game = GameEngine(data_file=None, seed=seed, isolated_effects=True)
+    autopilot = Autopilot()
+    game.start_game()
+    interval = 1 / tick_rate
+    next_tick = time.perf_counter()
+    while True:
+        if game.game_over:
+            game.restart()
+        autopilot.control(game)
+        game.update()
+        server.publish(game.get_game_state())
+        next_tick += interval
+        await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+
+async def _watch(host, port, on_state):
+    reader, writer = await asyncio.open_connection(host, port)
+    decoder = FrameDecoder()
+    try:
+        while True:
+            game_state, _ = await receive(reader, decoder)
+            if game_state is not None and on_state(game_state) is False:
+                return
+    except asyncio.IncompleteReadError:
+        pass # El servidor cerró la transmisión
+    finally:
+        writer.close()
+
+
+def watch(host, port, on_state):
+    """Cliente: llama a on_state(game_state) con cada frame hasta que devuelva False
+    o el servidor cierre. interfaz.spectate dibuja así la transmisión."""
+    asyncio.run(_watch(host, port, on_state))
+
+
+async def benchmark(clients=300, ticks=600, seed=0, start_score=0, tick_rate=60):
+    """Servidor y clientes en el mismo proceso por loopback.
+
+    Un cliente decodifica y se compara su estado con el del motor; los
+    demás solo cuentan bytes. El juego avanza tan rápido como los clientes
+    reciben, y el tiempo del servidor se mide dentro de publish().
+    """
+    server = SpectatorServer()
+    port = await server.start('127.0.0.1', 0)
+    received = [0] * clients
+    decoder = FrameDecoder()
+    decode_seconds = [0.0]
+
+    async def spectator(i):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        try:
+            while True:
+                header = await reader.readexactly(LENGTH.size)
+                frame = await reader.readexactly(LENGTH.unpack(header)[0])
+                received[i] += LENGTH.size + len(frame)
+                if i == 0:
+                    start = time.perf_counter()
+                    decoder.decode(frame)
+                    decode_seconds[0] += time.perf_counter() - start
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    tasks = [asyncio.create_task(spectator(i)) for i in range(clients)]
+    while len(server.clients) < clients:
+        await asyncio.sleep(0.01)
+
+    game = GameEngine(data_file=None, seed=seed, isolated_effects=True)
+    autopilot = Autopilot()
+    game.start_game()
+    game.score = start_score
+    start = time.perf_counter()
+    for _ in range(ticks):
+        autopilot.control(game)
+        game.update()
+        server.publish(game.get_game_state())
+        await asyncio.sleep(0)
+    while any(client.writer.transport.get_write_buffer_size() for client in server.clients):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+
+    mismatches = _compare(decoder.state, game.get_game_state())
+    keyframe = len(server.encoder.keyframe())
+    stats = server.stats()
+    skipped = sum(client.frames_skipped for client in server.clients)
+    await server.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    per_client = sum(received) / clients
+    return {
+        'clients': clients,
+        'ticks': ticks,
+        'elapsed': elapsed,
+        'bytes_per_frame': per_client / ticks,
+        'kbps_at_tick_rate': per_client / ticks * tick_rate * 8 / 1000,
+        'keyframe_bytes': keyframe,
+        'encode_us_per_frame': stats['encode_us_per_frame'],
+        'send_us_per_client': stats['send_us_per_frame'] / clients,
+        'decode_us_per_frame': decode_seconds[0] / ticks * 1e6,
+        'skipped_frames': skipped,
+        'mismatches': mismatches
+    }
+
+
+def _compare(decoded, game_state):
+    """Campos del estado decodificado que no coinciden con el del motor (cuantizado)."""
+    mismatches = []
+    expected = _scalar_values(game_state)
+    for (key, name, kind), value in zip(SCALARS, expected):
+        got = getattr(decoded, key) if name is None else getattr(getattr(decoded, key), name)
+        if _ENCODE[kind](got) != value:
+            mismatches.append(f"{key}.{name}" if name else key)
+    for key, fields in CHANNELS:
+        entities = getattr(game_state, key) or ()
+        copies = getattr(decoded, key)
+        if len(entities) != len(copies):
+            mismatches.append(f"{key}: {len(copies)} de {len(entities)}")
+            continue
+        for entity, copy in zip(entities, copies):
+            for name, kind in fields:
+                if _ENCODE[kind](getattr(entity, name)) != _ENCODE[kind](getattr(copy, name)):
+                    mismatches.append(f"{key}.{name}")
+    return mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transmisión de partidas a espectadores por TCP.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help="transmite una partida del piloto automático")
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--tick-rate', type=int, default=60)
+    serve_parser.add_argument('--seed', type=int, default=None)
+    bench_parser = commands.add_parser('bench', help="mide ancho de banda y CPU por cliente por loopback")
+    bench_parser.add_argument('--clients', type=int, default=300)
+    bench_parser.add_argument('--ticks', type=int, default=600)
+    bench_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve_autopilot(args.host, args.port, args.tick_rate, args.seed))
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(benchmark(args.clients, args.ticks, args.seed))
+        print(f"{result['clients']} clientes, {result['ticks']} frames en {result['elapsed']:.2f} s")
+        print(f"Por cliente: {result['bytes_per_frame']:.1f} bytes/frame "
+              f"({result['kbps_at_tick_rate']:.1f} kbit/s a 60 ticks/s); keyframe {result['keyframe_bytes']} bytes")
+        print(f"Servidor: codificar {result['encode_us_per_frame']:.1f} µs/frame (una vez), "
+              f"enviar {result['send_us_per_client']:.2f} µs/frame por cliente")
+        print(f"Cliente: decodificar {result['decode_us_per_frame']:.1f} µs/frame; "
+              f"{result['skipped_frames']} frames saltados")
+        print("Estado decodificado idéntico al del motor" if not result['mismatches']
+              else f"Diferencias: {result['mismatches'][:10]}")
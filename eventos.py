@@ -0,0 +1,84 @@
+# eventos.py
+"""Eventos de la partida para sonido, estadísticas y demás observadores.
+
+GameEngine avisa de lo que pasa (salto, aterrizaje, punto, subida de
+velocidad, power-up recogido o agotado, cactus destruido, muerte, récord)
+en su EventBus en lugar de llamar al sonido directamente. Los eventos de un
+tick se acumulan y se entregan juntos al final de GameEngine.update(), una
+llamada por suscriptor.
+
+Cada tipo de evento es un bit, como las entradas de repeticion.py. wants
+es la unión de lo que piden los suscriptores y el motor la consulta antes
+de crear el evento: sin suscriptores (simulaciones, autojuego, fork) emitir
+cuesta una comparación de bits y no se crea nada.
+"""
+from collections import Counter, namedtuple
+
+EVENT_JUMP = 1
+EVENT_LAND = 2
+EVENT_SCORE = 4 # value: el puntaje nuevo
+EVENT_SPEED_UP = 8 # value: la velocidad nueva
+EVENT_POWERUP_PICKED = 16
+EVENT_POWERUP_EXPIRED = 32
+EVENT_CACTUS_DESTROYED = 64 # value: tipo del cactus
+EVENT_DEATH = 128 # value: tipo del obstáculo del choque
+EVENT_HIGH_SCORE = 256 # value: el récord nuevo, al terminar la partida
+ALL_EVENTS = 511
+
+EVENT_NAMES = {EVENT_JUMP: 'jump', EVENT_LAND: 'land', EVENT_SCORE: 'score',
+               EVENT_SPEED_UP: 'speed_up', EVENT_POWERUP_PICKED: 'powerup_picked',
+               EVENT_POWERUP_EXPIRED: 'powerup_expired', EVENT_CACTUS_DESTROYED: 'cactus_destroyed',
+               EVENT_DEATH: 'death', EVENT_HIGH_SCORE: 'high_score'}
+
+Event = namedtuple('Event', ['kind', 'value'])
+Event.__new__.__defaults__ = (None,)
+
+
+class EventBus:
+    """Suscriptores de los eventos de un motor y los eventos pendientes del tick."""
+
+    def __init__(self):
+        self.subscribers = [] # (bits de eventos, función)
+        self.wants = 0 # Eventos que a alguien le interesan
+        self.pending = []
+
+    def subscribe(self, handler, kinds=ALL_EVENTS):
+        """handler(events) recibirá en cada tick la lista de sus eventos (los de kinds)."""
+        self.subscribers.append((kinds, handler))
+        self.wants |= kinds
+
+    def unsubscribe(self, handler):
+        self.subscribers = [(kinds, h) for kinds, h in self.subscribers if h is not handler]
+        self.wants = 0
+        for kinds, _ in self.subscribers:
+            self.wants |= kinds
+
+    def emit(self, kind, value=None):
+        """Anota un evento; quien emite comprueba antes wants & kind."""
+        self.pending.append(Event(kind, value))
+
+    def dispatch(self):
+        """Entrega los eventos pendientes a cada suscriptor y los descarta."""
+        events = self.pending
+        self.pending = []
+        for kinds, handler in self.subscribers:
+            if kinds == ALL_EVENTS:
+                handler(events)
+            else:
+                mine = [event for event in events if event.kind & kinds]
+                if mine:
+                    handler(mine)
+
+
+class EventCounter:
+    """Cuenta los eventos por nombre (p. ej. para estadísticas al salir)."""
+
+    def __init__(self, bus=None, kinds=ALL_EVENTS):
+        self.counts = Counter()
+        if bus is not None:
+            bus.subscribe(self, kinds)
+
+    def __call__(self, events):
+        for event in events:
+            self.counts[EVENT_NAMES[event.kind]] += 1
+
@@ -0,0 +1,131 @@
+# fondo.py
+"""Fondo precalculado: color del cielo, sol, luna y estrellas.
+
+El ciclo día-noche solo depende de time_of_day, un entero entre 0 y
+cycle_duration, así que SkyTable calcula una vez por valor el color de
+fondo, si es de noche y dónde va el sol o la luna (ya dibujados en su propio
+sprite). En cada frame el cielo es un fill y un blit.
+
+StarField dibuja las estrellas visibles (una de cada veinte más o menos)
+desde sellos prerenderizados, uno por tamaño y brillo, con un solo
+Surface.blits. Con las columnas de motor_arrays.EntityArrays la visibilidad
+de todas sale de una sola comparación de NumPy y solo se recorren en Python
+las visibles. Una capa con todo el cielo
+estrellado no sale a cuenta: con color clave cuesta copiarla entera en cada
+frame, y con RLE cada estrella que aparece o se apaga la vuelve a codificar.
+"""
+import math
+import random
+
+import pygame
+
+COLOR_KEY = (255, 0, 255)
+SUN_COLOR = (255, 255, 0)
+MOON_COLOR = (240, 240, 240)
+CRATER_COLOR = (200, 200, 200)
+CELESTIAL_RADIUS = 20
+HORIZON = 100 # El sol y la luna se ven por encima de height - HORIZON
+STAR_VISIBLE_TICKS = 5 # Una estrella se ve mientras blink_timer < 5
+STAR_BRIGHTNESS = (180, 201, 222, 243) # Niveles del parpadeo (antes randint(180, 255))
+
+
+def is_night(progress):
+    """Si el fondo es el de noche en ese punto del ciclo (0 a 1)."""
+    return 0.55 <= progress < 0.95
+
+
+def _bake(size, draw):
+    """Dibuja sobre un lienzo con color clave centrado en (size, size); devuelve (sprite, dx, dy)."""
+    canvas = pygame.Surface((size * 2 + 1, size * 2 + 1))
+    canvas.fill(COLOR_KEY)
+    draw(canvas, (size, size))
+    bounds = canvas.get_bounding_rect()
+    sprite = canvas.subsurface(bounds).copy()
+    sprite.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+    return sprite, bounds.x - size, bounds.y - size
+
+
+def _draw_sun(canvas, center):
+    pygame.draw.circle(canvas, SUN_COLOR, center, CELESTIAL_RADIUS)
+
+
+def _draw_moon(canvas, center):
+    x, y = center
+    pygame.draw.circle(canvas, MOON_COLOR, center, CELESTIAL_RADIUS)
+    # Cráter para dar apariencia de luna
+    pygame.draw.circle(canvas, CRATER_COLOR, (x + 8, y - 5), 4)
+
+
+class SkyTable:
+    """Fondo de cada time_of_day para un ciclo y un tamaño de pantalla.
+
+    colors[t] es el color de fondo, night[t] si es de noche, celestial[t] el
+    blit (sprite, posición) del sol o la luna o None si está bajo el
+    horizonte, y celestial_rects[t] la zona que ocupa (esté o no a la vista).
+    """
+
+    def __init__(self, cycle_duration, width, height, color):
+        self.key = (cycle_duration, width, height)
+        sun, sun_dx, sun_dy = _bake(CELESTIAL_RADIUS, _draw_sun)
+        moon, moon_dx, moon_dy = _bake(CELESTIAL_RADIUS, _draw_moon)
+        self.colors = []
+        self.night = []
+        self.celestial = []
+        self.celestial_rects = []
+        for time_of_day in range(cycle_duration):
+            progress = time_of_day / cycle_duration
+            self.colors.append(color(progress))
+            self.night.append(is_night(progress))
+            # Posición celestial
+            angle = progress * 2 * math.pi
+            x = width / 2 - math.cos(angle) * (width / 2.5)
+            y = height / 2 + math.sin(angle) * (height / 2.5)
+            self.celestial_rects.append(pygame.Rect(x - 22, y - 22, 44, 44))
+            if y >= height - HORIZON:
+                self.celestial.append(None)
+            elif progress < 0.5: # El sol de día, la luna de noche
+                self.celestial.append((sun, (int(x) + sun_dx, int(y) + sun_dy)))
+            else:
+                self.celestial.append((moon, (int(x) + moon_dx, int(y) + moon_dy)))
+
+    @classmethod
+    def cached(cls, table, cycle_duration, width, height, color):
+        """table si es de ese ciclo y tamaño; si no (o si es None), una nueva."""
+        if table is None or table.key != (cycle_duration, width, height):
+            table = cls(cycle_duration, width, height, color)
+        return table
+
+
+class StarField:
+    """Dibuja las estrellas visibles con sellos prerenderizados y un solo blits."""
+
+    def __init__(self):
+        self.stamps = {} # tamaño -> [(sprite, dx, dy) por nivel de brillo]
+
+    def stamps_for(self, size):
+        stamps = self.stamps.get(size)
+        if stamps is None:
+            stamps = self.stamps[size] = [
+                _bake(size + 1, lambda canvas, center, color=(level, level, level):
+                      pygame.draw.circle(canvas, color, center, size))
+                for level in STAR_BRIGHTNESS]
+        return stamps
+
+    def visible(self, stars):
+        """(x, y, tamaño) de cada estrella visible."""
+        blink_timer = getattr(stars, 'blink_timer', None)
+        if blink_timer is not None:
+            # motor_arrays.EntityArrays: una comparación para todas
+            shown = blink_timer < STAR_VISIBLE_TICKS
+            return zip(stars.x[shown].tolist(), stars.y[shown].tolist(), stars.size[shown].tolist())
+        # En una lista de objetos convertir a arrays cuesta más que este filtro
+        return [(star.x, star.y, star.size) for star in stars if star.blink_timer < STAR_VISIBLE_TICKS]
+
+    def draw(self, screen, stars):
+        batch = []
+        for x, y, size in self.visible(stars):
+            # El brillo parpadea ligeramente, distinto en cada frame
+            sprite, dx, dy = random.choice(self.stamps.get(size) or self.stamps_for(size))
+            batch.append((sprite, (x + dx, y + dy)))
+        if batch:
+            screen.blits(batch, doreturn=False)
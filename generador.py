@@ -0,0 +1,257 @@
+# generador.py
+"""Programa de obstáculos generado por adelantado y comprobado contra el salto.
+
+GameEngine elige cada obstáculo en el tick en que vence su temporizador y
+nada garantiza que la combinación se pueda superar a la velocidad del
+momento. SpawnSchedule genera los obstáculos por bloques, con su propio
+generador sembrado desde la semilla del motor, y antes de aceptar cada uno
+comprueba que el dinosaurio tiene alguna forma de sobrevivir: recorre tick a
+tick el conjunto de estados alcanzables (en el suelo, o en cada fase del
+salto de trayectoria.JumpTrajectory) descartando los que chocan con las
+hitboxes de los obstáculos ya programados. Si tras varios intentos ningún
+patrón es superable se programa una pausa sin obstáculos.
+
+El motor solo saca la siguiente entrada de una cola cuando vence el
+temporizador, así que la decisión sale del bucle del juego. La velocidad se
+predice contando los obstáculos que van saliendo de la pantalla, igual que
+_score_point; un cactus destruido con el power-up no suma punto, así que en
+ese caso la velocidad real solo puede ser menor que la prevista.
+"""
+import random
+from collections import deque
+
+import numpy as np
+
+from logica import Obstacle, BIRD_ALTITUDES, PTERODACTYL_ALTITUDES
+from trayectoria import JumpTrajectory
+
+CACTUS_TYPES = ('cactus_small', 'cactus_large', 'cactus_group', 'cactus_triple')
+FLYING_TYPES = ('bird', 'pterodactyl')
+BIRD_GROUP_SPACING = 80 # Desfase entre los pájaros de un grupo
+OFF_SCREEN_X = -50 # Obstacle.off_screen
+
+
+def classic_curve(score):
+    """Curva de dificultad del juego original, igual para cualquier puntaje.
+
+    Devuelve (intervalo mínimo, intervalo máximo, probabilidad acumulada de
+    cactus, probabilidad acumulada de cactus o enemigo aéreo); el resto son
+    grupos de pájaros.
+    """
+    return 60, 120, 0.6, 0.85
+
+
+class SpawnSchedule:
+    """Cola de patrones de obstáculos para un GameEngine, generada por bloques.
+
+    Cada entrada es (intervalo, patrón): el motor espera intervalo ticks como
+    con spawn_interval y luego crea el patrón, una tupla de (desfase x, tipo,
+    altitud). Con la misma semilla la secuencia es siempre la misma, sin
+    importar chunk_size.
+    """
+
+    def __init__(self, chunk_size=16, curve=classic_curve, max_attempts=8):
+        self.chunk_size = chunk_size
+        self.curve = curve
+        self.max_attempts = max_attempts
+        self.rng = random.Random()
+        self.queue = deque()
+
+    def start(self, engine):
+        """Empieza una secuencia nueva para la partida de engine y devuelve el primer intervalo."""
+        self.width = engine.width
+        self.ground_y = engine.ground_y
+        self.speed_increase = engine.speed_increase
+        self.speed_increase_interval = engine.speed_increase_interval
+
+        # Hitboxes del dinosaurio: de pie, agachado y en cada fase del salto
+        jump = JumpTrajectory.from_dino(engine.dino)
+        stand = (jump.x, jump.ground, jump.width, jump.height)
+        duck = (jump.x, jump.ground + jump.duck_offset, jump.duck_width, jump.duck_height)
+        self.jump_ticks = jump.airtime
+        self.dino_boxes = np.array([stand, duck] + [(jump.x, y, jump.width, jump.height)
+                                                    for y in jump.heights()], dtype=np.float64)
+        self.dino_left = jump.x
+        self.dino_right = jump.x + max(jump.width, jump.duck_width)
+        # Bits de estado: 0 en el suelo, p en la fase p del salto
+        self.state_weights = np.array([0] + [1 << p for p in range(1, self.jump_ticks + 1)],
+                                      dtype=np.int64)
+
+        self.rng.seed(engine.seed)
+        self.queue.clear()
+        self.tick = 0 # Tick del último patrón programado
+        self.frontier = 0 # Tick hasta el que los estados alcanzables ya no cambian
+        self.reachable = 1 # En el suelo
+        self.active = [] # (tick, x, velocidad, ancho, alto, y, último tick peligroso)
+        self.exits = [] # Ticks en que los obstáculos salen de la pantalla y suman punto
+        self.score = engine.score
+        self.speed = engine.speed
+        self.next_speed_increase_score = engine.next_speed_increase_score
+        self.generated = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        self.refill()
+        return self.queue[0][0]
+
+    def pop(self):
+        """Saca el siguiente patrón y devuelve (patrón, intervalo hasta el que le sigue)."""
+        if len(self.queue) < 2:
+            self.refill()
+        pattern = self.queue.popleft()[1]
+        return pattern, self.queue[0][0]
+
+    def refill(self):
+        """Genera chunk_size entradas más."""
+        for _ in range(self.chunk_size):
+            self.queue.append(self._next_entry())
+
+    def _next_entry(self):
+        for _ in range(self.max_attempts):
+            interval, pattern = self._sample()
+            if self._try_schedule(interval, pattern):
+                self.generated += 1
+                return interval, pattern
+            self.rejected += 1
+        # Pausa sin obstáculos: siempre se puede superar
+        interval = self.curve(self.score)[1]
+        self._try_schedule(interval, ())
+        self.fallbacks += 1
+        return interval, ()
+
+    def _sample(self):
+        """Intervalo y patrón al azar con el reparto de la curva de dificultad."""
+        rng = self.rng
+        min_interval, max_interval, cactus, flying = self.curve(self.score)
+        interval = rng.randint(min_interval, max_interval)
+        choice = rng.random()
+        if choice < cactus:
+            return interval, ((0, rng.choice(CACTUS_TYPES), 0),)
+        if choice < flying:
+            obs_type = rng.choice(FLYING_TYPES)
+            altitudes = BIRD_ALTITUDES if obs_type == 'bird' else PTERODACTYL_ALTITUDES
+            return interval, ((0, obs_type, rng.choice(altitudes)),)
+        return interval, tuple((i * BIRD_GROUP_SPACING, 'bird', rng.choice(BIRD_ALTITUDES))
+                               for i in range(rng.choice((2, 3))))
+
+    def _predicted_speed(self, tick):
+        """(velocidad, puntaje, siguiente aumento, salidas contadas) al llegar a tick."""
+        speed = self.speed
+        score = self.score
+        next_increase = self.next_speed_increase_score
+        counted = 0
+        for exit_tick in self.exits:
+            if exit_tick >= tick:
+                break # El motor genera antes de mover los obstáculos
+            counted += 1
+            score += 1
+            if score >= next_increase:
+                speed += self.speed_increase
+                next_increase += self.speed_increase_interval
+        return speed, score, next_increase, counted
+
+    def _try_schedule(self, interval, pattern):
+        """Programa el patrón si el dinosaurio puede sobrevivirlo; si no, no cambia nada."""
+        # El temporizador vence cuando supera el intervalo
+        tick = self.tick + interval + 1
+        speed, score, next_increase, counted = self._predicted_speed(tick)
+        new = []
+        for dx, obs_type, altitude in pattern:
+            obstacle = Obstacle(self.width + dx, obs_type, self.ground_y, speed, altitude=altitude)
+            x, width = obstacle.x, obstacle.width
+            # En el tick de aparición ya se mueve una vez: en tick + n - 1 está en x - n * speed
+            last = tick + int(-((self.dino_left - x - width) // speed)) - 2
+            new.append((tick, x, speed, width, obstacle.height, obstacle.y, last))
+
+        if new:
+            # Primer tick en que el patrón puede tocar al dinosaurio. Hasta
+            # entonces los estados alcanzables no dependen de lo que se
+            # programe después; un patrón más rápido que llegara antes que el
+            # anterior (intervalos muy cortos) se descarta
+            arrival = min(entry[0] + int((entry[1] - self.dino_right) // entry[2]) for entry in new)
+            if arrival <= self.frontier:
+                return False
+            # Hasta que pasen todos: un grupo anterior puede seguir pasando después de este
+            obstacles = self.active + new
+            reachable = self._reachable(max(entry[6] for entry in obstacles), obstacles)
+            if reachable is None:
+                return False
+            frontier = arrival - 1
+            if frontier > self.frontier:
+                self.reachable = reachable[frontier - self.frontier - 1]
+                self.frontier = frontier
+            self.active = [entry for entry in obstacles if entry[6] > frontier]
+
+        self.tick = tick
+        self.speed, self.score, self.next_speed_increase_score = speed, score, next_increase
+        exits = self.exits[counted:]
+        for entry in new:
+            exits.append(entry[0] + int((entry[1] - OFF_SCREEN_X) // entry[2]))
+        exits.sort()
+        self.exits = exits
+        return True
+
+    def _reachable(self, end, obstacles):
+        """Estados alcanzables (bits) en cada tick de frontier + 1 a end, o None si ninguno sobrevive."""
+        ticks = np.arange(self.frontier + 1, end + 1, dtype=np.float64)
+        if not len(ticks):
+            return []
+        obs = np.array([entry[:6] for entry in obstacles], dtype=np.float64)
+        spawn, x0, speed, width, height, y = obs.T
+        # x de cada obstáculo en cada tick (ticks, obstáculos); los que aún no
+        # aparecen quedan a la derecha de la pantalla
+        x = x0 - (ticks[:, None] - spawn + 1) * speed
+        x = np.where(ticks[:, None] >= spawn, x, np.inf)
+        boxes = self.dino_boxes
+        dx, dy, dw, dh = boxes.T
+        # (ticks, estados del dinosaurio, obstáculos)
+        hit = ((dx[None, :, None] < x[:, None, :] + width) &
+               (dx[None, :, None] + dw[None, :, None] > x[:, None, :]) &
+               (dy[:, None] < y + height)[None] &
+               (dy[:, None] + dh[:, None] > y)[None]).any(axis=2)
+        safe = ~hit
+        # En el suelo basta con estar a salvo de pie o agachado
+        ground = safe[:, 0] | safe[:, 1]
+        masks = (ground.astype(np.int64) +
+                 safe[:, 2:].astype(np.int64) @ self.state_weights[1:]).tolist()
+
+        jump_bits = (1 << (self.jump_ticks + 1)) - 2
+        landing = 1 << self.jump_ticks
+        reachable = self.reachable
+        history = []
+        for mask in masks:
+            # Suelo -> fase 1, fase p -> p + 1; suelo o última fase -> suelo
+            step = (reachable << 1) & jump_bits
+            if reachable & (1 | landing):
+                step |= 1
+            reachable = step & mask
+            if not reachable:
+                return None
+            history.append(reachable)
+        return history
+
+    def get_state(self):
+        """Estado plano para GameEngine.snapshot()."""
+        return (self.rng.getstate(), tuple(self.queue), self.tick, self.frontier, self.reachable,
+                tuple(self.active), tuple(self.exits), self.score, self.speed,
+                self.next_speed_increase_score, self.generated, self.rejected, self.fallbacks)
+
+    def set_state(self, state):
+        (rng_state, queue, self.tick, self.frontier, self.reachable, active, exits, self.score,
+         self.speed, self.next_speed_increase_score, self.generated, self.rejected,
+         self.fallbacks) = state
+        self.rng.setstate(rng_state)
+        self.queue = deque(queue)
+        self.active = list(active)
+        self.exits = list(exits)
+
+    def copy(self):
+        """Programa independiente en el mismo estado (para GameEngine.fork)."""
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__) # Comparte la configuración y las hitboxes
+        clone.rng = random.Random()
+        clone.set_state(self.get_state())
+        return clone
+
+    def stats(self):
+        return {'generated': self.generated, 'rejected': self.rejected, 'fallbacks': self.fallbacks,
+                'queued': len(self.queue)}
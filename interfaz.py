@@ -1,60 +1,93 @@
 # game_view.py
 import pygame
-import numpy as np
 import sys
-from logica import GameEngine
-import random
-
-pygame.init()
-pygame.mixer.init() # Inicializar el mezclador de audio
+import argparse
+from types import SimpleNamespace
+from autopiloto import Autopilot, warp, report, print_report
+from carrera import RaceEngine, load_ghosts
+from eventos import EventCounter
+from generador import SpawnSchedule
+from logica import GameEngine, GameStateView
+from sprites import SpriteAtlas
+from sonido import SoundBank, SoundEffects
+from perfilador import Profiler
+from bucle import FixedTimestepLoop, Interpolator, DEFAULT_TICK_RATE, DEFAULT_MAX_TICKS_PER_FRAME
+from simulador import POLICIES
+from repeticion import ReplayRecorder, apply_inputs, INPUT_JUMP, INPUT_DUCK, INPUT_PAUSE, INPUT_START
+from espectador import SpectatorServer, watch
+from fondo import SkyTable, StarField
+from pantalla import ScaledDisplay
 
 # Configuración de pantalla
 WIDTH, HEIGHT = 800, 400
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Dinosaurio - Chrome Game")
 
 # Colores
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (83, 83, 83)
 NIGHT_BLUE = (25, 25, 112)
+COLOR_KEY = (255, 0, 255) # Transparente en las superficies prerenderizadas
 
-# FPS
-clock = pygame.time.Clock()
+# FPS de dibujo (0 = sin límite); la lógica corre a su propio ritmo (ver bucle.py)
 FPS = 60
 
-def generate_sound(frequency=440, duration=0.1, volume=0.1):
-    """Genera un sonido simple y lo devuelve como un objeto pygame.mixer.Sound."""
-    sample_rate = pygame.mixer.get_init()[0]
-    n_samples = int(round(duration * sample_rate))
-    
-    # Generar la onda de sonido
-    buf = np.zeros((n_samples, 2), dtype=np.int16)
-    max_sample = 2**(16 - 1) - 1
-    
-    t = np.linspace(0., duration, n_samples, endpoint=False)
-    wave = np.sin(2 * np.pi * frequency * t)
-    
-    # Aplicar volumen y convertir a formato de 16 bits
-    buf[:,0] = (wave * max_sample * volume).astype(np.int16)
-    buf[:,1] = buf[:,0] # Sonido estéreo
-    
-    return pygame.sndarray.make_sound(buf)
-
-# Generar sonidos en lugar de cargarlos desde archivos
-jump_sound = generate_sound(660, 0.05, 0.1)  # Tono agudo y corto
-point_sound = generate_sound(880, 0.05, 0.08) # Tono más agudo para puntos
-die_sound = generate_sound(220, 0.2, 0.15)   # Tono grave y más largo
-highscore_sound = generate_sound(1046, 0.15, 0.1) # Tono muy agudo para nuevo récord
-game_sounds = {"jump": jump_sound, "point": point_sound, "die": die_sound, "highscore": highscore_sound}
+# Con el piloto automático, ticks que se muestra el fin de partida antes de reiniciar
+AI_RESTART_DELAY = 45
+
+# Se crean en init(): importar el módulo no abre ventana ni audio
+screen = None # Superficie lógica de WIDTH x HEIGHT donde dibujan los renderizadores
+display = None # pantalla.ScaledDisplay si la ventana no es del tamaño lógico
+clock = None
+game_sounds = None
+
+
+def init(window=True, display_size=None, smooth=False, fullscreen=False, integer_scale=False):
+    """Inicia pygame, el audio y (si window) la ventana; devuelve la pantalla.
+
+    Los sonidos se sintetizan o se leen de la caché la primera vez que suenan
+    (ver sonido.SoundBank). Sin dispositivo de audio el juego sigue sin sonido.
+    Con display_size o fullscreen la ventana tiene otro tamaño: la pantalla
+    devuelta sigue siendo de WIDTH x HEIGHT y display la escala al presentar
+    (ver pantalla.ScaledDisplay para smooth e integer_scale).
+    """
+    global screen, display, clock, game_sounds
+    pygame.init()
+    try:
+        pygame.mixer.init() # Inicializar el mezclador de audio
+    except pygame.error:
+        pass
+    if window and screen is None:
+        if fullscreen:
+            window_surface = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            window_surface = pygame.display.set_mode(display_size or (WIDTH, HEIGHT))
+        pygame.display.set_caption("Dinosaurio - Chrome Game")
+        if window_surface.get_size() != (WIDTH, HEIGHT):
+            display = ScaledDisplay(window_surface, (WIDTH, HEIGHT), smooth, integer_scale)
+            screen = display.surface
+        else:
+            screen = window_surface
+    clock = pygame.time.Clock()
+    if game_sounds is None:
+        game_sounds = SoundBank()
+    return screen
 
 
 class GameRenderer:
-    def __init__(self, screen):
+    def __init__(self, screen, display=None):
         self.screen = screen
+        self.display = display or pygame.display # Presenta con flip() y update(rects)
         self.font = pygame.font.Font(None, 36)
         self.small_font = pygame.font.Font(None, 28)
         self.blink_timer = 0
+        self.pixels_presented = 0 # Píxeles enviados a la pantalla en el último frame
+        self.ghost_atlas = None
+        self.sky = None # fondo.SkyTable del ciclo y tamaño actuales
+        self.star_field = StarField()
+        self.powerup_shown = True # Fase del parpadeo de los power-ups (ver powerup_blink)
+
+    def invalidate(self):
+        """Fuerza un repintado completo en el siguiente frame (aquí siempre lo es)."""
         
     def draw_dino(self, dino_state):
         """Dibuja el dinosaurio basado en su objeto de estado"""
@@ -86,6 +119,15 @@ class GameRenderer:
             pygame.draw.rect(self.screen, dino_color, (x + 25, y, 25, 25)) # Cabeza
             pygame.draw.rect(self.screen, BLACK, (x + 40, y + 5, 5, 5)) # Ojo
 
+
+    def draw_ghosts(self, ghosts):
+        """Dibuja los dinosaurios fantasma de una carrera, translúcidos"""
+        if not ghosts:
+            return
+        if self.ghost_atlas is None:
+            self.ghost_atlas = SpriteAtlas(GameRenderer(self.screen), preload=False)
+        atlas = self.ghost_atlas
+        self.screen.blits([atlas.ghost(dino_state) for dino_state in ghosts], doreturn=False)
             
     def draw_obstacle(self, obs_state):
         """Dibuja un obstáculo basado en su objeto de estado"""
@@ -133,10 +175,18 @@ class GameRenderer:
         """Dibuja una nube"""
         pygame.draw.ellipse(self.screen, GRAY, (cloud_state.x, cloud_state.y, cloud_state.width, cloud_state.height))
 
+    def powerup_blink(self, time_of_day):
+        """Fija si los power-ups se ven en este frame: 15 ticks sí y 15 no (medio segundo a 60 ticks/s).
+
+        Sale del estado y no del reloj, así que un mismo estado se dibuja
+        siempre igual (ver observacion.OffscreenRenderer).
+        """
+        self.powerup_shown = time_of_day % 30 < 15
+
     def draw_powerup(self, powerup_state):
         """Dibuja el power-up."""
         # Un simple cuadrado parpadeante para el power-up
-        if pygame.time.get_ticks() % 500 < 250:
+        if self.powerup_shown:
             pygame.draw.rect(self.screen, (255, 165, 0), (powerup_state.x, powerup_state.y, powerup_state.width, powerup_state.height))
 
     def draw_particles(self, particles, is_night):
@@ -146,35 +196,19 @@ class GameRenderer:
             pygame.draw.circle(self.screen, particle_color, (p.x, p.y), p.size)
 
     def draw_stars(self, stars):
-        """Dibuja las estrellas en el cielo nocturno."""
-        for star in stars:
-            # La visibilidad se calcula aquí en la interfaz
-            is_visible = star.blink_timer < 5
-            if is_visible:
-                # El color parpadea ligeramente
-                brightness = random.randint(180, 255)
-                color = (brightness, brightness, brightness)
-                pygame.draw.circle(self.screen, color, (star.x, star.y), star.size)
+        """Dibuja las estrellas visibles en el cielo nocturno (ver fondo.StarField)."""
+        self.star_field.draw(self.screen, stars)
+
+    def sky_table(self, cycle_duration, width, height):
+        """Tabla del fondo para cada hora del día, calculada una vez por ciclo y tamaño."""
+        self.sky = SkyTable.cached(self.sky, cycle_duration, width, height, self.background_color)
+        return self.sky
 
     def draw_sun_and_moon(self, time_of_day, cycle_duration, width, height):
         """Dibuja el sol o la luna según la hora del día."""
-        progress = (time_of_day % cycle_duration) / cycle_duration
-        angle = progress * 2 * np.pi
-
-        # Posición celestial
-        celestial_x = width / 2 - np.cos(angle) * (width / 2.5)
-        celestial_y = height / 2 + np.sin(angle) * (height / 2.5)
-
-        # El sol es visible durante la primera mitad del ciclo (día)
-        if 0 <= progress < 0.5:
-            if celestial_y < height - 100: # Solo si está por encima del suelo
-                pygame.draw.circle(self.screen, (255, 255, 0), (celestial_x, celestial_y), 20)
-        # La luna es visible durante la segunda mitad (noche)
-        else:
-            if celestial_y < height - 100:
-                pygame.draw.circle(self.screen, (240, 240, 240), (celestial_x, celestial_y), 20) # Luna
-                # Cráter para dar apariencia de luna
-                pygame.draw.circle(self.screen, (200, 200, 200), (celestial_x + 8, celestial_y - 5), 4)
+        celestial = self.sky_table(cycle_duration, width, height).celestial[time_of_day % cycle_duration]
+        if celestial is not None: # Bajo el horizonte no se ve
+            self.screen.blit(*celestial)
 
     def draw_ground(self, ground_state, width):
         """Dibuja el suelo basado en su estado"""
@@ -228,72 +262,372 @@ class GameRenderer:
         self.screen.blit(title_text, (width // 2 - 80, height // 2 - 60))
         self.screen.blit(start_text, (width // 2 - 120, height // 2))
         self.draw_score(0, high_score, width, False, False)
-        pygame.display.flip()
+        self.display.flip()
 
-    def render(self, game_state):
-        """Renderiza el estado completo del juego"""
-        time_of_day = game_state['time_of_day']
-        cycle_duration = game_state['cycle_duration']
-        progress = time_of_day / cycle_duration
-
-        # Interpolar color de fondo
+    def background_color(self, progress):
+        """Color de fondo según el progreso del ciclo día-noche (0 a 1)."""
         if progress < 0.45: # Día
-            bg_color = WHITE
+            return WHITE
         elif progress < 0.55: # Atardecer
             trans_progress = (progress - 0.45) / 0.1
-            bg_color = tuple(int(WHITE[i] * (1 - trans_progress) + NIGHT_BLUE[i] * trans_progress) for i in range(3))
+            return tuple(int(WHITE[i] * (1 - trans_progress) + NIGHT_BLUE[i] * trans_progress) for i in range(3))
         elif progress < 0.95: # Noche
-            bg_color = NIGHT_BLUE
+            return NIGHT_BLUE
         else: # Amanecer
             trans_progress = (progress - 0.95) / 0.05
-            bg_color = tuple(int(NIGHT_BLUE[i] * (1 - trans_progress) + WHITE[i] * trans_progress) for i in range(3))
-
-        # Limpiar pantalla
-        self.screen.fill(bg_color)
-        
-        is_night = 0.55 <= progress < 0.95
+            return tuple(int(NIGHT_BLUE[i] * (1 - trans_progress) + WHITE[i] * trans_progress) for i in range(3))
 
+    def draw_world(self, game_state, is_night):
+        """Dibuja todo lo que hay en pantalla salvo el fondo y las capas de pausa o game over."""
+        self.powerup_blink(game_state.time_of_day)
         # Dibujar estrellas si es de noche
         if is_night:
-            self.draw_stars(game_state['stars'])
+            self.draw_stars(game_state.stars)
 
         # Dibujar elementos
-        self.draw_sun_and_moon(time_of_day, cycle_duration, game_state['width'], game_state['height'])
-        self.draw_ground(game_state['ground'], game_state['width'])
+        self.draw_sun_and_moon(game_state.time_of_day, game_state.cycle_duration, game_state.width, game_state.height)
+        self.draw_ground(game_state.ground, game_state.width)
         
-        self.draw_particles(game_state['particles'], is_night)
-        for cloud_state in game_state['clouds']:
+        self.draw_particles(game_state.particles, is_night)
+        for cloud_state in game_state.clouds:
             self.draw_cloud(cloud_state)
 
-        for powerup_state in game_state['powerups']:
+        for powerup_state in game_state.powerups:
             self.draw_powerup(powerup_state)
 
-        self.draw_dino(game_state['dino'])
+        self.draw_ghosts(game_state.ghosts)
+        self.draw_dino(game_state.dino)
         
-        for obs_state in game_state['obstacles']:
+        for obs_state in game_state.obstacles:
             self.draw_obstacle(obs_state)
             
-        self.draw_score(game_state['score'], game_state['high_score'], game_state['width'], game_state['new_high_score_achieved'], is_night)
+        self.draw_score(game_state.score, game_state.high_score, game_state.width, game_state.new_high_score_achieved, is_night)
+
+    def draw_frame(self, game_state):
+        """Dibuja el estado completo del juego sin actualizar la pantalla.
+
+        game_state es el GameStateView de get_game_state o un diccionario con sus claves.
+        """
+        game_state = GameStateView.wrap(game_state)
+        sky = self.sky_table(game_state.cycle_duration, game_state.width, game_state.height)
+        time_of_day = game_state.time_of_day % game_state.cycle_duration
+        is_night = sky.night[time_of_day]
+
+        # Limpiar pantalla
+        self.screen.fill(sky.colors[time_of_day])
+        self.draw_world(game_state, is_night)
         
-        if game_state['game_over']:
-            self.draw_game_over(game_state['width'], game_state['height'])
-        elif game_state['paused']:
-            self.draw_pause_screen(game_state['width'], game_state['height'])
-            
+        if game_state.game_over:
+            self.draw_game_over(game_state.width, game_state.height)
+        elif game_state.paused:
+            self.draw_pause_screen(game_state.width, game_state.height)
+
+    def render(self, game_state):
+        """Renderiza el estado completo del juego"""
+        self.draw_frame(game_state)
         # Actualizar pantalla
-        pygame.display.flip()
+        self.display.flip()
+        self.pixels_presented = self.screen.get_width() * self.screen.get_height()
+
+
+def merge_rects(rects):
+    """Une los rectángulos que se solapan para borrar y actualizar menos zonas."""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class CachedGameRenderer(GameRenderer):
+    """Renderizador con capas en caché y actualización por rectángulos sucios.
+
+    El suelo se dibuja una vez en una tira que luego solo se desplaza, los
+    textos se guardan por valor y la capa de pausa se crea una sola vez. En
+    cada frame solo se borran las zonas donde había entidades en el frame
+    anterior y se envían a la pantalla con display.update(rects); el
+    fondo completo solo se repinta cuando cambia su color o aparece una capa.
+    Mientras el juego está en pausa o terminado no se redibuja nada.
+    """
+    MAX_CACHED_TEXTS = 256
+
+    def __init__(self, screen, display=None):
+        super().__init__(screen, display)
+        self.text_cache = {}
+        self.ground_strip = None
+        self.pause_overlay = None
+        self.last_rects = []
+        self.last_background = None
+        self.last_overlay = None
+        self.last_start_screen = None
+
+    def invalidate(self):
+        """Fuerza un repintado completo en el siguiente frame."""
+        self.last_background = None
+        self.last_start_screen = None
+
+    def text(self, font, text, color):
+        """Superficie de texto renderizada una sola vez por (fuente, texto, color)."""
+        key = (id(font), text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) >= self.MAX_CACHED_TEXTS:
+                self.text_cache.clear() # Los puntajes viejos no vuelven a usarse
+            surface = self.text_cache[key] = font.render(text, True, color)
+        return surface
 
+    def draw_ground(self, ground_state, width):
+        """Dibuja el suelo desplazando una tira prerenderizada"""
+        if self.ground_strip is None or self.ground_strip.get_width() != width + 50:
+            # Se reutiliza el dibujo original sobre una superficie con color clave
+            # (RLE), que se copia mucho más rápido que dibujar las líneas
+            strip = pygame.Surface((width + 50, 10))
+            strip.fill(COLOR_KEY)
+            screen, self.screen = self.screen, strip
+            super().draw_ground(SimpleNamespace(x=0, y=2), width + 50)
+            self.screen = screen
+            strip.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+            self.ground_strip = strip
+        self.screen.blit(self.ground_strip, (ground_state.x, ground_state.y - 2))
 
-def main():
-    # Inicializar motor del juego (con sonidos) y renderizador
-    game = GameEngine(WIDTH, HEIGHT, game_sounds)
-    renderer = GameRenderer(screen)
+    def draw_score(self, score, high_score, width, new_high_score, is_night):
+        """Dibuja el puntaje con textos en caché"""
+        self.blink_timer = (self.blink_timer + 1) % 40 # Ciclo de parpadeo
+        text_color = WHITE if is_night else GRAY
+        high_color = text_color if is_night else WHITE
+        if not (new_high_score and self.blink_timer < 20):
+            high_color = text_color
+        self.screen.blit(self.text(self.font, f"HI {high_score:05}", high_color), (width - 250, 20))
+        self.screen.blit(self.text(self.font, f"{score:05}", text_color), (width - 120, 20))
+
+    def draw_game_over(self, width, height):
+        """Dibuja la pantalla de game over"""
+        self.screen.blit(self.text(self.font, "GAME OVER", GRAY), (width // 2 - 100, height // 2 - 50))
+        self.screen.blit(self.text(self.small_font, "Press SPACE to restart", GRAY), (width // 2 - 150, height // 2))
+
+    def draw_pause_screen(self, width, height):
+        """Dibuja la pantalla de pausa."""
+        if self.pause_overlay is None or self.pause_overlay.get_size() != (width, height):
+            self.pause_overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.pause_overlay.fill((0, 0, 0, 128)) # Negro con 50% de opacidad
+        self.screen.blit(self.pause_overlay, (0, 0))
+        self.screen.blit(self.text(self.font, "PAUSED", WHITE), (width // 2 - 70, height // 2 - 30))
+
+    def draw_start_screen(self, width, height, high_score):
+        """Dibuja la pantalla de inicio solo si cambió."""
+        key = (width, height, high_score)
+        if key == self.last_start_screen:
+            return
+        super().draw_start_screen(width, height, high_score)
+        self.last_start_screen = key
+        self.last_background = None
+
+    def dirty_rects(self, game_state, is_night):
+        """Rectángulos que ocupa en pantalla todo lo que se mueve o cambia."""
+        width, height = game_state.width, game_state.height
+        rects = []
+        dino = game_state.dino
+        # Incluye la cola (x - 10), las piernas (y + 70) y la cabeza agachada (x + 75)
+        rects.append(pygame.Rect(dino.x - 10, dino.y - 1, 90, 72))
+        ghosts = game_state.ghosts
+        if ghosts:
+            # Todos comparten x: un solo rectángulo entre el más alto y el más bajo
+            ys = [ghost.y for ghost in ghosts]
+            rects.append(pygame.Rect(dino.x - 10, min(ys) - 1, 90, max(ys) - min(ys) + 72))
+        for obs in game_state.obstacles:
+            # Margen para brazos, alas y fragmentos que salen del hitbox
+            rects.append(pygame.Rect(obs.x - 10, obs.y - 6, obs.width + 20, obs.height + 12))
+        for cloud in game_state.clouds:
+            rects.append(pygame.Rect(cloud.x - 1, cloud.y - 1, cloud.width + 2, cloud.height + 2))
+        for pu in game_state.powerups:
+            rects.append(pygame.Rect(pu.x, pu.y, pu.width, pu.height))
+        particles = game_state.particles
+        if len(particles):
+            # Las partículas van juntas detrás del dinosaurio: un solo rectángulo
+            xs = [p.x for p in particles]
+            ys = [p.y for p in particles]
+            left, top = min(xs) - 5, min(ys) - 5
+            rects.append(pygame.Rect(left, top, max(xs) + 5 - left, max(ys) + 5 - top))
+        if is_night:
+            for star in game_state.stars:
+                if star.blink_timer < 5: # Visible (ver draw_stars)
+                    rects.append(pygame.Rect(star.x - 3, star.y - 3, 7, 7))
+        # Sol o luna, el suelo y el marcador
+        sky = self.sky_table(game_state.cycle_duration, width, height)
+        rects.append(sky.celestial_rects[game_state.time_of_day % game_state.cycle_duration])
+        rects.append(pygame.Rect(0, game_state.ground.y - 2, width, 10))
+        rects.append(pygame.Rect(width - 250, 20, 250, 30))
+        return rects
+
+    def render(self, game_state):
+        """Renderiza solo lo que cambió desde el frame anterior"""
+        game_state = GameStateView.wrap(game_state)
+        sky = self.sky_table(game_state.cycle_duration, game_state.width, game_state.height)
+        time_of_day = game_state.time_of_day % game_state.cycle_duration
+        is_night = sky.night[time_of_day]
+        background = sky.colors[time_of_day]
+        overlay = 'game_over' if game_state.game_over else 'paused' if game_state.paused else None
+        full = background != self.last_background or overlay != self.last_overlay
+
+        if overlay and not full and not (overlay == 'game_over' and game_state.new_high_score_achieved):
+            self.pixels_presented = 0
+            return # La imagen no cambia mientras dura la pausa o el game over
+
+        rects = merge_rects(self.dirty_rects(game_state, is_night))
+        if full or overlay:
+            self.screen.fill(background)
+        else:
+            # Borrar lo dibujado en el frame anterior
+            for rect in self.last_rects:
+                self.screen.fill(background, rect)
+
+        self.draw_world(game_state, is_night)
+        if overlay == 'game_over':
+            self.draw_game_over(game_state.width, game_state.height)
+        elif overlay == 'paused':
+            self.draw_pause_screen(game_state.width, game_state.height)
+
+        if full or overlay:
+            self.display.flip()
+            self.pixels_presented = self.screen.get_width() * self.screen.get_height()
+        else:
+            updated = merge_rects(self.last_rects + rects)
+            self.display.update(updated)
+            self.pixels_presented = sum(rect.width * rect.height for rect in updated)
+        self.last_rects = rects
+        self.last_background = background
+        self.last_overlay = overlay
+        self.last_start_screen = None
+
+
+class SpriteGameRenderer(CachedGameRenderer):
+    """Renderizador con capas en caché que dibuja las entidades desde un atlas.
+
+    El dinosaurio, los obstáculos, las nubes y los power-ups se prerenderizan una vez (ver sprites.SpriteAtlas) y en cada frame se
+    copian todos con una sola llamada a Surface.blits.
+    """
+
+    def __init__(self, screen, display=None):
+        super().__init__(screen, display)
+        self.atlas = SpriteAtlas(GameRenderer(screen))
+        self.ghost_atlas = self.atlas
+
+    def draw_dino(self, dino_state):
+        """Dibuja el dinosaurio con un solo blit"""
+        self.screen.blit(*self.atlas.dino(dino_state))
+
+    def draw_obstacle(self, obs_state):
+        """Dibuja un obstáculo con un solo blit"""
+        self.screen.blit(*self.atlas.obstacle(obs_state))
+
+    def draw_cloud(self, cloud_state):
+        """Dibuja una nube con un solo blit"""
+        self.screen.blit(*self.atlas.cloud(cloud_state))
+
+    def draw_powerup(self, powerup_state):
+        """Dibuja el power-up."""
+        if self.powerup_shown:
+            self.screen.blit(*self.atlas.powerup(powerup_state))
+
+    def draw_world(self, game_state, is_night):
+        """Dibuja el mundo; todas las entidades van en un solo Surface.blits."""
+        self.powerup_blink(game_state.time_of_day)
+        if is_night:
+            self.draw_stars(game_state.stars)
+        self.draw_sun_and_moon(game_state.time_of_day, game_state.cycle_duration, game_state.width, game_state.height)
+        self.draw_ground(game_state.ground, game_state.width)
+
+        self.draw_particles(game_state.particles, is_night)
+
+        # Mismo orden que GameRenderer.draw_world
+        atlas = self.atlas
+        batch = [atlas.cloud(cloud_state) for cloud_state in game_state.clouds]
+        if self.powerup_shown:
+            batch.extend(atlas.powerup(powerup_state) for powerup_state in game_state.powerups)
+        batch.extend(atlas.ghost(dino_state) for dino_state in game_state.ghosts or ())
+        batch.append(atlas.dino(game_state.dino))
+        batch.extend(atlas.obstacle(obs_state) for obs_state in game_state.obstacles)
+        self.screen.blits(batch, doreturn=False)
+
+        self.draw_score(game_state.score, game_state.high_score, game_state.width, game_state.new_high_score_achieved, is_night)
+
+
+def profiler_overlay(profiler, font):
+    """Superficie con las líneas del perfilador sobre un fondo oscuro."""
+    lines = [font.render(line, True, WHITE) for line in profiler.overlay_lines()]
+    line_height = font.get_linesize()
+    overlay = pygame.Surface((max(line.get_width() for line in lines) + 10, line_height * len(lines) + 10))
+    overlay.fill(BLACK)
+    for i, line in enumerate(lines):
+        overlay.blit(line, (5, 5 + i * line_height))
+    return overlay
+
+
+RENDERERS = {'basic': GameRenderer, 'cached': CachedGameRenderer, 'sprites': SpriteGameRenderer}
+
+
+def main(record_path=None, renderer_name='basic', fps=FPS, tick_rate=DEFAULT_TICK_RATE,
+         max_ticks_per_frame=DEFAULT_MAX_TICKS_PER_FRAME, uncapped=False, profile_path=None,
+         fair_spawns=False, ai=False, start_score=0, ghosts=(), seed=None, broadcast_port=None,
+         display_size=None, smooth=False, fullscreen=False, integer_scale=False,
+         broadcast_host='127.0.0.1'):
+    """Bucle del juego. Con ai juega autopiloto.Autopilot: empieza solo en
+    start_score, reinicia tras cada muerte e informa de las partidas al salir.
+    ghosts son pares (nombre, controlador) que corren la misma pista (ver
+    carrera.py). Con broadcast_port cada tick se transmite a los espectadores
+    que se conecten a broadcast_host (ver espectador.py). display_size,
+    smooth, fullscreen e integer_scale: ver init()."""
+    init(display_size=display_size, smooth=smooth, fullscreen=fullscreen, integer_scale=integer_scale)
+    # Inicializar motor del juego (con sonidos) y renderizador. La pista no
+    # depende de las partículas: cualquier partida grabada sirve de fantasma.
+    # El autopiloto no guarda récords ni partidas: no son del jugador
+    engine_class = RaceEngine if ghosts else GameEngine
+    game = engine_class(WIDTH, HEIGHT, data_file=None if ai else "game_data.json", seed=seed,
+                        spawn_schedule=SpawnSchedule() if fair_spawns else None, isolated_effects=True)
+    SoundEffects(game_sounds, game.events)
+    for name, controller in ghosts:
+        game.add_ghost(controller, name)
+    renderer = RENDERERS[renderer_name](screen, display)
+    autopilot = None
+    if ai:
+        autopilot = Autopilot()
+        events = EventCounter(game.events)
+        runs = []
+        over_ticks = 0
+        max_speed = game.speed
+        game.start_game()
+        warp(game, start_score)
+    recorder = ReplayRecorder(game)
+    broadcast = None
+    if broadcast_port is not None:
+        broadcast = SpectatorServer()
+        print(f"Transmitiendo en el puerto {broadcast.start_in_thread(broadcast_host, broadcast_port)}")
+    loop = FixedTimestepLoop(tick_rate, max_ticks_per_frame, uncapped)
+    interpolator = Interpolator()
+
+    # El perfilador solo se engancha si se pide (--profile o F3)
+    profiler = None
+    if profile_path:
+        profiler = Profiler()
+        profiler.attach_engine(game)
+        profiler.attach_renderer(renderer)
+    show_profiler = False
+    profiler_font = pygame.font.SysFont('monospace', 14)
+    overlay = None
     
+    # Las pulsaciones se guardan hasta el siguiente tick aunque en este frame no toque ninguno
+    inputs = 0
     running = True
     while running:
-        clock.tick(FPS)
+        if fps and not uncapped:
+            clock.tick(fps)
         
-        # Procesar eventos
+        # Procesar eventos. Las entradas del frame se reúnen como bits para
+        # aplicarlas igual que al reproducir una repetición.
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -302,35 +636,205 @@ def main():
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_p:
-                    game.toggle_pause()
+                    inputs |= INPUT_PAUSE
+                elif event.key == pygame.K_F3:
+                    show_profiler = not show_profiler
+                    if profiler is None:
+                        profiler = Profiler()
+                        profiler.attach_engine(game)
+                        profiler.attach_renderer(renderer)
+                    renderer.invalidate() # Borra el overlay al ocultarlo
                 elif event.key == pygame.K_SPACE:
                     if game.game_over:
                         game.restart()
+                        # Cada partida se graba por separado con su semilla
+                        recorder = ReplayRecorder(game)
+                        inputs = INPUT_START
                     elif not game.started:
-                        game.start_game()
+                        inputs |= INPUT_START
                     else:
-                        game.handle_jump()
+                        inputs |= INPUT_JUMP
                 elif event.key == pygame.K_UP and not game.game_over:
-                    game.handle_jump()
+                    inputs |= INPUT_JUMP
         
         # Manejar tecla de agacharse (mantenida)
-        if not game.game_over and not game.paused:
-            keys = pygame.key.get_pressed()
-            game.handle_duck(keys[pygame.K_DOWN])
+        ducking = INPUT_DUCK if pygame.key.get_pressed()[pygame.K_DOWN] else 0
+        if autopilot is not None:
+            ducking = 0 # El teclado solo pausa y sale
         
-        # Actualizar lógica del juego
-        game.update()
+        # Actualizar lógica del juego: cero, uno o varios ticks según el tiempo real
+        ticks = loop.advance()
+        for tick in range(ticks):
+            if tick == ticks - 1:
+                interpolator.capture(game.get_game_state())
+            if autopilot is not None:
+                if game.game_over:
+                    over_ticks += 1
+                    if over_ticks >= AI_RESTART_DELAY:
+                        game.restart()
+                        warp(game, start_score)
+                        recorder = ReplayRecorder(game)
+                        over_ticks = 0
+                elif not game.paused:
+                    inputs |= autopilot.inputs(game)
+            was_over = game.game_over
+            recorder.record(inputs | ducking)
+            apply_inputs(game, inputs | ducking)
+            inputs = 0 # Las pulsaciones solo cuentan en el primer tick
+            if broadcast is not None:
+                broadcast.publish(game.get_game_state())
+            if game.game_over and not was_over:
+                if record_path:
+                    recorder.replay(game.score).save(record_path)
+                if ghosts:
+                    for place, entry in enumerate(game.results(), 1):
+                        print(f"{place}. {entry['name']}: {entry['score']} ({entry['cause'] or 'vivo'})")
+                if autopilot is not None:
+                    runs.append({'seed': game.seed, 'score': game.score, 'frames': sum(count for count, _ in recorder.runs),
+                                 'speed': game.speed, 'cause': game.death_cause})
+                    max_speed = max(max_speed, game.speed)
         
         # Renderizar
         game_state = game.get_game_state()
-        if not game_state['started']:
-            renderer.draw_start_screen(WIDTH, HEIGHT, game_state['high_score'])
+        if not game_state.started:
+            renderer.draw_start_screen(WIDTH, HEIGHT, game_state.high_score)
         else:
-            renderer.render(game_state)
+            renderer.render(interpolator.state(game_state, loop.alpha))
+
+        if profiler is not None:
+            profiler.end_frame(game_state)
+            if show_profiler:
+                # Los percentiles se recalculan dos veces por segundo, no en cada frame
+                if overlay is None or loop.frames % 30 == 0:
+                    overlay = profiler_overlay(profiler, profiler_font)
+                renderer.display.update(screen.blit(overlay, (10, 10)))
     
+    if profile_path:
+        profiler.dump(profile_path)
+    if uncapped:
+        stats = loop.stats()
+        print(f"{stats['ticks_per_second']:.0f} ticks/s, {stats['frames_per_second']:.0f} frames/s")
+    if broadcast is not None:
+        stats = broadcast.stats()
+        print(f"Transmisión: {stats['frames']} frames, {stats['bytes_sent']:,} bytes, "
+              f"{stats['clients']} espectadores al salir")
+    if autopilot is not None:
+        if not game.game_over:
+            runs.append({'seed': game.seed, 'score': game.score,
+                         'frames': sum(count for count, _ in recorder.runs),
+                         'speed': game.speed, 'cause': 'unfinished'})
+        stats = loop.stats()
+        print_report(report({'frames': stats['ticks'], 'elapsed': stats['elapsed'], 'runs': runs,
+                             'max_speed': max(max_speed, game.speed), 'events': dict(events.counts)}))
     pygame.quit()
     sys.exit()
 
 
+def spectate(host, port, renderer_name='sprites', display_size=None, smooth=False, fullscreen=False,
+             integer_scale=False):
+    """Espectador: dibuja la partida que transmite otro juego (--broadcast) o espectador.py serve."""
+    init(display_size=display_size, smooth=smooth, fullscreen=fullscreen, integer_scale=integer_scale)
+    pygame.display.set_caption("Dinosaurio - Espectador")
+    renderer = RENDERERS[renderer_name](screen, display)
+
+    def show(game_state):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return False
+        # Los frames llegan al ritmo de los ticks del servidor: sin interpolar
+        if not game_state.started:
+            renderer.draw_start_screen(game_state.width, game_state.height, game_state.high_score)
+        else:
+            renderer.render(game_state)
+        return True
+
+    try:
+        watch(host, port, show)
+    except ConnectionError as error:
+        print(f"No se pudo conectar con {host}:{port}: {error}")
+    pygame.quit()
+
+
+def parse_size(text):
+    """'WxH' -> (ancho, alto)."""
+    width, _, height = text.lower().partition('x')
+    return int(width), int(height)
+
+
+def parse_address(text):
+    """'[HOST:]PORT' -> (host, port); sin host, esta máquina."""
+    host, _, port = text.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Dinosaurio - Chrome Game")
+    parser.add_argument('--record', metavar='PATH',
+                        help="guarda la repetición de cada partida al terminar")
+    parser.add_argument('--renderer', choices=sorted(RENDERERS), default='basic',
+                        help="'cached' reutiliza capas y solo actualiza las zonas que cambian; "
+                             "'sprites' además dibuja las entidades desde un atlas")
+    parser.add_argument('--fps', type=int, default=FPS,
+                        help="frames por segundo de dibujo; 0 = sin límite")
+    parser.add_argument('--tick-rate', type=int, default=DEFAULT_TICK_RATE,
+                        help="ticks de lógica por segundo")
+    parser.add_argument('--max-catch-up', type=int, default=DEFAULT_MAX_TICKS_PER_FRAME,
+                        help="máximo de ticks recuperados en un frame atrasado")
+    parser.add_argument('--uncapped', action='store_true',
+                        help="un tick por frame sin límite de velocidad, para medir rendimiento")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="perfila cada fase y guarda los percentiles al salir (.csv o .json); "
+                             "F3 muestra el perfilador en pantalla")
+    parser.add_argument('--fair-spawns', action='store_true',
+                        help="obstáculos generados por adelantado y comprobados contra el salto")
+    parser.add_argument('--ai', action='store_true',
+                        help="juega el piloto automático; sin pantalla: autopiloto.py")
+    parser.add_argument('--start-score', type=int, default=0,
+                        help="con --ai, puntaje (y velocidad) con que empieza cada partida")
+    parser.add_argument('--ghost', metavar='PATH', action='append', default=[],
+                        help="corre contra una repetición grabada (se puede repetir); "
+                             "la partida usa su misma pista")
+    parser.add_argument('--bot', choices=sorted(POLICIES), action='append', default=[],
+                        help="añade un fantasma que juega con esa política (se puede repetir)")
+    parser.add_argument('--broadcast', metavar='PORT', type=int,
+                        help="transmite la partida por TCP a espectadores (ver espectador.py)")
+    parser.add_argument('--broadcast-host', default='127.0.0.1',
+                        help="dirección donde escucha --broadcast; 0.0.0.0 la abre a toda la red "
+                             "(la transmisión no tiene autenticación)")
+    parser.add_argument('--watch', metavar='[HOST:]PORT', type=parse_address,
+                        help="no juega: muestra la partida que transmite otro juego")
+    window = parser.add_mutually_exclusive_group()
+    window.add_argument('--display', metavar='WxH', type=parse_size,
+                        help=f"tamaño de la ventana; se dibuja a {WIDTH}x{HEIGHT} y se escala una vez "
+                             "por frame, con bandas si la proporción no coincide")
+    window.add_argument('--scale', type=float,
+                        help=f"ventana de {WIDTH}x{HEIGHT} multiplicado por este factor")
+    window.add_argument('--fullscreen', action='store_true',
+                        help="pantalla completa a la resolución del escritorio, escalada")
+    parser.add_argument('--smooth', action='store_true',
+                        help="escalado suavizado (más lento; sin él, píxeles nítidos)")
+    parser.add_argument('--integer-scale', action='store_true',
+                        help="escala por el mayor factor entero que cabe; así solo se escalan "
+                             "las zonas que cambian (--renderer cached/sprites)")
+    args = parser.parse_args()
+    display_size = args.display
+    if args.scale:
+        display_size = (round(WIDTH * args.scale), round(HEIGHT * args.scale))
+    if args.watch:
+        spectate(*args.watch, renderer_name=args.renderer, display_size=display_size,
+                 smooth=args.smooth, fullscreen=args.fullscreen, integer_scale=args.integer_scale)
+        sys.exit()
+    try:
+        ghosts, course = load_ghosts(args.ghost, args.bot)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.ghost and args.start_score:
+        parser.error("--start-score cambia la pista de los fantasmas grabados (--ghost)")
+    if args.start_score and not args.ai:
+        parser.error("--start-score requiere --ai")
+    if args.start_score and args.record:
+        parser.error("una partida que empieza en --start-score no se puede repetir (--record)")
+    main(args.record, args.renderer, args.fps, args.tick_rate, args.max_catch_up, args.uncapped,
+         args.profile, course.spawn_schedule if course else args.fair_spawns, args.ai, args.start_score,
+         ghosts, course.seed if course else None, args.broadcast, display_size, args.smooth,
+         args.fullscreen, args.integer_scale, args.broadcast_host)
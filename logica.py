@@ -1,8 +1,72 @@
 # game_logic.py
 import random
-import json
+from operator import attrgetter
+
+from colisiones import rects_overlap
+from eventos import (EVENT_CACTUS_DESTROYED, EVENT_DEATH, EVENT_HIGH_SCORE, EVENT_JUMP, EVENT_LAND,
+                     EVENT_POWERUP_EXPIRED, EVENT_POWERUP_PICKED, EVENT_SCORE, EVENT_SPEED_UP,
+                     EventBus)
+from persistencia import get_store
+
+# Acciones discretas para agentes (bots, simulaciones sin pantalla)
+ACTION_NONE = 0
+ACTION_JUMP = 1
+ACTION_DUCK = 2
+
+OBSTACLE_TYPES = ('cactus_small', 'cactus_large', 'cactus_group', 'cactus_triple', 'bird', 'pterodactyl')
+OBSTACLE_CODES = {name: code for code, name in enumerate(OBSTACLE_TYPES)}
+# Se mezcla con la semilla para el generador de efectos (GameEngine isolated_effects)
+EFFECTS_SEED = 0x5EED_EFFE
+# Alturas sobre el suelo a las que vuelan los enemigos aéreos
+BIRD_ALTITUDES = (0, 20, 40)
+PTERODACTYL_ALTITUDES = (50, 70)
+
+# Observación numérica de tamaño fijo (ver GameEngine.write_observation):
+# [dino y, vel_y, saltando, agachado, tiempo de power-up, velocidad] y, por
+# cada uno de los OBSERVATION_OBSTACLES obstáculos más cercanos por delante,
+# [x relativa al dinosaurio, y, ancho, alto, código de tipo + 1]; ceros si no hay.
+OBSERVATION_OBSTACLES = 2
+OBSERVATION_DINO_FIELDS = 6
+OBSERVATION_SIZE = OBSERVATION_DINO_FIELDS + 5 * OBSERVATION_OBSTACLES
+
+# Grupos de cambios de GameStateView (máscara de bits, ver changed_since)
+CHANGED_SCORE = 1 # score o high_score
+CHANGED_OBSTACLES = 2 # Apareció o desapareció algún obstáculo
+CHANGED_PHASE = 4 # Día, atardecer, noche o amanecer (ver day_phase)
+CHANGED_STATUS = 8 # started, paused, game_over o new_high_score_achieved
+CHANGED_ALL = CHANGED_SCORE | CHANGED_OBSTACLES | CHANGED_PHASE | CHANGED_STATUS
+
+class Entity:
+    """Base de las entidades del juego: atributos en __slots__ y estado plano.
+
+    get_state() devuelve los valores de __slots__ como una tupla y
+    set_state() los vuelve a asignar sobre el mismo objeto, lo que permite a
+    GameEngine.snapshot()/restore() copiar el juego sin deepcopy.
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._state_getter = attrgetter(*cls.__slots__)
+
+    def get_state(self):
+        return self._state_getter(self)
+
+    def set_state(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_state(cls, state):
+        entity = cls.__new__(cls)
+        entity.set_state(state)
+        return entity
+
+
+class Dino(Entity):
+    __slots__ = ('x', 'y', 'width', 'height', 'vel_y', 'jumping', 'ducking', 'ground', 'jump_force',
+                 'gravity', 'anim_timer', 'anim_frame', 'just_landed', 'powerup_active', 'powerup_timer')
 
-class Dino:
     def __init__(self, x=50, ground_y=300):
         self.x = x
         self.y = ground_y
@@ -70,17 +134,34 @@ class Dino:
             'height': self.height
         }
 
+    def hitbox(self):
+        """Igual que get_rect, pero como tupla (x, y, ancho, alto)."""
+        if self.ducking and not self.jumping:
+            return (self.x, self.y + 30, 55, 30)
+        return (self.x, self.y, self.width, self.height)
+
     def activate_powerup(self, duration=300): # 5 segundos a 60 FPS
         self.powerup_active = True
         self.powerup_timer = duration
     
 
-class Obstacle:
-    def __init__(self, x, obs_type, ground_y, speed=8):
+class Obstacle(Entity):
+    __slots__ = ('x', 'type', 'speed', 'destroyed', 'width', 'height', 'y', 'anim_timer', 'anim_frame')
+
+    def __init__(self, x, obs_type, ground_y, speed=8, rng=random, altitude=None):
+        self.reset(x, obs_type, ground_y, speed, rng, altitude)
+
+    def reset(self, x, obs_type, ground_y, speed=8, rng=random, altitude=None):
+        """Reinicia todos los campos, igual que al construirlo (ver Pool).
+
+        altitude fija la altura de vuelo de las aves; si es None se elige al azar.
+        """
         self.x = x
         self.type = obs_type
         self.speed = speed
         self.destroyed = False
+        self.anim_timer = 0 # Solo se usa en las aves
+        self.anim_frame = 0
         
         if 'cactus' in obs_type:
             self.width = 20
@@ -99,15 +180,15 @@ class Obstacle:
         elif obs_type == 'bird':
             self.width = 40
             self.height = 30
-            self.y = ground_y - random.choice([0, 20, 40]) # Varias alturas para el pájaro
-            self.anim_timer = 0
-            self.anim_frame = 0
+            if altitude is None:
+                altitude = rng.choice(BIRD_ALTITUDES) # Varias alturas para el pájaro
+            self.y = ground_y - altitude
         else:  # pterodactyl
             self.width = 45
             self.height = 25
-            self.y = ground_y - random.choice([50, 70]) # Vuela más alto que el pájaro
-            self.anim_timer = 0
-            self.anim_frame = 0
+            if altitude is None:
+                altitude = rng.choice(PTERODACTYL_ALTITUDES) # Vuela más alto que el pájaro
+            self.y = ground_y - altitude
             
     def update(self):
         self.x -= self.speed
@@ -128,6 +209,9 @@ class Obstacle:
             'width': self.width,
             'height': self.height
         }
+
+    def hitbox(self):
+        return (self.x, self.y, self.width, self.height)
     
     def off_screen(self):
         return self.x < -50 or self.y > 500 # También se elimina si cae fuera de la pantalla
@@ -138,8 +222,13 @@ class Obstacle:
             self.speed = 0 # Detener el movimiento horizontal
 
 
-class PowerUp:
+class PowerUp(Entity):
+    __slots__ = ('x', 'y', 'width', 'height', 'speed')
+
     def __init__(self, x, y):
+        self.reset(x, y)
+
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.width = 20
@@ -152,17 +241,25 @@ class PowerUp:
     def get_rect(self):
         return {'x': self.x, 'y': self.y, 'width': self.width, 'height': self.height}
 
+    def hitbox(self):
+        return (self.x, self.y, self.width, self.height)
+
     def off_screen(self):
         return self.x < -self.width
 
 
-class Cloud:
-    def __init__(self, x, y, speed=2):
+class Cloud(Entity):
+    __slots__ = ('x', 'y', 'speed', 'width', 'height')
+
+    def __init__(self, x, y, speed=2, rng=random):
+        self.reset(x, y, speed, rng)
+
+    def reset(self, x, y, speed=2, rng=random):
         self.x = x
         self.y = y
         self.speed = speed
-        self.width = random.randint(40, 80)
-        self.height = random.randint(15, 30)
+        self.width = rng.randint(40, 80)
+        self.height = rng.randint(15, 30)
 
     def update(self):
         self.x -= self.speed
@@ -171,7 +268,9 @@ class Cloud:
         return self.x < -self.width
 
 
-class Ground:
+class Ground(Entity):
+    __slots__ = ('x', 'y', 'speed', 'reset_point')
+
     def __init__(self, y=360, speed=8):
         self.x = 0
         self.y = y
@@ -183,14 +282,19 @@ class Ground:
         if self.x <= self.reset_point:
             self.x = 0
             
-class Particle:
-    def __init__(self, x, y):
+class Particle(Entity):
+    __slots__ = ('x', 'y', 'vx', 'vy', 'lifespan', 'size')
+
+    def __init__(self, x, y, rng=random):
+        self.reset(x, y, rng)
+
+    def reset(self, x, y, rng=random):
         self.x = x
         self.y = y
-        self.vx = random.uniform(-1, -0.5)
-        self.vy = random.uniform(-0.5, 0.5)
-        self.lifespan = random.randint(15, 30) # Duración en frames
-        self.size = random.randint(2, 4)
+        self.vx = rng.uniform(-1, -0.5)
+        self.vy = rng.uniform(-0.5, 0.5)
+        self.lifespan = rng.randint(15, 30) # Duración en frames
+        self.size = rng.randint(2, 4)
 
     def update(self):
         self.x += self.vx
@@ -198,29 +302,276 @@ class Particle:
         self.lifespan -= 1
 
 
-class Star:
-    def __init__(self, x, y, width, height):
-        self.x = random.randint(0, width)
-        self.y = random.randint(0, height // 2)
-        self.size = random.randint(1, 2)
-        self.blink_rate = random.randint(50, 150)
-        self.blink_timer = random.randint(0, self.blink_rate)
+class Star(Entity):
+    __slots__ = ('x', 'y', 'size', 'blink_rate', 'blink_timer')
+
+    def __init__(self, x, y, width, height, rng=random):
+        self.x = rng.randint(0, width)
+        self.y = rng.randint(0, height // 2)
+        self.size = rng.randint(1, 2)
+        self.blink_rate = rng.randint(50, 150)
+        self.blink_timer = rng.randint(0, self.blink_rate)
 
     def update(self):
         self.blink_timer = (self.blink_timer + 1) % self.blink_rate
 
+class Pool:
+    """Lista libre de entidades de un tipo.
+
+    acquire() reutiliza un objeto descartado llamando a su reset() con los
+    mismos argumentos que el constructor, y solo crea uno nuevo si la lista
+    está vacía; release() devuelve al pool las entidades que el motor ya no
+    usa. Así las partículas, obstáculos, nubes y power-ups no se crean y
+    destruyen en cada tick.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self, *args, **kwargs):
+        free = self.free
+        if free:
+            entity = free.pop()
+            entity.reset(*args, **kwargs)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.cls(*args, **kwargs)
+
+    def acquire_state(self, state):
+        """Como acquire, pero restaurando un estado de get_state()."""
+        if self.free:
+            entity = self.free.pop()
+            entity.set_state(state)
+            self.reused += 1
+            return entity
+        self.created += 1
+        return self.cls.from_state(state)
+
+    def release(self, entity):
+        self.free.append(entity)
+
+    def release_all(self, entities):
+        self.free.extend(entities)
+
+    def stats(self):
+        return {'created': self.created, 'reused': self.reused, 'free': len(self.free)}
+
+
+def _compact(entities, alive, pool):
+    """Quita de la lista, sin copiarla, las entidades con alive(entity) falso y las devuelve al pool."""
+    keep = 0
+    for entity in entities:
+        if alive(entity):
+            entities[keep] = entity
+            keep += 1
+        else:
+            pool.release(entity)
+    del entities[keep:]
+
+
+def _snapshot_list(entities):
+    """Estado plano de una lista de entidades (tupla de tuplas)."""
+    return tuple([entity.get_state() for entity in entities])
+
+
+def _restore_list(entities, states, cls, pool=None):
+    """Restaura una lista de entidades reutilizando los objetos que ya tiene.
+
+    Con pool, las entidades que sobran vuelven a él y las que faltan salen de él.
+    """
+    reused = min(len(entities), len(states))
+    for i in range(reused):
+        entities[i].set_state(states[i])
+    if len(states) > reused:
+        create = pool.acquire_state if pool is not None else cls.from_state
+        entities.extend(create(state) for state in states[reused:])
+    else:
+        if pool is not None:
+            pool.release_all(entities[reused:])
+        del entities[reused:]
+
+
+def _alive_particle(particle):
+    return particle.lifespan > 0
+
+
+def _on_screen(entity):
+    return not entity.off_screen()
+
+
+def day_phase(time_of_day, cycle_duration):
+    """0 de día, 1 al atardecer, 2 de noche y 3 al amanecer (los tramos del color del cielo)."""
+    progress = time_of_day / cycle_duration
+    if progress < 0.45:
+        return 0
+    elif progress < 0.55:
+        return 1
+    elif progress < 0.95:
+        return 2
+    return 3
+
+
+class GameStateView:
+    """Estado para renderizado que se reutiliza en cada frame.
+
+    GameEngine.get_game_state() devuelve siempre el mismo objeto, actualizado
+    en el sitio, en lugar de un diccionario nuevo. Se lee por atributo
+    (state.score), pero también acepta state['score'], state.get('ghosts') y
+    'ghosts' in state como el diccionario de antes; ghosts es None fuera de
+    carrera.RaceEngine.
+
+    Cada actualización (advance) incrementa frame y anota en cuál cambió por
+    última vez cada grupo CHANGED_*. changes son los de la última y
+    changed_since(flags, frame) dice si alguno cambió después de frame, así
+    cada consumidor guarda su propio frame y no depende de cuántas veces se
+    llamó a get_game_state entre medio.
+    """
+    KEYS = ('dino', 'ground', 'obstacles', 'clouds', 'powerups', 'particles', 'stars', 'score',
+            'high_score', 'started', 'new_high_score_achieved', 'paused', 'time_of_day',
+            'cycle_duration', 'game_over', 'width', 'height', 'ghosts')
+    _KEY_SET = frozenset(KEYS)
+    __slots__ = KEYS + ('phase', 'frame', 'changes', '_changed_at', '_score', '_high_score', '_status')
+
+    def __init__(self):
+        for name in self.KEYS:
+            setattr(self, name, None)
+        self.phase = None
+        self.frame = 0
+        self.changes = 0
+        self._changed_at = [0, 0, 0, 0] # Frame del último cambio de cada bit de CHANGED_*
+        self._score = self._high_score = self._status = None
+
+    def advance(self, changes=0):
+        """Cierra una actualización; changes son los cambios que solo conoce quien la hizo.
+
+        Los del puntaje, el estado y la fase del día se detectan aquí
+        comparando con la actualización anterior.
+        """
+        if self.score != self._score or self.high_score != self._high_score:
+            changes |= CHANGED_SCORE
+            self._score = self.score
+            self._high_score = self.high_score
+        status = (self.started | self.paused << 1 | self.game_over << 2
+                  | self.new_high_score_achieved << 3)
+        if status != self._status:
+            changes |= CHANGED_STATUS
+            self._status = status
+        phase = day_phase(self.time_of_day, self.cycle_duration)
+        if phase != self.phase:
+            changes |= CHANGED_PHASE
+            self.phase = phase
+        self.frame += 1
+        self.changes = changes
+        changed_at = self._changed_at
+        bit = 0
+        while changes:
+            if changes & 1:
+                changed_at[bit] = self.frame
+            changes >>= 1
+            bit += 1
+
+    def changed_since(self, flags, frame):
+        """Si algún grupo de flags cambió en una actualización posterior a frame."""
+        changed_at = self._changed_at
+        bit = 0
+        while flags:
+            if flags & 1 and changed_at[bit] > frame:
+                return True
+            flags >>= 1
+            bit += 1
+        return False
+
+    def copy_from(self, other):
+        """Copia en este objeto todos los valores de other (otro GameStateView)."""
+        for name in self.KEYS:
+            setattr(self, name, getattr(other, name))
+        self.phase = other.phase
+        self.frame = other.frame
+        self.changes = other.changes
+        self._changed_at[:] = other._changed_at
+        self._score, self._high_score, self._status = other._score, other._high_score, other._status
+        return self
+
+    def copy(self):
+        return GameStateView().copy_from(self)
+
+    @classmethod
+    def wrap(cls, state):
+        """state si ya es un GameStateView; si es un diccionario como el de antes, una vista con sus valores."""
+        if isinstance(state, GameStateView):
+            return state
+        view = cls()
+        for key, value in state.items():
+            if key in cls._KEY_SET:
+                setattr(view, key, value)
+        view.advance(CHANGED_ALL)
+        return view
+
+    # Compatibilidad con el diccionario que devolvía get_game_state. ghosts
+    # es la única clave opcional: con None no está (como fuera de una carrera)
+
+    def __getitem__(self, key):
+        if key not in self._KEY_SET or (key == 'ghosts' and self.ghosts is None):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self._KEY_SET:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self._KEY_SET and (key != 'ghosts' or self.ghosts is not None)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self else default
+
+    def keys(self):
+        return [name for name in self.KEYS if name in self]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+
 class GameEngine:
-    def __init__(self, width=800, height=400, sounds=None):
+    # Estado escalar que cambia durante la partida (ver snapshot)
+    _SNAPSHOT_FIELDS = ('speed', 'high_score', 'score', 'started', 'game_over', 'paused',
+                        'new_high_score_achieved', 'death_cause', 'time_of_day', 'seed',
+                        'next_speed_increase_score', 'spawn_timer', 'spawn_interval',
+                        'cloud_spawn_timer', 'cloud_spawn_interval')
+    _snapshot_getter = attrgetter(*_SNAPSHOT_FIELDS)
+
+    def __init__(self, width=800, height=400, *, events=None, data_file="game_data.json",
+                 seed=None, spawn_schedule=None, isolated_effects=False):
         self.width = width
         self.height = height
         self.ground_y = height - 100
         self.speed = 8
         self.high_score = 0
-        self.data_file = "game_data.json"
+        self.data_file = data_file # None desactiva la persistencia (simulaciones)
         self.speed_increase_interval = 10 # Aumentar velocidad cada 10 puntos
+        self.speed_increase = 0.5
         self.next_speed_increase_score = self.speed_increase_interval
         
-        self.sounds = sounds if sounds is not None else {}
+        # Salto, punto, muerte, etc. (ver eventos.py); el sonido es un suscriptor más
+        self.events = events if events is not None else EventBus()
+
+        # Generador propio: con la misma semilla la partida es reproducible
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        # Las partículas dependen de lo que hace el dinosaurio. Con
+        # isolated_effects salen de un generador aparte, así que los
+        # obstáculos de una semilla son los mismos se juegue como se juegue
+        # (necesario para correr contra fantasmas, ver carrera.py)
+        self.isolated_effects = isolated_effects
+        self.effects_rng = random.Random(self.seed ^ EFFECTS_SEED) if isolated_effects else self.rng
         
         self.dino = Dino(50, self.ground_y)
         self.ground = Ground(height - 40, speed=self.speed)
@@ -228,12 +579,18 @@ class GameEngine:
         self.clouds = []
         self.powerups = []
         self.particles = []
-        self.stars = [Star(0, 0, width, height) for _ in range(50)] # Generar 50 estrellas
+        self.stars = [Star(0, 0, width, height, self.rng) for _ in range(50)] # Generar 50 estrellas
+        self.pools = self._new_pools()
         self.score = 0
         self.started = False
         self.game_over = False
         self.paused = False
         self.new_high_score_achieved = False
+        self.death_cause = None # Tipo del obstáculo que terminó la partida
+        # Cuenta cada vez que se añaden o quitan obstáculos (ver get_game_state)
+        self.obstacle_changes = 0
+        self._state_view = None
+        self._state_obstacle_changes = 0
 
         # Ciclo día-noche
         self.time_of_day = 0
@@ -243,25 +600,35 @@ class GameEngine:
         
         self.spawn_timer = 0
         self.cloud_spawn_timer = 0
-        self.cloud_spawn_interval = random.randint(120, 240)
-        self.spawn_interval = random.randint(60, 120)
+        self.cloud_spawn_interval = self.rng.randint(120, 240)
+        self.spawn_interval = self.rng.randint(60, 120)
+        # Con un generador.SpawnSchedule los obstáculos salen de su cola en
+        # lugar de elegirse al azar cuando vence el temporizador
+        self.spawn_schedule = spawn_schedule
+        if spawn_schedule is not None:
+            self.spawn_interval = spawn_schedule.start(self)
 
     def load_data(self):
-        """Carga datos del juego desde un archivo JSON."""
-        try:
-            with open(self.data_file, 'r') as f:
-                data = json.load(f)
-                self.high_score = data.get("high_score", 0)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.high_score = 0
+        """Carga datos del juego desde un archivo JSON.
+
+        El archivo se lee una sola vez por proceso (ver persistencia.DataStore);
+        los reinicios usan la copia en memoria.
+        """
+        if self.data_file is None:
+            return
+        self.high_score = get_store(self.data_file).load().get("high_score", 0)
 
     def save_data(self):
-        """Guarda datos del juego en un archivo JSON."""
-        data = {
-            "high_score": self.high_score
-        }
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=4)
+        """Guarda datos del juego en un archivo JSON, en segundo plano."""
+        if self.data_file is None:
+            return
+        get_store(self.data_file).save(high_score=self.high_score)
+
+    def record_run(self):
+        """Añade la partida terminada al historial persistente."""
+        if self.data_file is None:
+            return
+        get_store(self.data_file).record_run(self.score, self.seed, self.death_cause)
         
     def toggle_pause(self):
         """Activa o desactiva la pausa del juego."""
@@ -274,31 +641,57 @@ class GameEngine:
 
     def handle_jump(self):
         if self.started and not self.game_over and not self.paused:
-            if self.sounds.get('jump') and not self.dino.jumping:
-                self.sounds['jump'].play()
+            if self.events.wants & EVENT_JUMP and not self.dino.jumping:
+                self.events.emit(EVENT_JUMP)
             self.dino.jump()
             
     def handle_duck(self, ducking):
         if self.started and not self.game_over and not self.paused:
             self.dino.duck(ducking)
             
+    def apply_action(self, action):
+        """Aplica una acción discreta (ACTION_NONE, ACTION_JUMP o ACTION_DUCK)."""
+        self.handle_duck(action == ACTION_DUCK)
+        if action == ACTION_JUMP:
+            self.handle_jump()
+
     def restart(self):
         """Reinicia el estado del juego."""
-        new_game = GameEngine(self.width, self.height, self.sounds)
+        # Cada partida nueva recibe su propia semilla, derivada de la anterior
+        new_game = type(self)(self.width, self.height, data_file=self.data_file,
+                              seed=self._next_seed(), spawn_schedule=self.spawn_schedule,
+                              isolated_effects=self.isolated_effects)
         new_game.high_score = self.high_score # Mantener la puntuación alta
         new_game.start_game() # El juego reiniciado comienza inmediatamente
+        self._release_entities() # Los pools se conservan entre partidas
         self.dino = new_game.dino
         self.ground = new_game.ground
         self.obstacles = new_game.obstacles
         self.clouds = new_game.clouds
-        self.particles = []
+        self.particles = new_game.particles
         self.stars = new_game.stars
         self.score = new_game.score
         self.game_over = new_game.game_over
         self.paused = new_game.paused
         self.time_of_day = 0 # Reiniciar el ciclo
         self.new_high_score_achieved = False
+        self.death_cause = None
+        # Todo el estado que depende de la semilla, para que la partida se pueda repetir
+        self.seed = new_game.seed
+        self.rng = new_game.rng
+        self.effects_rng = new_game.effects_rng
+        self.powerups = new_game.powerups
+        self.speed = new_game.speed
+        self.next_speed_increase_score = new_game.next_speed_increase_score
+        self.spawn_timer = new_game.spawn_timer
+        self.spawn_interval = new_game.spawn_interval
+        self.cloud_spawn_timer = new_game.cloud_spawn_timer
+        self.cloud_spawn_interval = new_game.cloud_spawn_interval
         
+    def _next_seed(self):
+        """Semilla de la partida que sigue a esta (ver restart)."""
+        return self.rng.randrange(2**32)
+
     def check_collision(self, rect1, rect2):
         """Verifica colisión entre dos rectángulos"""
         return (rect1['x'] < rect2['x'] + rect2['width'] and
@@ -306,6 +699,94 @@ class GameEngine:
                 rect1['y'] < rect2['y'] + rect2['height'] and
                 rect1['y'] + rect1['height'] > rect2['y'])
         
+    def snapshot(self):
+        """Devuelve una copia plana (tuplas) del estado de la partida.
+
+        No incluye los sonidos ni nada que no cambie durante la partida, así
+        que es mucho más barata que copy.deepcopy del motor.
+        """
+        schedule = self.spawn_schedule.get_state() if self.spawn_schedule is not None else None
+        effects = self.effects_rng.getstate() if self.isolated_effects else None
+        return (self._snapshot_getter(self), self.rng.getstate(),
+                self.dino.get_state(), self.ground.get_state(), self._snapshot_entities(), schedule,
+                effects)
+
+    def restore(self, snap):
+        """Vuelve al estado de snapshot() reutilizando los objetos existentes."""
+        fields, rng_state, dino, ground, entities, schedule, effects = snap
+        for name, value in zip(self._SNAPSHOT_FIELDS, fields):
+            setattr(self, name, value)
+        self.rng.setstate(rng_state)
+        if effects is not None:
+            self.effects_rng.setstate(effects)
+        if schedule is not None:
+            self.spawn_schedule.set_state(schedule)
+        self.dino.set_state(dino)
+        self.ground.set_state(ground)
+        self._restore_entities(entities)
+        self.obstacle_changes += 1
+
+    def fork(self):
+        """Crea un motor independiente en el mismo estado (para búsquedas)."""
+        clone = type(self).__new__(type(self))
+        clone.__dict__.update(self.__dict__) # Comparte las constantes
+        # Sin los métodos envueltos en la instancia (p. ej. perfilador.Profiler.attach):
+        # están ligados a self y harían avanzar el motor original
+        for name in [name for name in self.__dict__ if callable(getattr(type(self), name, None))]:
+            del clone.__dict__[name]
+        clone.events = EventBus() # Lo que pase en el clon no suena ni se cuenta
+        clone.rng = random.Random()
+        clone.effects_rng = random.Random() if self.isolated_effects else clone.rng
+        clone.dino = Dino.__new__(Dino)
+        clone.ground = Ground.__new__(Ground)
+        clone.pools = clone._new_pools()
+        clone._state_view = None # El clon tiene su propio estado para renderizado
+        if self.spawn_schedule is not None:
+            clone.spawn_schedule = self.spawn_schedule.copy()
+        clone._reset_entities()
+        clone.restore(self.snapshot())
+        return clone
+
+    def _snapshot_entities(self):
+        return (_snapshot_list(self.obstacles), _snapshot_list(self.clouds),
+                _snapshot_list(self.powerups), _snapshot_list(self.particles),
+                (self.stars, tuple([star.blink_timer for star in self.stars])))
+
+    def _restore_entities(self, entities):
+        obstacles, clouds, powerups, particles, stars = entities
+        pools = self.pools
+        _restore_list(self.obstacles, obstacles, Obstacle, pools['obstacles'])
+        _restore_list(self.clouds, clouds, Cloud, pools['clouds'])
+        _restore_list(self.powerups, powerups, PowerUp, pools['powerups'])
+        _restore_list(self.particles, particles, Particle, pools['particles'])
+        # Las estrellas no se mueven: basta con la lista original y sus temporizadores
+        star_list, blink_timers = stars
+        if self.stars is not star_list:
+            self.stars = [Star.from_state(star.get_state()) for star in star_list]
+        for star, blink_timer in zip(self.stars, blink_timers):
+            star.blink_timer = blink_timer
+
+    def _new_pools(self):
+        return {'obstacles': Pool(Obstacle), 'clouds': Pool(Cloud),
+                'powerups': Pool(PowerUp), 'particles': Pool(Particle)}
+
+    def _release_entities(self):
+        """Devuelve a los pools todas las entidades en juego (usado por restart)."""
+        for name, pool in self.pools.items():
+            pool.release_all(getattr(self, name))
+
+    def pool_stats(self):
+        """Objetos creados, reutilizados y libres de cada pool de entidades."""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def _reset_entities(self):
+        """Asigna colecciones de entidades nuevas y vacías (usado por fork)."""
+        self.obstacles = []
+        self.clouds = []
+        self.powerups = []
+        self.particles = []
+        self.stars = []
+
     def update(self):
         if not self.started or self.game_over or self.paused:
             return
@@ -313,131 +794,285 @@ class GameEngine:
         # Actualizar ciclo día-noche
         self.time_of_day = (self.time_of_day + 1) % self.cycle_duration
 
-        # Actualizar dinosaurio
-        self.dino.update()
-        
-        # Generar partículas al aterrizar
-        if hasattr(self.dino, 'just_landed') and self.dino.just_landed:
-            for _ in range(10): # Explosión de partículas
-                self.particles.append(Particle(self.dino.x + 10, self.dino.y + self.dino.height))
-            self.dino.just_landed = False
+        self._update_dino()
 
         # Actualizar suelo
         self.ground.update()
-        
-        # Generar nubes
-        self.cloud_spawn_timer += 1
-        if self.cloud_spawn_timer > self.cloud_spawn_interval:
-            cloud_y = random.randint(50, 150)
-            self.clouds.append(Cloud(self.width, cloud_y))
-            self.cloud_spawn_timer = 0
-            self.cloud_spawn_interval = random.randint(120, 300)
 
-        # Actualizar nubes
-        for cloud in self.clouds[:]:
-            cloud.update()
-            if cloud.off_screen():
-                self.clouds.remove(cloud)
+        self._spawn_clouds()
+        self._update_clouds()
 
         # Generar partículas al correr
         if not self.dino.jumping and not self.dino.ducking and self.dino.anim_timer % 4 == 0:
-            self.particles.append(Particle(self.dino.x, self.dino.y + self.dino.height))
+            self._emit_particles(self.dino.x, self.dino.y + self.dino.height, 1)
+        self._update_particles()
+
+        self._update_stars()
+        self._update_powerups()
+        self._spawn_obstacles()
+        self._update_obstacles()
+
+        # Los eventos del tick se entregan juntos
+        if self.events.pending:
+            self.events.dispatch()
+
+    # Fases de update. Cada una puede reemplazarse en un motor alternativo
+    # (ver motor_arrays.ArrayGameEngine) sin cambiar el orden de la lógica.
+
+    def _update_dino(self):
+        """Actualiza el dinosaurio y genera el polvo del aterrizaje."""
+        dino = self.dino
+        had_powerup = dino.powerup_active
+        dino.update()
+        events = self.events
+        if had_powerup and not dino.powerup_active and events.wants & EVENT_POWERUP_EXPIRED:
+            events.emit(EVENT_POWERUP_EXPIRED)
+        
+        # Generar partículas al aterrizar
+        if dino.just_landed:
+            self._emit_particles(dino.x + 10, dino.y + dino.height, 10) # Explosión de partículas
+            dino.just_landed = False
+            if events.wants & EVENT_LAND:
+                events.emit(EVENT_LAND)
+
+    def _emit_particles(self, x, y, count):
+        """Genera partículas de polvo en la posición indicada."""
+        acquire = self.pools['particles'].acquire
+        for _ in range(count):
+            self.particles.append(acquire(x, y, self.effects_rng))
 
-        # Actualizar partículas
-        for p in self.particles[:]:
+    def _update_particles(self):
+        for p in self.particles:
             p.update()
-            if p.lifespan <= 0:
-                self.particles.remove(p)
+        _compact(self.particles, _alive_particle, self.pools['particles'])
 
+    def _spawn_clouds(self):
+        self.cloud_spawn_timer += 1
+        if self.cloud_spawn_timer > self.cloud_spawn_interval:
+            cloud_y = self.rng.randint(50, 150)
+            self._add_cloud(self.pools['clouds'].acquire(self.width, cloud_y, rng=self.rng))
+            self.cloud_spawn_timer = 0
+            self.cloud_spawn_interval = self.rng.randint(120, 300)
+
+    def _add_cloud(self, cloud):
+        self.clouds.append(cloud)
+
+    def _update_clouds(self):
+        for cloud in self.clouds:
+            cloud.update()
+        _compact(self.clouds, _on_screen, self.pools['clouds'])
+
+    def _update_stars(self):
         for star in self.stars:
             star.update()
 
-        # Generar y actualizar power-ups
-        if random.random() < 0.001 and not self.dino.powerup_active: # Probabilidad baja de aparecer
-            self.powerups.append(PowerUp(self.width, self.ground_y + 40))
+    def _update_powerups(self):
+        """Genera power-ups y comprueba si el dinosaurio los recoge."""
+        if self.rng.random() < 0.001 and not self.dino.powerup_active: # Probabilidad baja de aparecer
+            self.powerups.append(self.pools['powerups'].acquire(self.width, self.ground_y + 40))
         
-        for pu in self.powerups[:]:
+        dino_box = self.dino.hitbox()
+        powerups = self.powerups
+        pool = self.pools['powerups']
+        keep = 0
+        for pu in powerups:
             pu.update()
-            if self.check_collision(self.dino.get_rect(), pu.get_rect()):
+            if rects_overlap(dino_box, pu.hitbox()):
                 self.dino.activate_powerup()
-                self.powerups.remove(pu)
+                pool.release(pu)
+                if self.events.wants & EVENT_POWERUP_PICKED:
+                    self.events.emit(EVENT_POWERUP_PICKED)
             elif pu.off_screen():
-                self.powerups.remove(pu)
+                pool.release(pu)
+            else:
+                powerups[keep] = pu
+                keep += 1
+        del powerups[keep:]
 
-        # Generar obstáculos
+    def _spawn_obstacles(self):
         self.spawn_timer += 1
-        if self.spawn_timer > self.spawn_interval:
+        if self.spawn_timer > self.spawn_interval and self.spawn_schedule is not None:
+            pattern, self.spawn_interval = self.spawn_schedule.pop()
+            acquire = self.pools['obstacles'].acquire
+            for dx, obs_type, altitude in pattern:
+                self._add_obstacle(acquire(self.width + dx, obs_type, self.ground_y,
+                                           speed=self.speed, altitude=altitude))
+            self.spawn_timer = 0
+        elif self.spawn_timer > self.spawn_interval:
             # Lógica de generación de obstáculos mejorada
-            choice = random.random()
+            choice = self.rng.random()
             if choice < 0.6: # 60% de probabilidad de cactus
-                obs_type = random.choice(['cactus_small', 'cactus_large', 'cactus_group', 'cactus_triple'])
+                obs_type = self.rng.choice(['cactus_small', 'cactus_large', 'cactus_group', 'cactus_triple'])
             elif choice < 0.85: # 25% de probabilidad de enemigos aéreos
-                obs_type = random.choice(['bird', 'pterodactyl'])
+                obs_type = self.rng.choice(['bird', 'pterodactyl'])
             else: # 15% de probabilidad de grupos de pájaros
-                num_birds = random.choice([2, 3])
+                num_birds = self.rng.choice([2, 3])
                 for i in range(num_birds):
                     # Añade pájaros con un pequeño desfase para que no estén superpuestos
                     bird_x = self.width + (i * 80)
-                    self.obstacles.append(Obstacle(bird_x, 'bird', self.ground_y, speed=self.speed))
+                    self._add_obstacle(self.pools['obstacles'].acquire(
+                        bird_x, 'bird', self.ground_y, speed=self.speed, rng=self.rng))
                 obs_type = None # No generar un obstáculo adicional
 
             if obs_type:
-                self.obstacles.append(Obstacle(self.width, obs_type, self.ground_y, speed=self.speed))
+                self._add_obstacle(self.pools['obstacles'].acquire(
+                    self.width, obs_type, self.ground_y, speed=self.speed, rng=self.rng))
             self.spawn_timer = 0
-            self.spawn_interval = random.randint(60, 120)
-            
-        # Actualizar obstáculos
-        for obs in self.obstacles[:]:
+            self.spawn_interval = self.rng.randint(60, 120)
+
+    def _add_obstacle(self, obstacle):
+        self.obstacles.append(obstacle)
+        self.obstacle_changes += 1
+
+    def _score_point(self):
+        """Suma un punto por obstáculo superado y sube la velocidad si toca."""
+        self.score += 1
+        events = self.events
+        if events.wants & EVENT_SCORE:
+            events.emit(EVENT_SCORE, self.score)
+
+        # Aumentar velocidad
+        if self.score >= self.next_speed_increase_score:
+            self.speed += self.speed_increase
+            self.ground.speed = self.speed
+            self.next_speed_increase_score += self.speed_increase_interval
+            if events.wants & EVENT_SPEED_UP:
+                events.emit(EVENT_SPEED_UP, self.speed)
+
+    def _end_game(self, cause):
+        """Termina la partida por un choque con un obstáculo de tipo cause."""
+        self.game_over = True
+        self.death_cause = cause
+        events = self.events
+        if self.score > self.high_score:
+            self.high_score = self.score
+            self.new_high_score_achieved = True
+            if events.wants & EVENT_HIGH_SCORE:
+                events.emit(EVENT_HIGH_SCORE, self.high_score)
+        self.record_run()
+        self.save_data()
+        if events.wants & EVENT_DEATH:
+            events.emit(EVENT_DEATH, cause)
+
+    def _update_obstacles(self):
+        """Mueve los obstáculos, suma puntos y verifica colisiones."""
+        dino_box = self.dino.hitbox()
+        dino_left = dino_box[0]
+        dino_right = dino_left + dino_box[2]
+        obstacles = self.obstacles
+        pool = self.pools['obstacles']
+        keep = 0
+        for obs in obstacles:
             obs.update()
+            removed = False
             if obs.off_screen() and not obs.destroyed:
-                self.obstacles.remove(obs)
+                removed = True
                 if not self.game_over:
-                    self.score += 1
-                    if self.sounds.get('point'):
-                        self.sounds['point'].play()
-
-                    # Aumentar velocidad
-                    if self.score >= self.next_speed_increase_score:
-                        self.speed += 0.5
-                        self.ground.speed = self.speed
-                        self.next_speed_increase_score += self.speed_increase_interval
+                    self._score_point()
                 
-            # Verificar colisión
-            if not obs.destroyed and self.check_collision(self.dino.get_rect(), obs.get_rect()):
+            # Verificar colisión: primero se descarta por x, sin crear la hitbox
+            if (not obs.destroyed and obs.x < dino_right and obs.x + obs.width > dino_left
+                    and rects_overlap(dino_box, obs.hitbox())):
                 if self.dino.powerup_active and 'cactus' in obs.type:
                     obs.destroy()
-                    # Aquí podrías añadir un sonido de "romper"
+                    if self.events.wants & EVENT_CACTUS_DESTROYED:
+                        self.events.emit(EVENT_CACTUS_DESTROYED, obs.type)
                 else:
-                    self.game_over = True
-                    if self.score > self.high_score:
-                        self.high_score = self.score
-                        self.new_high_score_achieved = True
-                        if self.sounds.get('highscore'):
-                            self.sounds['highscore'].play()
-                    self.save_data()
-                    if self.sounds.get('die'):
-                        self.sounds['die'].play()
+                    self._end_game(obs.type)
             elif obs.destroyed and obs.off_screen():
-                self.obstacles.remove(obs)
+                removed = True
+
+            # Compactar en el sitio en lugar de copiar la lista y usar remove
+            if removed:
+                pool.release(obs)
+            else:
+                obstacles[keep] = obs
+                keep += 1
+        if keep < len(obstacles):
+            del obstacles[keep:]
+            self.obstacle_changes += 1
                 
+    def write_observation(self, out):
+        """Escribe la observación numérica en out (p. ej. una fila float32 de OBSERVATION_SIZE).
+
+        No crea listas ni diccionarios: los obstáculos más cercanos se eligen
+        con pasadas de mínimo sobre la lista, que tiene pocos elementos.
+        """
+        dino = self.dino
+        out[0] = dino.y
+        out[1] = dino.vel_y
+        out[2] = dino.jumping
+        out[3] = dino.ducking
+        out[4] = dino.powerup_timer if dino.powerup_active else 0
+        out[5] = self.speed
+
+        obstacles = self.obstacles
+        dino_x = dino.x
+        last_x = float('-inf')
+        last_i = -1
+        base = OBSERVATION_DINO_FIELDS
+        for _ in range(OBSERVATION_OBSTACLES):
+            # El siguiente por (x, posición en la lista) después del ya elegido
+            best = None
+            best_i = -1
+            for i, obs in enumerate(obstacles):
+                x = obs.x
+                if obs.destroyed or x + obs.width <= dino_x:
+                    continue # Ya superado o destruido
+                if (x > last_x or (x == last_x and i > last_i)) and (best is None or x < best.x):
+                    best = obs
+                    best_i = i
+            if best is None:
+                for j in range(base, OBSERVATION_SIZE):
+                    out[j] = 0
+                break
+            out[base] = best.x - dino_x
+            out[base + 1] = best.y
+            out[base + 2] = best.width
+            out[base + 3] = best.height
+            out[base + 4] = OBSTACLE_CODES[best.type] + 1
+            last_x = best.x
+            last_i = best_i
+            base += 5
+        return out
+
     def get_game_state(self):
-        """Retorna el estado completo del juego para renderizado"""
-        return {
-            'dino': self.dino,
-            'ground': self.ground,
-            'obstacles': self.obstacles,
-            'clouds': self.clouds,
-            'powerups': self.powerups,
-            'particles': self.particles,
-            'stars': self.stars,
-            'score': self.score,
-            'high_score': self.high_score,
-            'started': self.started,
-            'new_high_score_achieved': self.new_high_score_achieved,
-            'paused': self.paused,
-            'time_of_day': self.time_of_day,
-            'cycle_duration': self.cycle_duration,
-            'game_over': self.game_over,
-            'width': self.width,
-            'height': self.height
-        }
\ No newline at end of file
+        """Retorna el estado del juego para renderizado.
+
+        Es siempre el mismo GameStateView, actualizado en el sitio: quien lo
+        necesite de un tick anterior debe copiarlo (fork o copy()).
+        """
+        state = self._state_view
+        if state is None:
+            state = self._state_view = GameStateView()
+        changes = 0
+        if self.obstacles is not state.obstacles or self.obstacle_changes != self._state_obstacle_changes:
+            changes = CHANGED_OBSTACLES
+            self._state_obstacle_changes = self.obstacle_changes
+        state.dino = self.dino
+        state.ground = self.ground
+        state.obstacles = self.obstacles
+        state.clouds = self.clouds
+        state.powerups = self.powerups
+        state.particles = self.particles
+        state.stars = self.stars
+        state.score = self.score
+        state.high_score = self.high_score
+        state.started = self.started
+        state.new_high_score_achieved = self.new_high_score_achieved
+        state.paused = self.paused
+        state.time_of_day = self.time_of_day
+        state.cycle_duration = self.cycle_duration
+        state.game_over = self.game_over
+        state.width = self.width
+        state.height = self.height
+        state.advance(changes)
+        return state
+
+
+
+def write_observations(engines, out):
+    """Observaciones de varios motores en las filas de out, un arreglo (N, OBSERVATION_SIZE)."""
+    for i, engine in enumerate(engines):
+        engine.write_observation(out[i])
+    return out
@@ -0,0 +1,291 @@
+# motor_arrays.py
+"""Motor alternativo que guarda las entidades como arrays de NumPy.
+
+ArrayGameEngine reemplaza las listas de objetos Obstacle, Particle, Cloud y
+Star por columnas contiguas ("structure of arrays"). Las posiciones avanzan
+en bloque y las entidades retiradas se eliminan con máscaras compactando los
+arrays en su lugar, sin el list.remove O(n²) del motor original.
+"""
+import numpy as np
+
+from eventos import EVENT_CACTUS_DESTROYED
+from logica import GameEngine, OBSTACLE_CODES, OBSTACLE_TYPES, PowerUp, _snapshot_list, _restore_list
+
+CACTUS_CODES = [OBSTACLE_CODES[name] for name in OBSTACLE_TYPES if 'cactus' in name]
+FLYING_CODES = [OBSTACLE_CODES['bird'], OBSTACLE_CODES['pterodactyl']]
+
+
+class EntityRow:
+    """Vista de una fila de EntityArrays con acceso por atributos."""
+    __slots__ = ('_arrays', '_index')
+
+    def __init__(self, arrays, index):
+        self._arrays = arrays
+        self._index = index
+
+    def __getattr__(self, name):
+        arrays = self._arrays
+        value = arrays.data[name][self._index].item()
+        labels = arrays.labels.get(name)
+        return labels[value] if labels is not None else value
+
+
+class EntityArrays:
+    """Columnas de NumPy para un tipo de entidad, con capacidad creciente.
+
+    Se comporta como una secuencia de solo lectura de EntityRow, de modo que
+    get_game_state() y el renderizador pueden iterarla igual que una lista.
+    """
+
+    def __init__(self, fields, capacity=32, labels=None):
+        self.count = 0
+        self.capacity = capacity
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in fields.items()}
+        self.labels = labels or {}
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield EntityRow(self, i)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return EntityRow(self, index)
+
+    def __getattr__(self, name):
+        # Acceso a una columna activa: arrays.x -> data['x'][:count]
+        try:
+            return self.__dict__['data'][name][:self.count]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def _reserve(self, extra):
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2)
+        for name, column in self.data.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            self.data[name] = grown
+        self.capacity = capacity
+
+    def append(self, **values):
+        """Añade una entidad y devuelve su índice."""
+        self._reserve(1)
+        index = self.count
+        for name, value in values.items():
+            self.data[name][index] = value
+        self.count += 1
+        return index
+
+    def extend(self, count, **columns):
+        """Añade count entidades a partir de columnas (escalares o arrays)."""
+        self._reserve(count)
+        start, end = self.count, self.count + count
+        for name, values in columns.items():
+            self.data[name][start:end] = values
+        self.count = end
+
+    def retain(self, keep):
+        """Conserva solo las filas marcadas en keep, compactando en su lugar."""
+        kept = int(np.count_nonzero(keep))
+        if kept == self.count:
+            return
+        for column in self.data.values():
+            column[:kept] = column[:self.count][keep]
+        self.count = kept
+
+    def clear(self):
+        self.count = 0
+
+    def snapshot(self):
+        """Copia de las filas activas de cada columna."""
+        count = self.count
+        return count, tuple([column[:count].copy() for column in self.data.values()])
+
+    def restore(self, snap):
+        """Vuelve a un snapshot() copiando sobre los arrays existentes."""
+        count, columns = snap
+        self.count = 0
+        self._reserve(count)
+        for column, saved in zip(self.data.values(), columns):
+            column[:count] = saved
+        self.count = count
+
+
+def _particle_arrays():
+    return EntityArrays({'x': np.float64, 'y': np.float64, 'vx': np.float64, 'vy': np.float64,
+                         'lifespan': np.int32, 'size': np.int32}, capacity=256)
+
+
+def _cloud_arrays():
+    return EntityArrays({'x': np.float64, 'y': np.float64, 'speed': np.float64,
+                         'width': np.int32, 'height': np.int32})
+
+
+def _obstacle_arrays():
+    return EntityArrays({'x': np.float64, 'y': np.float64, 'width': np.int32, 'height': np.int32,
+                         'speed': np.float64, 'type': np.int8, 'destroyed': np.bool_,
+                         'anim_timer': np.int32, 'anim_frame': np.int32},
+                        labels={'type': OBSTACLE_TYPES})
+
+
+def _star_arrays(capacity):
+    return EntityArrays({'x': np.int32, 'y': np.int32, 'size': np.int32,
+                         'blink_rate': np.int32, 'blink_timer': np.int32}, capacity=capacity)
+
+
+class ArrayGameEngine(GameEngine):
+    """GameEngine con obstáculos, partículas, nubes y estrellas en arrays.
+
+    Consume el generador self.rng en el mismo orden que GameEngine, así que
+    con la misma semilla produce la misma partida. get_game_state() mantiene
+    sus claves; las listas de entidades se sustituyen por EntityArrays.
+    """
+
+    def __init__(self, width=800, height=400, *, events=None, data_file="game_data.json",
+                 seed=None, spawn_schedule=None, isolated_effects=False):
+        super().__init__(width, height, events=events, data_file=data_file, seed=seed,
+                         spawn_schedule=spawn_schedule, isolated_effects=isolated_effects)
+        self.obstacles = _obstacle_arrays()
+        self.clouds = _cloud_arrays()
+        self.particles = _particle_arrays()
+
+        # Las estrellas se crean igual que en el motor base y se copian a columnas
+        stars = _star_arrays(len(self.stars))
+        for star in self.stars:
+            stars.append(x=star.x, y=star.y, size=star.size,
+                         blink_rate=star.blink_rate, blink_timer=star.blink_timer)
+        self.stars = stars
+
+    def _snapshot_entities(self):
+        return (self.obstacles.snapshot(), self.clouds.snapshot(),
+                _snapshot_list(self.powerups), self.particles.snapshot(), self.stars.snapshot())
+
+    def _restore_entities(self, entities):
+        obstacles, clouds, powerups, particles, stars = entities
+        self.obstacles.restore(obstacles)
+        self.clouds.restore(clouds)
+        _restore_list(self.powerups, powerups, PowerUp, self.pools['powerups'])
+        self.particles.restore(particles)
+        self.stars.restore(stars)
+
+    def _release_entities(self):
+        # Solo los power-ups son objetos; el resto son columnas
+        self.pools['powerups'].release_all(self.powerups)
+
+    def _reset_entities(self):
+        self.obstacles = _obstacle_arrays()
+        self.clouds = _cloud_arrays()
+        self.powerups = []
+        self.particles = _particle_arrays()
+        self.stars = _star_arrays(self.stars.capacity)
+
+    def _emit_particles(self, x, y, count):
+        # Mismo orden de tiradas que Particle.__init__
+        particles = self.particles
+        particles._reserve(count)
+        data = particles.data
+        rng = self.effects_rng
+        for i in range(particles.count, particles.count + count):
+            data['x'][i] = x
+            data['y'][i] = y
+            data['vx'][i] = rng.uniform(-1, -0.5)
+            data['vy'][i] = rng.uniform(-0.5, 0.5)
+            data['lifespan'][i] = rng.randint(15, 30) # Duración en frames
+            data['size'][i] = rng.randint(2, 4)
+        particles.count += count
+
+    def _update_particles(self):
+        p = self.particles
+        if not p.count:
+            return
+        # Se usan variables locales: "p.x += ..." reasignaría el atributo
+        x, y, lifespan = p.x, p.y, p.lifespan
+        x += p.vx
+        y += p.vy
+        lifespan -= 1
+        p.retain(lifespan > 0)
+
+    def _add_cloud(self, cloud):
+        self.clouds.append(x=cloud.x, y=cloud.y, speed=cloud.speed,
+                           width=cloud.width, height=cloud.height)
+        self.pools['clouds'].release(cloud) # Ya copiada a las columnas
+
+    def _update_clouds(self):
+        c = self.clouds
+        if not c.count:
+            return
+        x = c.x
+        x -= c.speed
+        c.retain(x >= -c.width)
+
+    def _update_stars(self):
+        s = self.stars
+        np.remainder(s.blink_timer + 1, s.blink_rate, out=s.blink_timer)
+
+    def _add_obstacle(self, obstacle):
+        self.obstacles.append(x=obstacle.x, y=obstacle.y, width=obstacle.width,
+                              height=obstacle.height, speed=obstacle.speed,
+                              type=OBSTACLE_CODES[obstacle.type], destroyed=False,
+                              anim_timer=0, anim_frame=0)
+        self.obstacle_changes += 1
+        self.pools['obstacles'].release(obstacle)
+
+    def _update_obstacles(self):
+        o = self.obstacles
+        if not o.count:
+            return
+        # Movimiento (Obstacle.update)
+        x = o.x
+        x -= o.speed
+        flying = np.isin(o.type, FLYING_CODES)
+        anim_timer = o.anim_timer
+        anim_timer += flying
+        flip = anim_timer > 10 # Cambiar de frame cada 10 ticks
+        if flip.any():
+            anim_frame = o.anim_frame
+            anim_frame[flip] = 1 - anim_frame[flip]
+            anim_timer[flip] = 0
+        was_destroyed = o.destroyed.copy()
+        y = o.y
+        y[was_destroyed] += 2 # Los fragmentos caen y se desvanecen
+        off_screen = (x < -50) | (y > 500)
+
+        # Colisión de todos los obstáculos contra el dinosaurio a la vez
+        dino_x, dino_y, dino_w, dino_h = self.dino.hitbox()
+        hit = (~was_destroyed &
+               (dino_x < x + o.width) & (dino_x + dino_w > x) &
+               (dino_y < y + o.height) & (dino_y + dino_h > y))
+        fatal_index = o.count
+        if hit.any():
+            hit_indices = np.flatnonzero(hit)
+            if self.dino.powerup_active:
+                smashed = hit_indices[np.isin(o.type[hit_indices], CACTUS_CODES)]
+                o.destroyed[smashed] = True
+                o.speed[smashed] = 0 # Detener el movimiento horizontal
+                if self.events.wants & EVENT_CACTUS_DESTROYED:
+                    for code in o.type[smashed].tolist():
+                        self.events.emit(EVENT_CACTUS_DESTROYED, OBSTACLE_TYPES[code])
+                hit_indices = hit_indices[~np.isin(o.type[hit_indices], CACTUS_CODES)]
+            if len(hit_indices):
+                fatal_index = int(hit_indices[0])
+
+        # Los obstáculos superados antes del choque suman puntos, en orden
+        passed = off_screen & ~was_destroyed
+        if not self.game_over:
+            for _ in range(int(np.count_nonzero(passed[:fatal_index]))):
+                self._score_point()
+        if fatal_index < o.count:
+            self._end_game(OBSTACLE_TYPES[o.type[fatal_index]])
+
+        removed = passed | (was_destroyed & off_screen)
+        if removed.any():
+            o.retain(~removed)
+            self.obstacle_changes += 1
@@ -0,0 +1,426 @@
+# motor_vectorial.py
+"""Motor por lotes: N partidas independientes avanzadas en una sola llamada.
+
+VectorGameEngine guarda el estado de todas las partidas en arrays de NumPy,
+uno por campo con un elemento por partida (o por hueco de obstáculo), y
+reproduce la física de Dino.update, Obstacle.update,
+GameEngine.check_collision y la generación de obstáculos de
+GameEngine.update, al estilo de un VectorEnv de gym. Solo simula lo que
+afecta al resultado: el dinosaurio, los obstáculos, el puntaje y la
+velocidad. Nubes, partículas y estrellas son decorativas y no se incluyen,
+como tampoco los power-ups.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from logica import (GameEngine, ACTION_JUMP, ACTION_DUCK, OBSERVATION_OBSTACLES,
+                    OBSERVATION_DINO_FIELDS, OBSERVATION_SIZE)
+
+BIRD = 4
+PTERODACTYL = 5
+# Dimensiones del hitbox por código de tipo (ver Obstacle.__init__)
+TYPE_WIDTH = np.array([20, 20, 45, 65, 40, 45], dtype=np.float64)
+TYPE_HEIGHT = np.array([40, 60, 40, 40, 30, 25], dtype=np.float64)
+# Altura sobre el suelo por código de tipo: base + 20 * randint(0, niveles - 1)
+TYPE_LIFT = np.array([0, 0, 0, 0, 0, 50], dtype=np.float64)
+TYPE_LEVELS = np.array([0, 0, 0, 0, 3, 2], dtype=np.float64)
+
+OFF_SCREEN_X = -50 # Un obstáculo se retira (y puntúa) al pasar de aquí
+MIN_SPEED = 8 # Velocidad inicial; solo sube
+MIN_SPAWN_TICKS = 61 # spawn_interval es al menos 60 y se genera al superarlo
+MAX_GROUP = 3 # Pájaros en el grupo más grande
+GROUP_SPACING = 80
+# Misma observación que GameEngine.write_observation
+NEAREST_OBSTACLES = OBSERVATION_OBSTACLES
+OBS_SIZE = OBSERVATION_SIZE
+# Obstáculos por delante que pueden tocar a la vez el hitbox del dinosaurio
+# (55 de ancho agachado): dos pájaros de un grupo, a 80 de distancia
+TOUCHING_OBSTACLES = 2
+CANDIDATES = max(NEAREST_OBSTACLES, TOUCHING_OBSTACLES)
+SPAWN_BATCH = 4096 # Obstáculos que se tiran y precalculan de una vez
+
+
+class VectorGameEngine:
+    """N partidas de dinosaurio en arrays, con reinicio automático.
+
+    step(actions) recibe una acción por partida (ACTION_NONE, ACTION_JUMP o
+    ACTION_DUCK) y devuelve (obs, reward, done). La recompensa es el número de
+    obstáculos superados en el paso. Las partidas terminadas se reinician en
+    el mismo paso; su puntaje final queda en final_scores.
+
+    Los obstáculos de cada partida están en una cola circular de
+    max_obstacles huecos, en orden de aparición, que también es su orden en
+    x: un obstáculo sale al menos 61 ticks después que el anterior, así que
+    le lleva más de 300 px y solo puede ir 0.5 más rápido. head es el más
+    antiguo (el siguiente en salir de pantalla), ahead el primero que el
+    dinosaurio aún no dejó atrás y tail el siguiente hueco libre; son
+    contadores que solo crecen y el hueco es contador % max_obstacles. Así
+    retirar, puntuar, chocar y observar solo miran unos pocos obstáculos por
+    partida en lugar de todos los huecos.
+    """
+
+    def __init__(self, num_envs, width=800, height=400, seed=None):
+        self.num_envs = num_envs
+        self.width = width
+        self.height = height
+        self.ground_y = height - 100
+        self.rng = np.random.default_rng(seed)
+
+        # Constantes de Dino
+        self.dino_x = 50
+        self.jump_force = -15
+        self.gravity = 0.8
+        self.speed_increase_interval = 10
+
+        # Huecos por partida: siempre caben todos los obstáculos vivos
+        n, m = num_envs, obstacle_slots(width)
+        self.max_obstacles = m
+        self.dropped_spawns = 0 # Obstáculos que no cupieron (debe seguir en 0)
+        self.dino_y = np.zeros(n)
+        self.vel_y = np.zeros(n)
+        self.jumping = np.zeros(n, dtype=bool)
+        self.ducking = np.zeros(n, dtype=bool)
+
+        # Huecos de todas las partidas seguidos (partida * m + hueco) y dos más:
+        # uno vacío para cuando no hay obstáculo (x = dino_x para que la
+        # distancia observada sea 0, campos fijos a 0 y un hitbox que no toca
+        # nada) y otro donde se tiran los pájaros que sobran en los grupos más
+        # pequeños. Lo que se compara con el dinosaurio es float64 como él:
+        # mezclar tipos hace que NumPy convierta por bloques y es mucho más lento.
+        self.empty_slot = n * m
+        self._unused_slot = n * m + 1
+        self.obs_x = np.zeros(n * m + 2)
+        self.obs_x[self.empty_slot] = self.dino_x
+        self.obs_speed = np.zeros(n * m + 2)
+        self.obs_behind = np.zeros(n * m + 2) # x con la que queda atrás
+        self.obs_top = np.zeros(n * m + 2)
+        self.obs_bottom = np.zeros(n * m + 2)
+        self.obs_top[self.empty_slot] = np.inf
+        self.obs_bottom[self.empty_slot] = -np.inf
+        # Campos de la observación que no cambian: y, ancho, alto y código de tipo + 1
+        self.obs_static = np.zeros((n * m + 2, 4), dtype=np.float32)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.ahead = np.zeros(n, dtype=np.int64)
+        self.tail = np.zeros(n, dtype=np.int64)
+        # Campos fijos de un obstáculo recién creado según su tipo; las aves
+        # suben luego 20 por nivel
+        self._type_static = np.stack([self.ground_y + 60 - TYPE_HEIGHT, TYPE_WIDTH, TYPE_HEIGHT,
+                                      np.arange(1, 7)], axis=1)
+        self._type_static[BIRD:, 0] = self.ground_y - TYPE_LIFT[BIRD:]
+
+        self.score = np.zeros(n, dtype=np.int64)
+        self.speed = np.zeros(n)
+        self.next_speed_increase_score = np.zeros(n, dtype=np.int64)
+        self.spawn_timer = np.zeros(n, dtype=np.int64)
+        self.spawn_interval = np.zeros(n, dtype=np.int64)
+        self.frames = np.zeros(n, dtype=np.int64)
+        self.final_scores = np.zeros(n, dtype=np.int64)
+
+        self._obs = np.zeros((n, OBS_SIZE), dtype=np.float32)
+        # Observación de una partida recién reiniciada: en el suelo, sin obstáculos
+        self._reset_obs = np.zeros(OBS_SIZE, dtype=np.float32)
+        self._reset_obs[0] = self.ground_y
+        self._reset_obs[5] = MIN_SPEED
+        # Vista (N, NEAREST_OBSTACLES, 5) de los campos de obstáculos de _obs
+        self._obs_nearest = self._obs[:, OBSERVATION_DINO_FIELDS:].reshape(n, NEAREST_OBSTACLES, 5)
+        self._row_offset = np.arange(n) * m
+        self._slot_mask = m - 1 # m es potencia de 2: contador & _slot_mask es el hueco
+        self._candidate_offset = np.arange(CANDIDATES)[:, None]
+        self._group_order = np.arange(MAX_GROUP)
+        self._group_x = self.width + self._group_order * GROUP_SPACING
+        self._spawn_rolls = np.zeros((0, 7))
+        self._next_spawn = 0
+        self._draw_spawns(0)
+        self.reset()
+
+    @property
+    def obs_active(self):
+        """Máscara (N, max_obstacles) de huecos ocupados por un obstáculo."""
+        m = self.max_obstacles
+        age = (np.arange(m) - self.head[:, None]) % m
+        return age < (self.tail - self.head)[:, None]
+
+    def reset(self, mask=None):
+        """Reinicia todas las partidas, o solo las marcadas en mask."""
+        if mask is None:
+            mask = np.ones(self.num_envs, dtype=bool)
+        self._reset(mask)
+        x, static, _, _ = self._nearest()
+        return self._observe(x, static)
+
+    def _reset(self, mask):
+        envs = np.flatnonzero(mask) # Indexar por posición es más rápido con pocas partidas
+        count = len(envs)
+        if count == 0:
+            return
+        self.dino_y[envs] = self.ground_y
+        self.vel_y[envs] = 0
+        self.jumping[envs] = False
+        self.ducking[envs] = False
+        # Vaciar la cola: los huecos viejos se sobrescriben al crear obstáculos
+        tail = self.tail[envs]
+        self.head[envs] = tail
+        self.ahead[envs] = tail
+        self.score[envs] = 0
+        self.speed[envs] = MIN_SPEED
+        self.next_speed_increase_score[envs] = self.speed_increase_interval
+        self.spawn_timer[envs] = 0
+        self.spawn_interval[envs] = 60 + (self.rng.random(count) * 61).astype(np.int64) # randint(60, 120)
+        self.frames[envs] = 0
+
+    def step(self, actions):
+        """Avanza un tick en todas las partidas."""
+        actions = np.asarray(actions)
+        dino_y, vel_y, jumping = self.dino_y, self.vel_y, self.jumping
+
+        # GameEngine.apply_action: primero agacharse, luego saltar
+        ducking = self.ducking = actions == ACTION_DUCK
+        jump = (actions == ACTION_JUMP) & ~jumping
+        jumping |= jump
+        np.copyto(vel_y, self.jump_force, where=jump)
+
+        # Dino.update (en el suelo vel_y es 0, así que no se mueve)
+        vel_y += self.gravity * jumping
+        dino_y += vel_y
+        landed = dino_y >= self.ground_y
+        np.minimum(dino_y, self.ground_y, out=dino_y)
+        np.copyto(vel_y, 0, where=landed)
+        jumping &= ~landed
+
+        self._spawn_obstacles()
+
+        # Obstacle.update (los huecos libres también se mueven, pero nadie los lee)
+        # y retirada de los que salen de pantalla
+        self.obs_x -= self.obs_speed
+        # A 80 por tick (GROUP_SPACING) o menos ningún obstáculo llega en un tick
+        # a donde estaba el anterior, así que cada cola avanza a lo sumo uno
+        fast = self.speed.max() > GROUP_SPACING
+        reward = self._retire_obstacles(fast)
+        self._advance_ahead(fast)
+
+        # GameEngine.check_collision con el hitbox de Dino.get_rect; solo los
+        # primeros obstáculos por delante pueden tocarlo
+        x, static, top, bottom = self._nearest()
+        ducked = ducking & ~jumping
+        dino_top = dino_y + 30.0 * ducked
+        dino_right = (self.dino_x + 40) + 15.0 * ducked
+        dino_bottom = dino_y + 60
+        # Una fila por candidato: comparar (N,) con (N,) es más rápido que difundir a (K, N)
+        done = (x[0] < dino_right) & (bottom[0] > dino_top) & (top[0] < dino_bottom)
+        for k in range(1, TOUCHING_OBSTACLES):
+            done |= (x[k] < dino_right) & (bottom[k] > dino_top) & (top[k] < dino_bottom)
+
+        self.frames += 1
+        obs = self._observe(x, static)
+        if done.any():
+            self.final_scores[done] = self.score[done]
+            self._reset(done)
+            obs[done] = self._reset_obs
+        return obs, reward, done
+
+    def _retire_obstacles(self, fast):
+        """Retira de la cabeza de cada cola los obstáculos que salieron de pantalla."""
+        head, tail = self.head, self.tail
+        passed = (tail > head) & (self.obs_x.take(self._row_offset + (head & self._slot_mask))
+                                  < OFF_SCREEN_X)
+        if not passed.any():
+            return np.zeros(self.num_envs, dtype=np.float32)
+        head += passed
+        if not fast:
+            self.score += passed
+            self._increase_speed(passed)
+            return passed.astype(np.float32)
+        reward = passed.astype(np.int64)
+        envs = np.flatnonzero(passed)
+        while len(envs):
+            h = head[envs]
+            more = (tail[envs] > h) & (self.obs_x.take(envs * self.max_obstacles + (h & self._slot_mask))
+                                       < OFF_SCREEN_X)
+            envs = envs[more]
+            head[envs] += 1
+            reward[envs] += 1
+        # Uno que pasa de delante a fuera de pantalla en un tick deja ahead atrás
+        np.maximum(self.ahead, head, out=self.ahead)
+        self.score += reward
+        self._increase_speed(passed)
+        return reward.astype(np.float32)
+
+    def _advance_ahead(self, fast):
+        """Avanza ahead más allá de los obstáculos que el dinosaurio ya dejó atrás."""
+        ahead, tail = self.ahead, self.tail
+        slots = self._row_offset + (ahead & self._slot_mask)
+        behind = (tail > ahead) & (self.obs_x.take(slots) <= self.obs_behind.take(slots))
+        if not fast:
+            ahead += behind
+            return
+        envs = np.flatnonzero(behind)
+        while len(envs):
+            ahead[envs] += 1
+            a = ahead[envs]
+            slots = envs * self.max_obstacles + (a & self._slot_mask)
+            envs = envs[(tail[envs] > a) & (self.obs_x.take(slots) <= self.obs_behind.take(slots))]
+
+    def _nearest(self):
+        """x, campos fijos, techo y base (CANDIDATES, N) de los primeros obstáculos por delante.
+
+        Los candidatos van en el primer eje para que las operaciones recorran
+        las N partidas seguidas.
+        """
+        position = self.ahead + self._candidate_offset
+        slots = np.where(position < self.tail, (position & self._slot_mask) + self._row_offset,
+                         self.empty_slot)
+        return (self.obs_x.take(slots), self.obs_static.take(slots, axis=0),
+                self.obs_top.take(slots), self.obs_bottom.take(slots))
+
+    def _increase_speed(self, scored):
+        # Sube 0.5 por cada umbral cruzado, como en GameEngine._score_point
+        pending = scored & (self.score >= self.next_speed_increase_score)
+        while pending.any():
+            self.speed[pending] += 0.5
+            self.next_speed_increase_score[pending] += self.speed_increase_interval
+            pending &= self.score >= self.next_speed_increase_score
+
+    def _spawn_obstacles(self):
+        self.spawn_timer += 1
+        envs = np.flatnonzero(self.spawn_timer > self.spawn_interval)
+        count = len(envs)
+        if count == 0:
+            return
+        # Cada partida que genera toma el siguiente obstáculo ya tirado
+        first = self._next_spawn
+        if first + count > len(self._spawn_rolls):
+            self._draw_spawns(count)
+            first = 0
+        last = self._next_spawn = first + count
+        num = self._spawn_num[first:last]
+        unused = self._spawn_unused[first:last]
+        self.spawn_timer[envs] = 0
+        self.spawn_interval[envs] = self._spawn_interval[first:last]
+
+        # Los obstáculos nuevos van al final de la cola de cada partida
+        m = self.max_obstacles
+        tail = self.tail[envs]
+        room = m - (tail - self.head[envs])
+        if (num > room).any():
+            self.dropped_spawns += int((num - np.minimum(num, room)).sum())
+            num = np.minimum(num, room)
+            unused = self._group_order >= num[:, None]
+        slots = ((tail[:, None] + self._group_order) & self._slot_mask) + (envs * m)[:, None]
+        np.copyto(slots, self._unused_slot, where=unused)
+        static = self._spawn_static[first:last]
+        self.obs_static[slots] = static
+        self.obs_top[slots] = top = static[:, :, 0]
+        self.obs_bottom[slots] = top + static[:, :, 2]
+        self.obs_x[slots] = self._group_x
+        self.obs_speed[slots] = self.speed[envs, None]
+        self.obs_behind[slots] = self._spawn_behind[first:last]
+        self.tail[envs] = tail + num
+
+    def _draw_spawns(self, count):
+        """Tira los siguientes obstáculos de golpe y precalcula lo que _spawn_obstacles copia.
+
+        Los que quedaban sin usar van primero, así que el orden de las tiradas
+        no depende del tamaño del lote.
+        """
+        rolls = self._spawn_rolls = np.concatenate([self._spawn_rolls[self._next_spawn:],
+                                                    self.rng.random((max(SPAWN_BATCH, count), 7))])
+        self._next_spawn = 0
+        # Una sola tirada por obstáculo para todo: tipo, variante, grupo, alturas e intervalo
+        self._spawn_interval = 60 + (rolls[:, 6] * 61).astype(np.int64)
+
+        # 60% cactus, 25% enemigo aéreo, 15% grupo de 2 o 3 pájaros
+        choice = rolls[:, 0]
+        obs_type = np.where(choice < 0.6, rolls[:, 1] * 4,
+                            np.where(choice < 0.85, BIRD + rolls[:, 1] * 2, BIRD)).astype(np.int64)
+        num = self._spawn_num = np.where(choice >= 0.85, 2 + (rolls[:, 2] * 2).astype(np.int64), 1)
+        self._spawn_unused = self._group_order >= num[:, None]
+
+        # Campos fijos de cada pájaro del grupo; las aves suben 20 por nivel
+        # con la tirada de su posición en el grupo
+        static = np.repeat(self._type_static[obs_type][:, None], MAX_GROUP, axis=1)
+        levels = TYPE_LEVELS[obs_type][:, None]
+        static[:, :, 0] -= (rolls[:, 3:3 + MAX_GROUP] * levels).astype(np.int64) * 20
+        self._spawn_static = static.astype(np.float32)
+        self._spawn_behind = self.dino_x - static[:, :, 1]
+
+    def _observe(self, x, static):
+        """Rellena el buffer de observaciones (N, OBS_SIZE) y lo devuelve.
+
+        x y static son los de _nearest(); el hueco vacío da una fila de ceros.
+        """
+        obs = self._obs
+        obs[:, 0] = self.dino_y
+        obs[:, 1] = self.vel_y
+        obs[:, 2] = self.jumping
+        obs[:, 3] = self.ducking
+        obs[:, 5] = self.speed # obs[:, 4] queda en 0: sin power-ups
+        nearest = self._obs_nearest
+        for k in range(NEAREST_OBSTACLES):
+            nearest[:, k, 0] = x[k] - self.dino_x
+            nearest[:, k, 1:] = static[k]
+        return obs
+
+
+def obstacle_slots(width):
+    """Huecos por partida para el peor caso, redondeados a una potencia de 2.
+
+    El peor caso es un grupo de MAX_GROUP pájaros cada MIN_SPAWN_TICKS ticks
+    a la velocidad mínima, que es cuando más tarda cada obstáculo en salir.
+    Con 800 de ancho son 9 obstáculos: 16 huecos.
+    """
+    travel = width + (MAX_GROUP - 1) * GROUP_SPACING - OFF_SCREEN_X
+    lifetime = math.floor(travel / MIN_SPEED) + 1 # Ticks que ocupa el hueco
+    live = math.ceil(lifetime / MIN_SPAWN_TICKS) * MAX_GROUP
+    return 1 << (live - 1).bit_length()
+
+
+def benchmark(num_envs=1024, steps=200, seed=0, repeats=3):
+    """Compara el paso por lotes con num_envs objetos GameEngine separados.
+
+    Cada lado se mide repeats veces y se queda el mejor tiempo, como timeit.
+    """
+    rng = np.random.default_rng(seed)
+    actions = rng.choice([0, 0, 0, ACTION_JUMP, ACTION_DUCK], (steps, num_envs))
+
+    scalar = batched = math.inf
+    for _ in range(repeats):
+        engines = [GameEngine(data_file=None) for _ in range(num_envs)]
+        for game in engines:
+            game.start_game()
+        start = time.perf_counter()
+        for t in range(steps):
+            row = actions[t].tolist()
+            for game, action in zip(engines, row):
+                game.apply_action(action)
+                game.update()
+                if game.game_over:
+                    game.restart()
+        scalar = min(scalar, time.perf_counter() - start)
+
+        vector = VectorGameEngine(num_envs, seed=seed)
+        start = time.perf_counter()
+        for t in range(steps):
+            vector.step(actions[t])
+        batched = min(batched, time.perf_counter() - start)
+    return {
+        'num_envs': num_envs,
+        'steps': steps,
+        'scalar_env_steps_per_s': num_envs * steps / scalar,
+        'vector_env_steps_per_s': num_envs * steps / batched,
+        'speedup': scalar / batched
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide VectorGameEngine frente a GameEngine.")
+    parser.add_argument('--envs', type=int, default=1024)
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    result = benchmark(args.envs, args.steps, repeats=args.repeats)
+    print(f"GameEngine x{result['num_envs']}: {result['scalar_env_steps_per_s']:,.0f} pasos/s")
+    print(f"VectorGameEngine: {result['vector_env_steps_per_s']:,.0f} pasos/s "
+          f"({result['speedup']:.1f}x)")
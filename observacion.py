@@ -0,0 +1,158 @@
+# observacion.py
+"""Renderizado sin ventana a arreglos de NumPy, para agentes que aprenden de píxeles.
+
+OffscreenRenderer dibuja con los renderizadores de interfaz sobre una
+superficie en memoria, sin ventana ni flip. Al final de cada frame la imagen
+se copia con un blit de SDL a una superficie de 24 bits creada con
+pygame.image.frombuffer sobre un arreglo de NumPy: superficie y arreglo
+comparten memoria, así que la observación es una vista (alto, ancho, 3)
+contigua, sin copias de NumPy y sin bloquear ninguna superficie (a
+diferencia de surfarray.pixels3d, que impide volver a hacer blit mientras
+la vista vive). En lotes el blit escribe directamente en out[i].
+
+El escalado se hace antes con pygame.transform; la conversión a gris, con
+enteros de NumPy sobre la imagen ya reducida.
+"""
+import argparse
+import os
+import time
+
+# Sin ventana: si nadie eligió otro driver se usa el dummy
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+import interfaz
+from logica import GameEngine
+from simulador import jump_when_close_policy
+
+
+def _rgb_surface(array):
+    """Superficie de 24 bits que escribe en array (alto, ancho, 3), que debe ser contiguo."""
+    height, width = array.shape[:2]
+    return pygame.image.frombuffer(array, (width, height), 'RGB')
+
+
+class OffscreenRenderer:
+    """Dibuja estados del juego en memoria y los entrega como arreglos uint8 (alto, ancho, canales).
+
+    size es el tamaño de la observación (por defecto el de la pantalla);
+    smooth elige entre promedio de área (smoothscale) y vecino más cercano.
+    Con grayscale la observación tiene un solo canal.
+    """
+    # Pesos de luminancia (BT.601) en enteros que suman 256
+    GRAY_WEIGHTS = (77, 150, 29)
+
+    def __init__(self, width=800, height=400, size=None, grayscale=False, smooth=True,
+                 renderer_class=interfaz.SpriteGameRenderer):
+        self.width = width
+        self.height = height
+        self.size = tuple(size) if size else (width, height)
+        self.grayscale = grayscale
+        self.smooth = smooth
+        pygame.font.init() # Los renderizadores usan fuentes; no hace falta ventana
+        # Se dibuja en una superficie normal: mismo formato que los sprites, blits más rápidos
+        self.surface = pygame.Surface((width, height))
+        self.renderer = renderer_class(self.surface)
+        self.scaled_surface = self.surface
+        if self.size != (width, height):
+            self.scaled_surface = pygame.Surface(self.size)
+
+        out_width, out_height = self.size
+        if grayscale:
+            self.rgb = np.zeros((out_height, out_width, 3), dtype=np.uint8)
+            self.rgb_surface = _rgb_surface(self.rgb)
+            self.gray_terms = np.zeros((2, out_height, out_width), dtype=np.uint16)
+            self.observation = np.zeros((out_height, out_width, 1), dtype=np.uint8)
+        else:
+            self.observation = np.zeros((out_height, out_width, 3), dtype=np.uint8)
+            self.rgb_surface = _rgb_surface(self.observation)
+
+    @property
+    def observation_shape(self):
+        return self.observation.shape
+
+    def _draw(self, game_state):
+        self.renderer.draw_frame(game_state)
+        if self.scaled_surface is not self.surface:
+            scale = pygame.transform.smoothscale if self.smooth else pygame.transform.scale
+            scale(self.surface, self.size, self.scaled_surface)
+
+    def _present(self, out, out_surface=None):
+        """Copia el frame dibujado a out (alto, ancho, canales)."""
+        if not self.grayscale:
+            (out_surface or _rgb_surface(out)).blit(self.scaled_surface, (0, 0))
+            return
+        self.rgb_surface.blit(self.scaled_surface, (0, 0))
+        rgb = self.rgb
+        total, term = self.gray_terms
+        red, green, blue = self.GRAY_WEIGHTS
+        np.multiply(rgb[:, :, 0], red, out=total, dtype=np.uint16)
+        np.multiply(rgb[:, :, 1], green, out=term, dtype=np.uint16)
+        total += term
+        np.multiply(rgb[:, :, 2], blue, out=term, dtype=np.uint16)
+        total += term
+        np.right_shift(total, 8, out=out[:, :, 0], casting='unsafe')
+
+    def render(self, game_state):
+        """Dibuja un estado (GameStateView o diccionario, ver GameRenderer.draw_frame) y devuelve la observación.
+
+        Es una vista que se sobrescribe en la siguiente llamada; hay que
+        copiarla para conservarla.
+        """
+        self._draw(game_state)
+        self._present(self.observation, None if self.grayscale else self.rgb_surface)
+        return self.observation
+
+    def render_batch(self, game_states, out=None):
+        """Dibuja varios estados en un arreglo (N, alto, ancho, canales), reutilizando out.
+
+        Cada estado debe ser un objeto aparte: get_game_state() devuelve
+        siempre el mismo, así que para guardar los de varios ticks se usa
+        game.fork().get_game_state() o state.copy().
+        """
+        shape = (len(game_states),) + self.observation.shape
+        if out is None:
+            out = np.empty(shape, dtype=np.uint8)
+        elif out.shape != shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+            raise ValueError(f"out debe ser un arreglo uint8 contiguo de forma {shape}")
+        for i, game_state in enumerate(game_states):
+            self._draw(game_state)
+            self._present(out[i])
+        return out
+
+
+def benchmark(frames=2000, batch=32, seed=0):
+    """Observaciones por segundo para varias configuraciones de OffscreenRenderer."""
+    game = GameEngine(data_file=None, seed=seed)
+    game.start_game()
+    states = []
+    for _ in range(batch):
+        game.apply_action(jump_when_close_policy(game))
+        game.update()
+        states.append(game.fork().get_game_state()) # Copia independiente de cada tick
+
+    results = []
+    for label, kwargs in (('800x400 RGB', {}),
+                          ('200x100 RGB', {'size': (200, 100)}),
+                          ('200x100 gris', {'size': (200, 100), 'grayscale': True}),
+                          ('84x84 gris', {'size': (84, 84), 'grayscale': True, 'smooth': False})):
+        renderer = OffscreenRenderer(game.width, game.height, **kwargs)
+        out = np.empty((batch,) + renderer.observation_shape, dtype=np.uint8)
+        start = time.perf_counter()
+        for _ in range(frames // batch):
+            renderer.render_batch(states, out)
+        elapsed = time.perf_counter() - start
+        results.append((label, out.shape, (frames // batch) * batch / elapsed))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mide cuántas observaciones por segundo se generan sin ventana.")
+    parser.add_argument('--frames', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=32)
+    args = parser.parse_args()
+    for label, shape, per_second in benchmark(args.frames, args.batch):
+        print(f"{label:14} lote {shape}: {per_second:,.0f} observaciones/s")
@@ -0,0 +1,77 @@
+# pantalla.py
+"""Resolución lógica fija escalada a la ventana.
+
+El motor y los renderizadores trabajan siempre en el tamaño lógico
+(interfaz.WIDTH x interfaz.HEIGHT): las posiciones y las medidas de
+draw_dino o draw_obstacle son píxeles de ese tamaño. ScaledDisplay les da
+una superficie de ese tamaño y, al presentar, la escala una sola vez a la
+ventana, centrada y con bandas negras si la proporción no coincide. Dibujar
+cuesta lo mismo en una pantalla 4K que en la ventana de 800x400; lo único
+que crece con la resolución es el escalado.
+
+Con un factor entero y sin suavizado cada píxel lógico es un bloque exacto
+de la ventana, así que update(rects) escala solo las zonas que cambian (ver
+interfaz.CachedGameRenderer). Con un factor fraccionario o con suavizado
+los bordes de cada zona no coincidirían con los del frame completo y se
+escala todo. integer=True elige el mayor factor entero que cabe (p. ej. x4
+en 4K en lugar de x4.8), a cambio de bandas más anchas.
+"""
+import pygame
+
+BLACK = (0, 0, 0)
+
+
+def fit_scale(logical_size, window_size, integer=False):
+    """Mayor factor (entero si integer y la ventana no es más chica) con el que el tamaño lógico cabe."""
+    scale = min(window_size[0] / logical_size[0], window_size[1] / logical_size[1])
+    return int(scale) if integer and scale >= 1 else scale
+
+
+class ScaledDisplay:
+    """Superficie lógica que se presenta escalada; sustituye a pygame.display en un renderizador.
+
+    Tiene flip() y update(rects) como el módulo pygame.display, así que
+    los renderizadores presentan igual con o sin escalado.
+    """
+
+    def __init__(self, window, logical_size, smooth=False, integer=False):
+        self.window = window
+        self.surface = pygame.Surface(logical_size).convert(window)
+        self.scale = fit_scale(logical_size, window.get_size(), integer)
+        self.target = pygame.Rect(0, 0, round(logical_size[0] * self.scale),
+                                  round(logical_size[1] * self.scale))
+        self.target.center = window.get_rect().center
+        self.view = window.subsurface(self.target)
+        self.smooth = smooth
+        self.exact = not smooth and self.scale == int(self.scale)
+        self.pixels_presented = 0 # Píxeles de la ventana escalados en el último frame
+        window.fill(BLACK) # Bandas; no vuelven a tocarse
+
+    def flip(self):
+        """Escala el frame lógico completo a la ventana y lo muestra."""
+        if self.smooth:
+            pygame.transform.smoothscale(self.surface, self.target.size, self.view)
+        else:
+            pygame.transform.scale(self.surface, self.target.size, self.view)
+        pygame.display.flip()
+        self.pixels_presented = self.target.width * self.target.height
+
+    def update(self, rects):
+        """Escala y muestra solo rects (coordenadas lógicas), o todo si el factor no es exacto."""
+        if not self.exact:
+            self.flip()
+            return
+        if isinstance(rects, pygame.Rect):
+            rects = [rects]
+        factor = int(self.scale)
+        bounds = self.surface.get_rect()
+        updated = []
+        for rect in rects:
+            rect = bounds.clip(rect)
+            if not rect:
+                continue
+            area = pygame.Rect(rect.x * factor, rect.y * factor, rect.width * factor, rect.height * factor)
+            pygame.transform.scale(self.surface.subsurface(rect), area.size, self.view.subsurface(area))
+            updated.append(area.move(self.target.topleft))
+        pygame.display.update(updated)
+        self.pixels_presented = sum(area.width * area.height for area in updated)
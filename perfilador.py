@@ -0,0 +1,176 @@
+# perfilador.py
+"""Perfilador de tiempo por frame para el motor y el renderizador.
+
+Profiler envuelve, solo en la instancia a la que se engancha, los métodos de
+cada fase de GameEngine.update y los grupos de dibujo de GameRenderer con un
+cronómetro. Sin perfilador no hay ningún envoltorio ni comprobación, así que
+desactivado no cuesta nada. Por cada frame acumula el tiempo de cada fase y
+cuenta las entidades; guarda los últimos frames en búferes circulares para
+sacar percentiles (p50/p95/p99), dibujarlos en pantalla o volcarlos a CSV o
+JSON.
+"""
+import csv
+import json
+import time
+
+import numpy as np
+
+# Métodos que se cronometran, agrupados por nombre de fase
+ENGINE_PHASES = {
+    'update': ('update',),
+    'update.dino': ('_update_dino',),
+    'update.clouds': ('_spawn_clouds', '_update_clouds'),
+    'update.particles': ('_update_particles',),
+    'update.stars': ('_update_stars',),
+    'update.powerups': ('_update_powerups',),
+    'update.spawn': ('_spawn_obstacles',),
+    'update.obstacles': ('_update_obstacles',),
+}
+RENDERER_GROUPS = {
+    'render': ('render', 'draw_start_screen'),
+    'render.stars': ('draw_stars',),
+    'render.sky': ('draw_sun_and_moon',),
+    'render.ground': ('draw_ground',),
+    'render.particles': ('draw_particles',),
+    'render.clouds': ('draw_cloud',),
+    'render.powerups': ('draw_powerup',),
+    'render.dino': ('draw_dino',),
+    'render.obstacles': ('draw_obstacle',),
+    'render.hud': ('draw_score', 'draw_game_over', 'draw_pause_screen'),
+}
+ENTITY_KEYS = ('obstacles', 'clouds', 'powerups', 'particles', 'stars')
+PERCENTILES = (50, 95, 99)
+
+
+class RingBuffer:
+    """Últimos size valores de una serie."""
+
+    def __init__(self, size):
+        self.values = np.zeros(size)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, len(self.values))
+
+    def append(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    def summary(self):
+        values = self.values[:len(self)]
+        if not len(values):
+            return None
+        p50, p95, p99 = np.percentile(values, PERCENTILES)
+        return {'p50': p50, 'p95': p95, 'p99': p99, 'mean': values.mean(),
+                'max': values.max(), 'samples': len(values)}
+
+
+class Profiler:
+    """Tiempos por fase (ms por frame) y número de entidades de los últimos window frames."""
+
+    def __init__(self, window=600, clock=time.perf_counter):
+        self.window = window
+        self.clock = clock
+        self.timings = {}
+        self.counts = {}
+        self.pending = {} # Segundos acumulados en el frame en curso
+        self.attached = [] # (objeto, nombres de método envueltos)
+        self.last_frame = None
+
+    def timed(self, name, method):
+        """Envuelve method para sumar su duración a la fase name."""
+        pending = self.pending
+        clock = self.clock
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                pending[name] = pending.get(name, 0.0) + clock() - start
+        return wrapper
+
+    def attach(self, obj, groups):
+        """Cronometra los métodos de obj; groups es {fase: nombres de método}."""
+        wrapped = []
+        for name, methods in groups.items():
+            for method_name in methods:
+                method = getattr(obj, method_name, None)
+                if method is None:
+                    continue
+                # Atributo de instancia: tapa al método de la clase solo para este objeto
+                setattr(obj, method_name, self.timed(name, method))
+                wrapped.append(method_name)
+        self.attached.append((obj, wrapped))
+        return obj
+
+    def attach_engine(self, engine):
+        return self.attach(engine, ENGINE_PHASES)
+
+    def attach_renderer(self, renderer):
+        return self.attach(renderer, RENDERER_GROUPS)
+
+    def detach(self):
+        """Quita todos los envoltorios y deja los objetos como estaban."""
+        for obj, wrapped in self.attached:
+            for method_name in wrapped:
+                obj.__dict__.pop(method_name, None)
+        self.attached = []
+
+    def end_frame(self, game_state=None):
+        """Cierra el frame: guarda el tiempo de cada fase y el número de entidades."""
+        now = self.clock()
+        if self.last_frame is not None:
+            self._sample(self.timings, 'frame', (now - self.last_frame) * 1000)
+        self.last_frame = now
+        for name, seconds in self.pending.items():
+            self._sample(self.timings, name, seconds * 1000)
+        self.pending.clear()
+        if game_state is not None:
+            for key in ENTITY_KEYS:
+                self._sample(self.counts, key, len(game_state[key]))
+
+    def _sample(self, series, name, value):
+        buffer = series.get(name)
+        if buffer is None:
+            buffer = series[name] = RingBuffer(self.window)
+        buffer.append(value)
+
+    def summary(self):
+        """{'timings_ms': {fase: percentiles}, 'entities': {tipo: percentiles}}"""
+        return {
+            'timings_ms': {name: buffer.summary() for name, buffer in sorted(self.timings.items())},
+            'entities': {name: buffer.summary() for name, buffer in self.counts.items()}
+        }
+
+    def rows(self):
+        """Resumen en filas planas (tipo, nombre, p50, p95, p99, mean, max, samples)."""
+        rows = []
+        for kind, series in self.summary().items():
+            for name, stats in series.items():
+                rows.append({'kind': kind, 'name': name, **stats})
+        return rows
+
+    def dump(self, path):
+        """Guarda el resumen como CSV si path termina en .csv, si no como JSON."""
+        if path.endswith('.csv'):
+            rows = self.rows()
+            fields = ['kind', 'name', 'p50', 'p95', 'p99', 'mean', 'max', 'samples']
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.summary(), f, indent=2, default=float)
+
+    def overlay_lines(self):
+        """Texto del overlay: una línea por fase y una con las entidades."""
+        lines = ["fase              p50    p95    p99 ms"]
+        for name, stats in self.summary()['timings_ms'].items():
+            lines.append(f"{name:16} {stats['p50']:6.2f} {stats['p95']:6.2f} {stats['p99']:6.2f}")
+        counts = [f"{name} {buffer.values[(buffer.count - 1) % self.window]:.0f}"
+                  for name, buffer in self.counts.items()]
+        if counts:
+            lines.append(", ".join(counts))
+        return lines
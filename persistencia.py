@@ -0,0 +1,188 @@
+# persistencia.py
+"""Persistencia del récord y las estadísticas sin bloquear el bucle del juego.
+
+DataStore carga el JSON una sola vez y lo guarda en memoria, así que los
+reinicios no vuelven a leer el disco. Las escrituras se encargan a un hilo
+en segundo plano que se queda solo con la última versión pendiente (varias
+seguidas se unen en una) y la escribe de forma atómica: primero a un archivo
+temporal y luego os.replace, de modo que un corte a mitad de escritura nunca
+deja el JSON corrupto.
+
+El historial de partidas va aparte, en registros binarios de tamaño fijo
+que solo se añaden al final del archivo: guardar una partida cuesta lo mismo
+con diez registros que con un millón. Los totales (partidas, puntos, muertes
+por tipo de obstáculo) se guardan en el JSON junto al récord.
+"""
+import atexit
+import json
+import os
+import struct
+import threading
+import time
+
+# Registro de historial: marca de tiempo, semilla, puntaje, causa de la muerte
+RUN_RECORD = struct.Struct('<dIIB')
+CAUSES = (None, 'cactus_small', 'cactus_large', 'cactus_group', 'cactus_triple', 'bird', 'pterodactyl')
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class DataStore:
+    """Datos persistentes de un archivo JSON y su historial de partidas."""
+
+    def __init__(self, path, history_path=None, background=True):
+        self.path = path
+        self.history_path = history_path or os.path.splitext(path)[0] + '_runs.bin'
+        self.background = background
+        self.data = None
+        self.pending = None # Última versión del JSON sin escribir
+        self.pending_runs = []
+        self.writes = 0 # Escrituras reales del JSON, para ver cuántas se unieron
+        self.writing = False
+        self.lock = threading.Condition()
+        self.thread = None
+        self.closed = False
+
+    def load(self):
+        """Datos del JSON; solo se lee el disco la primera vez."""
+        if self.data is None:
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                data = {}
+            self.data = data if isinstance(data, dict) else {}
+        return self.data
+
+    def save(self, **fields):
+        """Actualiza los campos en memoria y programa la escritura."""
+        data = self.load()
+        data.update(fields)
+        self._schedule(_copy(data))
+
+    def record_run(self, score, seed=0, cause=None, timestamp=None):
+        """Añade una partida al historial y actualiza los totales."""
+        data = self.load()
+        data['runs'] = data.get('runs', 0) + 1
+        data['total_score'] = data.get('total_score', 0) + score
+        deaths = data.setdefault('deaths', {})
+        key = cause or 'none'
+        deaths[key] = deaths.get(key, 0) + 1
+        cause_code = CAUSES.index(cause) if cause in CAUSES else 0
+        record = RUN_RECORD.pack(timestamp if timestamp is not None else time.time(),
+                                 seed & 0xFFFFFFFF, score, cause_code)
+        with self.lock:
+            self.pending_runs.append(record)
+        self._schedule(_copy(data))
+
+    def history(self):
+        """Partidas guardadas como tuplas (marca de tiempo, semilla, puntaje, causa)."""
+        self.flush()
+        try:
+            with open(self.history_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return []
+        # Un registro incompleto al final (corte durante la escritura) se ignora
+        usable = len(raw) - len(raw) % RUN_RECORD.size
+        return [(timestamp, seed, score, CAUSES[cause] if cause < len(CAUSES) else None)
+                for timestamp, seed, score, cause in RUN_RECORD.iter_unpack(raw[:usable])]
+
+    def _schedule(self, snapshot):
+        with self.lock:
+            self.pending = snapshot
+            if not self.background or (self.closed and self.thread is None):
+                self._write_pending()
+                return
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='DataStore', daemon=True)
+                self.thread.start()
+            self.lock.notify()
+
+    def _run(self):
+        with self.lock:
+            while True:
+                while self.pending is None and not self.pending_runs and not self.closed:
+                    self.lock.wait()
+                if self.pending is None and not self.pending_runs:
+                    return # Cerrado y sin nada pendiente
+                self._write_pending()
+
+    def _write_pending(self):
+        """Escribe lo pendiente; se llama con self.lock tomado."""
+        data, runs = self.pending, self.pending_runs
+        self.pending, self.pending_runs = None, []
+        self.writing = True
+        # Se suelta el candado durante la E/S para no bloquear al juego
+        self.lock.release()
+        try:
+            if runs:
+                with open(self.history_path, 'ab') as f:
+                    f.write(b''.join(runs))
+            if data is not None:
+                _atomic_write_json(self.path, data)
+                self.writes += 1
+        finally:
+            self.lock.acquire()
+            self.writing = False
+            self.lock.notify_all()
+
+    def flush(self):
+        """Espera a que se escriba todo lo pendiente."""
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                if self.pending is not None or self.pending_runs:
+                    self._write_pending()
+                return
+            while self.pending is not None or self.pending_runs or self.writing:
+                self.lock.wait()
+
+    def close(self):
+        """Escribe lo pendiente y detiene el hilo."""
+        with self.lock:
+            self.closed = True
+            self.lock.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            if self.pending is not None or self.pending_runs:
+                self._write_pending()
+
+
+def _copy(data):
+    """Copia para el hilo escritor; los diccionarios anidados también se copian."""
+    return {key: dict(value) if isinstance(value, dict) else value for key, value in data.items()}
+
+
+def _atomic_write_json(path, data):
+    """Escribe a un temporal en el mismo directorio y lo reemplaza de una vez."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def get_store(path, background=True):
+    """DataStore compartido por todos los motores que usan el mismo archivo."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = DataStore(path, background=background)
+        return store
+
+
+def close_all():
+    """Vacía y cierra todos los DataStore abiertos (se llama también al salir)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_all)
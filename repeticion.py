@@ -0,0 +1,179 @@
+# repeticion.py
+"""Grabación y reproducción exacta de partidas.
+
+Una repetición guarda solo la semilla del GameEngine y las entradas de cada
+frame (saltar, agacharse, pausa, empezar). Como toda la aleatoriedad del
+motor sale de su propio generador, volver a simular esas entradas con la
+misma semilla reproduce la partida exacta, sin pantalla y a toda velocidad.
+"""
+import argparse
+import struct
+import zlib
+
+from generador import SpawnSchedule, classic_curve
+from logica import GameEngine, ACTION_NONE, ACTION_JUMP, ACTION_DUCK
+
+# Entradas de un frame, combinables como bits
+INPUT_JUMP = 1
+INPUT_DUCK = 2
+INPUT_PAUSE = 4
+INPUT_START = 8
+# Bits equivalentes a cada acción discreta de un agente
+ACTION_INPUTS = {ACTION_NONE: 0, ACTION_JUMP: INPUT_JUMP, ACTION_DUCK: INPUT_DUCK}
+
+MAGIC = b'DINO'
+VERSION = 2
+# Cabecera: magic, versión, semilla, ancho, alto, frames, score final, opciones.
+# La versión 1 no tenía el byte de opciones
+HEADER = struct.Struct('<4sBQHHIiB')
+HEADER_V1 = struct.Struct('<4sBQHHIi')
+FLAG_SPAWN_SCHEDULE = 1 # Obstáculos de un generador.SpawnSchedule con la configuración por defecto
+FLAG_ISOLATED_EFFECTS = 2 # Efectos con su propio generador (GameEngine isolated_effects)
+
+
+def apply_inputs(game, inputs):
+    """Aplica las entradas de un frame y avanza el motor un tick.
+
+    Sigue el mismo orden que interfaz.main: pausa, inicio y salto (eventos de
+    teclado), luego la tecla de agacharse mantenida y finalmente update().
+    """
+    if inputs & INPUT_PAUSE:
+        game.toggle_pause()
+    if inputs & INPUT_START:
+        game.start_game()
+    if inputs & INPUT_JUMP:
+        game.handle_jump()
+    game.handle_duck(bool(inputs & INPUT_DUCK))
+    game.update()
+
+
+class Replay:
+    """Semilla más entradas por frame, guardadas como tramos (repeticiones, entrada)."""
+
+    def __init__(self, seed, runs=None, width=800, height=400, final_score=-1, spawn_schedule=False,
+                 isolated_effects=False):
+        self.seed = seed
+        self.runs = runs if runs is not None else []
+        self.width = width
+        self.height = height
+        self.final_score = final_score # -1 si no se conoce
+        self.spawn_schedule = spawn_schedule
+        self.isolated_effects = isolated_effects
+
+    @property
+    def frame_count(self):
+        return sum(length for length, _ in self.runs)
+
+    def frames(self):
+        """Itera las entradas de cada frame."""
+        for length, inputs in self.runs:
+            for _ in range(length):
+                yield inputs
+
+    def to_bytes(self):
+        body = bytearray()
+        for length, inputs in self.runs:
+            _write_varint(body, length)
+            body.append(inputs)
+        flags = ((FLAG_SPAWN_SCHEDULE if self.spawn_schedule else 0) |
+                 (FLAG_ISOLATED_EFFECTS if self.isolated_effects else 0))
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.width, self.height,
+                             self.frame_count, self.final_score, flags)
+        return header + zlib.compress(bytes(body), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version = data[:4], data[4]
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError("No es un archivo de repetición compatible")
+        header = HEADER if version == VERSION else HEADER_V1
+        _, _, seed, width, height, frame_count, final_score, *flags = header.unpack_from(data)
+        flags = flags[0] if flags else 0
+        body = zlib.decompress(data[header.size:])
+        runs = []
+        pos = 0
+        while pos < len(body):
+            length, pos = _read_varint(body, pos)
+            runs.append((length, body[pos]))
+            pos += 1
+        replay = cls(seed, runs, width, height, final_score, bool(flags & FLAG_SPAWN_SCHEDULE),
+                     bool(flags & FLAG_ISOLATED_EFFECTS))
+        if replay.frame_count != frame_count:
+            raise ValueError("Repetición truncada")
+        return replay
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Acumula las entradas de una partida comprimiendo tramos repetidos."""
+
+    def __init__(self, game):
+        self.seed = game.seed
+        self.width = game.width
+        self.height = game.height
+        schedule = game.spawn_schedule
+        # La cabecera solo dice si había programa: simulate() lo recrea con SpawnSchedule(),
+        # así que otra curva u otro max_attempts no se podría reproducir
+        if schedule is not None and (schedule.curve is not classic_curve or schedule.max_attempts != 8):
+            raise ValueError("Solo se pueden grabar partidas con el SpawnSchedule por defecto")
+        self.spawn_schedule = schedule is not None
+        self.isolated_effects = game.isolated_effects
+        self.runs = []
+
+    def record(self, inputs):
+        runs = self.runs
+        if runs and runs[-1][1] == inputs:
+            runs[-1][0] += 1
+        else:
+            runs.append([1, inputs])
+
+    def replay(self, final_score=-1):
+        return Replay(self.seed, [tuple(run) for run in self.runs],
+                      self.width, self.height, final_score, self.spawn_schedule, self.isolated_effects)
+
+
+def simulate(replay, engine_class=GameEngine):
+    """Vuelve a jugar una repetición sin pantalla y devuelve el motor final."""
+    game = engine_class(replay.width, replay.height, data_file=None, seed=replay.seed,
+                        spawn_schedule=SpawnSchedule() if replay.spawn_schedule else None,
+                        isolated_effects=replay.isolated_effects)
+    for inputs in replay.frames():
+        apply_inputs(game, inputs)
+    return game
+
+
+def _write_varint(buf, value):
+    while value >= 0x80:
+        buf.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buf.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vuelve a simular una repetición sin pantalla.")
+    parser.add_argument('path')
+    args = parser.parse_args()
+    replay = Replay.load(args.path)
+    game = simulate(replay)
+    print(f"Semilla {replay.seed}, {replay.frame_count} frames, puntaje {game.score}")
+    if replay.final_score >= 0 and replay.final_score != game.score:
+        raise SystemExit(f"El puntaje no coincide con el grabado ({replay.final_score})")
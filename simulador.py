@@ -0,0 +1,145 @@
+# simulador.py
+"""Ejecución de episodios sin pantalla para evaluar políticas de bots."""
+import argparse
+import multiprocessing
+import time
+
+from generador import SpawnSchedule
+from logica import GameEngine, ACTION_NONE, ACTION_JUMP, ACTION_DUCK
+from trayectoria import JumpTrajectory, LookaheadOracle
+
+WIDTH, HEIGHT = 800, 400
+MAX_FRAMES = 100000 # Límite por episodio para políticas que nunca mueren
+
+_oracles = {} # LookaheadOracle por física del dinosaurio
+
+
+def idle_policy(game):
+    """Política que nunca actúa (referencia mínima)."""
+    return ACTION_NONE
+
+
+def jump_when_close_policy(game):
+    """Política heurística: salta o se agacha ante el obstáculo más cercano."""
+    dino = game.dino
+    for obs in game.obstacles:
+        if obs.destroyed or obs.x + obs.width < dino.x:
+            continue
+        distance = obs.x - (dino.x + dino.width)
+        if distance < game.speed * 12:
+            bottom = obs.y + obs.height
+            if bottom <= dino.ground: # Pasa por encima de la cabeza
+                return ACTION_NONE
+            if bottom <= dino.ground + 30: # Se esquiva agachándose
+                return ACTION_DUCK
+            return ACTION_JUMP
+        break
+    return ACTION_NONE
+
+
+def lookahead_policy(game):
+    """Política que calcula en forma cerrada qué saltos superan los obstáculos próximos."""
+    dino = game.dino
+    key = (dino.x, dino.ground, dino.jump_force, dino.gravity)
+    oracle = _oracles.get(key)
+    if oracle is None:
+        oracle = _oracles[key] = LookaheadOracle(JumpTrajectory.from_dino(dino))
+    return oracle.action(game)
+
+
+def run_episode(policy, seed=None, max_frames=MAX_FRAMES, width=WIDTH, height=HEIGHT,
+                fair_spawns=False):
+    """Juega un episodio completo sin pantalla y devuelve su resultado.
+
+    Con fair_spawns los obstáculos salen de un generador.SpawnSchedule.
+    """
+    game = GameEngine(width, height, data_file=None, seed=seed,
+                      spawn_schedule=SpawnSchedule() if fair_spawns else None)
+    game.start_game()
+    frames = 0
+    while not game.game_over and frames < max_frames:
+        game.apply_action(policy(game))
+        game.update()
+        frames += 1
+    return {
+        'seed': seed,
+        'score': game.score,
+        'frames': frames,
+        'cause': game.death_cause if game.game_over else 'timeout'
+    }
+
+
+def _run_chunk(args):
+    """Ejecuta un bloque de episodios dentro de un proceso del pool."""
+    policy, seeds, max_frames, width, height, fair_spawns = args
+    return [run_episode(policy, seed, max_frames, width, height, fair_spawns) for seed in seeds]
+
+
+def run_batch(policy, episodes, workers=None, seed=0, max_frames=MAX_FRAMES,
+              width=WIDTH, height=HEIGHT, chunk_size=64, fair_spawns=False):
+    """Reparte los episodios entre procesos y devuelve un resultado por episodio.
+
+    La política debe poder serializarse con pickle (una función de nivel de
+    módulo) y recibe el GameEngine en cada frame, devolviendo una acción.
+    """
+    seeds = [seed + i for i in range(episodes)]
+    chunks = [(policy, seeds[i:i + chunk_size], max_frames, width, height, fair_spawns)
+              for i in range(0, episodes, chunk_size)]
+    if workers == 1:
+        # Sin pool: útil para depurar políticas
+        results = [_run_chunk(chunk) for chunk in chunks]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(_run_chunk, chunks)
+    return [episode for chunk in results for episode in chunk]
+
+
+def summarize(results):
+    """Resume una lista de episodios: puntaje medio, máximo y causas de muerte."""
+    causes = {}
+    for r in results:
+        causes[r['cause']] = causes.get(r['cause'], 0) + 1
+    total = len(results)
+    return {
+        'episodes': total,
+        'mean_score': sum(r['score'] for r in results) / total if total else 0,
+        'max_score': max((r['score'] for r in results), default=0),
+        'mean_frames': sum(r['frames'] for r in results) / total if total else 0,
+        'causes': causes
+    }
+
+
+POLICIES = {
+    'idle': idle_policy,
+    'jump_when_close': jump_when_close_policy,
+    'lookahead': lookahead_policy
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evalúa una política sin pantalla.")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='jump_when_close')
+    parser.add_argument('--episodes', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-frames', type=int, default=MAX_FRAMES)
+    parser.add_argument('--fair-spawns', action='store_true',
+                        help="obstáculos precalculados y comprobados (generador.SpawnSchedule)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = run_batch(POLICIES[args.policy], args.episodes, args.workers,
+                        args.seed, args.max_frames, fair_spawns=args.fair_spawns)
+    elapsed = time.perf_counter() - start
+    summary = summarize(results)
+    total_frames = sum(r['frames'] for r in results)
+    print(f"{summary['episodes']} episodios en {elapsed:.2f} s "
+          f"({total_frames / elapsed:,.0f} frames/s)")
+    print(f"Puntaje medio {summary['mean_score']:.1f}, máximo {summary['max_score']}, "
+          f"frames medios {summary['mean_frames']:.0f}")
+    for cause, count in sorted(summary['causes'].items(), key=lambda item: -item[1]):
+        print(f"  {cause}: {count}")
+
+
+if __name__ == "__main__":
+    main()
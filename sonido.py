@@ -0,0 +1,154 @@
+# sonido.py
+"""Banco de sonidos procedurales, generados al primer uso y guardados en disco.
+
+Cada sonido se describe con una ToneSpec (frecuencia inicial y final para
+barridos, duración, volumen, envolvente de ataque y caída, forma de onda).
+SoundBank sintetiza las muestras con NumPy la primera vez que se pide un
+sonido y guarda el PCM crudo en un archivo cuyo nombre sale de la
+especificación y del formato del mezclador; en los arranques siguientes solo
+se lee ese archivo. bank.get('jump') devuelve un pygame.mixer.Sound, o
+None si no hay audio. SoundEffects los hace sonar con los eventos del motor
+(ver eventos.py); sin él, una partida sin pantalla no toca el audio.
+"""
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+from eventos import EVENT_DEATH, EVENT_HIGH_SCORE, EVENT_JUMP, EVENT_SCORE
+
+CACHE_DIR = os.environ.get('DINO_SOUND_CACHE',
+                           os.path.join(os.path.dirname(os.path.abspath(__file__)), '.sound_cache'))
+
+ToneSpec = namedtuple('ToneSpec', ['frequency', 'duration', 'volume', 'end_frequency',
+                                   'attack', 'release', 'waveform'])
+# Sin barrido, sin envolvente y onda senoidal salvo que se indique otra cosa
+ToneSpec.__new__.__defaults__ = (None, 0.0, 0.0, 'sine')
+
+# Los mismos tonos que se generaban antes al importar interfaz
+GAME_SOUNDS = {
+    'jump': ToneSpec(660, 0.05, 0.1), # Tono agudo y corto
+    'point': ToneSpec(880, 0.05, 0.08), # Tono más agudo para puntos
+    'die': ToneSpec(220, 0.2, 0.15), # Tono grave y más largo
+    'highscore': ToneSpec(1046, 0.15, 0.1), # Tono muy agudo para nuevo récord
+}
+# Sonido de cada evento de la partida
+EVENT_SOUNDS = {EVENT_JUMP: 'jump', EVENT_SCORE: 'point', EVENT_HIGH_SCORE: 'highscore',
+                EVENT_DEATH: 'die'}
+
+
+def synthesize(spec, sample_rate, channels=2):
+    """Muestras int16 (n, channels) de un tono, con barrido y envolvente opcionales."""
+    n_samples = int(round(spec.duration * sample_rate))
+    t = np.linspace(0., spec.duration, n_samples, endpoint=False)
+    if spec.end_frequency is None:
+        phase = 2 * np.pi * spec.frequency * t
+    else:
+        # Barrido lineal: la fase es la integral de la frecuencia instantánea
+        slope = (spec.end_frequency - spec.frequency) / spec.duration
+        phase = 2 * np.pi * (spec.frequency * t + 0.5 * slope * t * t)
+    if spec.waveform == 'square':
+        wave = np.sign(np.sin(phase))
+    elif spec.waveform == 'triangle':
+        wave = 2 / np.pi * np.arcsin(np.sin(phase))
+    else:
+        wave = np.sin(phase)
+
+    if spec.attack or spec.release:
+        envelope = np.ones(n_samples)
+        attack = min(int(spec.attack * sample_rate), n_samples)
+        release = min(int(spec.release * sample_rate), n_samples)
+        if attack:
+            envelope[:attack] = np.linspace(0., 1., attack, endpoint=False)
+        if release:
+            envelope[n_samples - release:] *= np.linspace(1., 0., release)
+        wave = wave * envelope
+
+    max_sample = 2**(16 - 1) - 1
+    mono = (wave * max_sample * spec.volume).astype(np.int16)
+    return np.repeat(mono[:, None], channels, axis=1)
+
+
+class SoundBank:
+    """Sonidos por nombre, creados al primer uso desde la caché en disco o sintetizados."""
+
+    def __init__(self, specs=GAME_SOUNDS, cache_dir=CACHE_DIR):
+        self.specs = dict(specs)
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.synthesized = 0 # Sonidos que no estaban en la caché
+        self.loaded = 0
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    def __getitem__(self, name):
+        sound = self.get(name)
+        if sound is None:
+            raise KeyError(name)
+        return sound
+
+    def get(self, name, default=None):
+        """Sonido listo para play(); None si no existe o el mezclador no está iniciado."""
+        sound = self.sounds.get(name)
+        if sound is None:
+            spec = self.specs.get(name)
+            mixer = pygame.mixer.get_init()
+            # Solo se sintetiza int16 con signo, el formato por defecto del mezclador
+            if spec is None or mixer is None or mixer[1] != -16:
+                return default
+            sound = self.sounds[name] = pygame.mixer.Sound(buffer=self.pcm(spec, mixer))
+        return sound
+
+    def pcm(self, spec, mixer):
+        """Bytes PCM de spec para el formato (frecuencia, formato, canales) del mezclador."""
+        sample_rate, sample_format, channels = mixer
+        key = repr((tuple(spec), sample_rate, sample_format, channels)).encode()
+        path = os.path.join(self.cache_dir, hashlib.sha1(key).hexdigest() + '.pcm')
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            self.loaded += 1
+            return data
+        except OSError:
+            pass
+        data = synthesize(spec, sample_rate, channels).tobytes()
+        self.synthesized += 1
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass # Sin caché (p. ej. disco de solo lectura): se sintetiza en cada arranque
+        return data
+
+    def preload(self):
+        """Crea todos los sonidos ahora en lugar de en su primer uso."""
+        for name in self.specs:
+            self.get(name)
+
+
+class SoundEffects:
+    """Suscriptor de un eventos.EventBus que reproduce el sonido de cada evento."""
+
+    def __init__(self, sounds, bus=None, event_sounds=EVENT_SOUNDS):
+        self.sounds = sounds # SoundBank o cualquier objeto con get(nombre)
+        self.event_sounds = dict(event_sounds)
+        if bus is not None:
+            self.subscribe(bus)
+
+    def subscribe(self, bus):
+        kinds = 0
+        for kind in self.event_sounds:
+            kinds |= kind
+        bus.subscribe(self, kinds)
+
+    def __call__(self, events):
+        for event in events:
+            sound = self.sounds.get(self.event_sounds[event.kind])
+            if sound is not None:
+                sound.play()
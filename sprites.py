@@ -0,0 +1,186 @@
+# sprites.py
+"""Sprites prerenderizados para el dinosaurio, los obstáculos, las nubes y
+los power-ups.
+
+Cada entidad tiene pocos aspectos posibles (frame de animación, agachado,
+parpadeo del power-up, destruido, tipo de cactus, tamaño de nube).
+SpriteAtlas los dibuja todos una sola vez con los métodos draw_* de un
+GameRenderer y recorta cada uno a su contenido. Dibujar una entidad pasa a
+ser un solo blit, y un frame completo una llamada a Surface.blits.
+
+Los colores de estas entidades no cambian de día a noche, así que no hace
+falta una variante por fase. Las partículas siguen dibujándose como
+círculos: un círculo de 2 a 4 píxeles cuesta menos que un blit.
+"""
+import random
+from types import SimpleNamespace
+
+import pygame
+
+from logica import OBSTACLE_TYPES, Obstacle
+
+COLOR_KEY = (255, 0, 255)
+CLOUD_WIDTHS = range(40, 81) # Ver Cloud en logica.py
+CLOUD_HEIGHTS = range(15, 31)
+POWERUP_SIZE = (20, 20)
+GHOST_ALPHA = 90 # Opacidad de los dinosaurios fantasma de una carrera (ver carrera.py)
+
+# Lienzo donde se dibuja cada sprite antes de recortarlo; el origen deja
+# margen para la cola, las alas y los fragmentos que salen del hitbox
+CANVAS_SIZE = (128, 128)
+ORIGIN = 20
+ATLAS_WIDTH = 512
+
+
+class SpriteAtlas:
+    """Sprites prerenderizados, sueltos o empaquetados en una sola superficie.
+
+    Cada sprite es (superficie, zona, dx, dy): se dibuja con
+    blit(superficie, (x + dx, y + dy), zona), donde (x, y) es la posición de
+    la entidad. Si aparece un aspecto que no se prerenderizó (p. ej. una nube
+    de otro tamaño) se dibuja en ese momento en su propia superficie.
+
+    Sueltos, cada sprite usa color clave con RLE, que es lo más rápido de
+    copiar. Con packed=True todos comparten una superficie; ahí el RLE se
+    desactiva porque SDL recorre todas las filas anteriores a la zona pedida
+    y un blit desde el fondo del atlas tardaría cien veces más.
+    """
+
+    def __init__(self, renderer, packed=False, preload=True):
+        self.renderer = renderer # GameRenderer cuyos métodos draw_* definen el aspecto
+        self.sprites = {}
+        self.surface = None
+        if not preload:
+            return # Cada sprite se dibuja la primera vez que se pide
+        baked = {}
+        for ducking in (False, True):
+            for anim_frame in (0, 1):
+                for blink in (False, True):
+                    key = ('dino', ducking, anim_frame, blink)
+                    baked[key] = self._bake_dino(*key[1:])
+        for obs_type in OBSTACLE_TYPES:
+            for anim_frame in (0, 1):
+                key = ('obstacle', obs_type, anim_frame)
+                baked[key] = self._bake_obstacle(obs_type, anim_frame)
+        baked[('debris',)] = self._bake_obstacle('cactus_small', 0, destroyed=True)
+        for width in CLOUD_WIDTHS:
+            for height in CLOUD_HEIGHTS:
+                baked[('cloud', width, height)] = self._bake_cloud(width, height)
+        baked[('powerup',) + POWERUP_SIZE] = self._bake_powerup(*POWERUP_SIZE)
+        if packed:
+            self._pack(baked)
+        else:
+            for key, (surface, dx, dy) in baked.items():
+                surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+                self.sprites[key] = (surface, None, dx, dy)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def _bake(self, draw, state, *args):
+        """Dibuja un sprite con el renderer sobre un lienzo y lo recorta."""
+        canvas = pygame.Surface(CANVAS_SIZE)
+        canvas.fill(COLOR_KEY)
+        canvas.set_colorkey(COLOR_KEY)
+        screen, self.renderer.screen = self.renderer.screen, canvas
+        try:
+            draw(state, *args)
+        finally:
+            self.renderer.screen = screen
+        bounds = canvas.get_bounding_rect()
+        return canvas.subsurface(bounds).copy(), bounds.x - ORIGIN, bounds.y - ORIGIN
+
+    def _bake_dino(self, ducking, anim_frame, blink):
+        state = SimpleNamespace(x=ORIGIN, y=ORIGIN, width=40, height=60, ducking=ducking,
+                                jumping=False, anim_frame=anim_frame,
+                                powerup_active=blink, powerup_timer=15 if blink else 0)
+        return self._bake(self.renderer.draw_dino, state)
+
+    def _bake_obstacle(self, obs_type, anim_frame, destroyed=False):
+        # Las medidas salen de la propia clase Obstacle
+        obs = Obstacle(0, obs_type, 0, rng=random.Random(0))
+        state = SimpleNamespace(x=ORIGIN, y=ORIGIN, width=obs.width, height=obs.height,
+                                type=obs_type, anim_frame=anim_frame, destroyed=destroyed)
+        return self._bake(self.renderer.draw_obstacle, state)
+
+    def _bake_cloud(self, width, height):
+        return self._bake(self.renderer.draw_cloud,
+                          SimpleNamespace(x=ORIGIN, y=ORIGIN, width=width, height=height))
+
+    def _bake_powerup(self, width, height):
+        # draw_powerup parpadea con time_of_day; aquí se dibuja siempre visible
+        canvas = pygame.Surface((width, height))
+        canvas.fill((255, 165, 0))
+        return canvas, 0, 0
+
+    def _pack(self, baked):
+        """Empaqueta los sprites en filas, de mayor a menor altura."""
+        order = sorted(baked, key=lambda key: -baked[key][0].get_height())
+        placed = {}
+        x = y = row_height = 0
+        for key in order:
+            surface = baked[key][0]
+            width, height = surface.get_size()
+            if x + width > ATLAS_WIDTH:
+                x, y = 0, y + row_height
+                row_height = 0
+            placed[key] = pygame.Rect(x, y, width, height)
+            x += width
+            row_height = max(row_height, height)
+        atlas = pygame.Surface((ATLAS_WIDTH, y + row_height))
+        atlas.fill(COLOR_KEY)
+        for key, area in placed.items():
+            surface, dx, dy = baked[key]
+            atlas.blit(surface, area)
+            self.sprites[key] = (atlas, area, dx, dy)
+        atlas.set_colorkey(COLOR_KEY)
+        self.surface = atlas
+
+    def sprite(self, key):
+        """Sprite para una clave; los aspectos no previstos se dibujan al vuelo."""
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            kind = key[0]
+            if kind in ('dino', 'ghost'):
+                surface, dx, dy = self._bake_dino(*key[1:])
+            elif kind == 'obstacle':
+                surface, dx, dy = self._bake_obstacle(*key[1:])
+            elif kind == 'cloud':
+                surface, dx, dy = self._bake_cloud(*key[1:])
+            else:
+                surface, dx, dy = self._bake_powerup(*key[1:])
+            surface.set_colorkey(COLOR_KEY, pygame.RLEACCEL)
+            if kind == 'ghost':
+                surface.set_alpha(GHOST_ALPHA, pygame.RLEACCEL)
+            sprite = self.sprites[key] = (surface, None, dx, dy)
+        return sprite
+
+    # Cada método devuelve los argumentos de blit (superficie, destino, zona)
+
+    def dino(self, dino_state):
+        ducking = dino_state.ducking and not dino_state.jumping
+        anim_frame = 0 if ducking else dino_state.anim_frame
+        blink = dino_state.powerup_active and dino_state.powerup_timer % 20 > 10
+        surface, area, dx, dy = self.sprite(('dino', ducking, anim_frame, blink))
+        return surface, (dino_state.x + dx, dino_state.y + dy), area
+
+    def ghost(self, dino_state):
+        """Como dino(), pero translúcido; se dibuja la primera vez que aparece cada aspecto."""
+        ducking = dino_state.ducking and not dino_state.jumping
+        anim_frame = 0 if ducking else dino_state.anim_frame
+        blink = dino_state.powerup_active and dino_state.powerup_timer % 20 > 10
+        surface, area, dx, dy = self.sprite(('ghost', ducking, anim_frame, blink))
+        return surface, (dino_state.x + dx, dino_state.y + dy), area
+
+    def obstacle(self, obs_state):
+        key = ('debris',) if obs_state.destroyed else ('obstacle', obs_state.type, obs_state.anim_frame)
+        surface, area, dx, dy = self.sprite(key)
+        return surface, (obs_state.x + dx, obs_state.y + dy), area
+
+    def cloud(self, cloud_state):
+        surface, area, dx, dy = self.sprite(('cloud', cloud_state.width, cloud_state.height))
+        return surface, (cloud_state.x + dx, cloud_state.y + dy), area
+
+    def powerup(self, powerup_state):
+        surface, area, dx, dy = self.sprite(('powerup', powerup_state.width, powerup_state.height))
+        return surface, (powerup_state.x + dx, powerup_state.y + dy), area
@@ -0,0 +1,10 @@
+# test_benchmark.py
+from benchmark import run_scenario_ticks
+
+
+def _mean_particles(name, ticks=1000):
+    return sum(len(game.particles) for game in run_scenario_ticks(name, ticks)) / ticks
+
+
+def test_landing_bursts_has_more_particles_than_steady():
+    assert _mean_particles('landing_bursts') > 2 * _mean_particles('steady')
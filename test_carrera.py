@@ -0,0 +1,23 @@
+# test_carrera.py
+from carrera import RaceEngine, PolicyGhost
+from simulador import POLICIES
+
+
+def _ghost_state(game):
+    return [(racer.alive, racer.dino.y, racer.dino.anim_timer) for racer in game.ghosts]
+
+
+def test_fork_of_race_leaves_ghosts_alone():
+    game = RaceEngine(data_file=None, seed=1)
+    for _ in range(3):
+        game.add_ghost(PolicyGhost(POLICIES['jump_when_close']))
+    game.start_game()
+    game.update()
+    before = _ghost_state(game)
+    fork = game.fork()
+    for _ in range(300):
+        fork.update()
+    assert fork.ghosts == [] and fork.alive_ghosts == []
+    assert fork.collision_index is not game.collision_index
+    assert _ghost_state(game) == before
+    assert len(game.alive_ghosts) == 3
@@ -0,0 +1,10 @@
+# test_logica.py
+import pytest
+
+from logica import GameEngine
+
+
+def test_events_is_keyword_only():
+    # El tercer parámetro posicional era `sounds`; ya no se acepta por posición
+    with pytest.raises(TypeError):
+        GameEngine(800, 400, {})
@@ -0,0 +1,30 @@
+# test_perfilador.py
+from logica import GameEngine
+from perfilador import Profiler
+
+
+def _counts(game):
+    return len(game.obstacles), len(game.clouds), game.score
+
+
+def test_fork_of_profiled_engine_updates_itself():
+    game = GameEngine(data_file=None, seed=1)
+    game.start_game()
+    profiler = Profiler()
+    profiler.attach_engine(game)
+    fork = game.fork()
+    for _ in range(300):
+        fork.update()
+    assert _counts(game) == (0, 0, 0)
+    assert _counts(fork) != (0, 0, 0)
+    assert 'update' not in fork.__dict__
+
+
+def test_profiled_engine_still_timed_after_fork():
+    game = GameEngine(data_file=None, seed=1)
+    game.start_game()
+    profiler = Profiler()
+    profiler.attach_engine(game)
+    game.fork()
+    game.update()
+    assert profiler.pending.get('update', 0) > 0
@@ -0,0 +1,242 @@
+# trayectoria.py
+"""Trayectoria del salto en forma cerrada y ventanas de salto seguras.
+
+Dino.update suma la gravedad a la velocidad y la velocidad a y en cada tick,
+así que k ticks después de despegar (k = 1 es el tick del salto)
+
+    vel_y = jump_force + k * gravity
+    y     = ground + k * jump_force + gravity * k * (k + 1) / 2
+
+mientras y < ground; el primer k con y >= ground es el aterrizaje. Con esa
+parábola, las fases del salto en las que el dinosaurio pasa por encima (o por
+debajo) de una hitbox salen de resolver una cuadrática, y las ticks en que un
+obstáculo de velocidad constante se solapa en x con el dinosaurio, de una
+división. Todo acepta arreglos de NumPy, así que se responden muchas
+consultas (obstáculo, velocidad, tick de despegue) en una sola llamada.
+
+Las ticks se cuentan desde ahora: la tick 1 es el próximo update(). Un
+despegue en la tick t significa llamar a handle_jump justo antes de ese
+update(). La forma cerrada difiere de la suma tick a tick del motor en
+redondeos de 1e-13; para no dar por seguro un roce, los contactos a menos de
+EPSILON píxeles cuentan como choque. heights() reproduce exactamente los
+valores del motor cuando hace falta (p. ej. generador).
+"""
+import math
+
+import numpy as np
+
+from logica import Dino, ACTION_NONE, ACTION_JUMP, ACTION_DUCK
+
+EPSILON = 1e-6
+
+
+class JumpTrajectory:
+    """Salto de un Dino: alturas, fases sobre/bajo un obstáculo y despegues que lo superan."""
+
+    def __init__(self, jump_force=-15, gravity=0.8, ground=300, x=50, width=40, height=60,
+                 duck_offset=30, duck_width=55, duck_height=30):
+        self.jump_force = jump_force
+        self.gravity = gravity
+        self.ground = ground
+        self.x = x
+        self.width = width
+        self.height = height
+        # Hitbox agachado (Dino.get_rect): más baja y más ancha
+        self.duck_offset = duck_offset
+        self.duck_width = duck_width
+        self.duck_height = duck_height
+        # Ticks en el aire: el aterrizaje es el primer k con y >= ground, es
+        # decir k >= -2 * jump_force / gravity - 1. Si esa cota es entera el
+        # redondeo del motor decide, así que se mira en las alturas exactas
+        landing = max(math.ceil(-2 * jump_force / gravity - 1 - EPSILON), 1)
+        heights = self._accumulate(landing + 1)
+        self.airtime = int(np.argmax(heights >= ground)) if (heights >= ground).any() else landing + 1
+
+    @classmethod
+    def from_dino(cls, dino):
+        """Modelo con la física y las hitboxes de dino (de pie y agachado)."""
+        probe = Dino(dino.x, dino.ground)
+        probe.jump_force = dino.jump_force
+        probe.gravity = dino.gravity
+        x, y, width, height = probe.hitbox()
+        probe.ducking = True
+        duck_x, duck_y, duck_width, duck_height = probe.hitbox()
+        return cls(dino.jump_force, dino.gravity, dino.ground, x, width, height,
+                   duck_y - y, duck_width, duck_height)
+
+    def offset(self, k):
+        """y - ground en la fase k del salto (0 en el suelo, negativo en el aire)."""
+        k = np.asarray(k, dtype=np.float64)
+        value = k * self.jump_force + self.gravity * k * (k + 1) / 2
+        return np.where((k >= 1) & (k <= self.airtime), value, 0.0)
+
+    def height_at(self, k):
+        """y del dinosaurio k ticks después de despegar."""
+        return self.ground + self.offset(k)
+
+    def heights(self):
+        """y en cada fase del aire (1 .. airtime), idénticas bit a bit a Dino.update."""
+        return self._accumulate(self.airtime)
+
+    def _accumulate(self, count):
+        """y de las fases 1 .. count sumando tick a tick como el motor."""
+        # Mismo orden de sumas: vel += gravity, luego y += vel
+        steps = np.full(count + 1, self.gravity)
+        steps[0] = self.jump_force
+        velocities = np.cumsum(steps)[1:]
+        return np.cumsum(np.concatenate(([float(self.ground)], velocities)))[1:]
+
+    def _roots(self, level):
+        """Raíces de offset(k) = level como arreglos (r1, r2); NaN si no hay."""
+        a = self.gravity / 2
+        b = self.jump_force + self.gravity / 2
+        disc = b * b + 4 * a * np.asarray(level, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            root = np.sqrt(disc)
+        return (-b - root) / (2 * a), (-b + root) / (2 * a)
+
+    def phases_over(self, top):
+        """Fases [lo, hi] en que el borde inferior del dinosaurio está por encima de top.
+
+        lo > hi si nunca sube tanto.
+        """
+        r1, r2 = self._roots(np.asarray(top, dtype=np.float64) - self.ground - self.height - EPSILON)
+        empty = np.isnan(r1)
+        lo = np.where(empty, 1, np.maximum(np.ceil(r1), 1)).astype(np.int64)
+        hi = np.where(empty, 0, np.minimum(np.floor(r2), self.airtime)).astype(np.int64)
+        return lo, hi
+
+    def phases_under(self, bottom):
+        """(a, b): en las fases 1..a y b..airtime el borde superior queda por debajo de bottom."""
+        r1, r2 = self._roots(np.asarray(bottom, dtype=np.float64) - self.ground + EPSILON)
+        # Sin raíces el salto nunca llega a bottom: todo el aire pasa por debajo
+        below = np.isnan(r1)
+        last = self.airtime
+        a = np.where(below, last, np.clip(np.floor(r1), 0, last)).astype(np.int64)
+        b = np.where(below, last + 1, np.clip(np.ceil(r2), 1, last + 1)).astype(np.int64)
+        return a, b
+
+    def overlap_ticks(self, x, width, speed, ducking=False):
+        """Primera y última tick en que el obstáculo se solapa en x con el dinosaurio.
+
+        x es la posición actual; el obstáculo avanza speed píxeles por tick.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        speed = np.asarray(speed, dtype=np.float64)
+        dino_width = self.duck_width if ducking else self.width
+        # x - t * speed < dino_x + dino_width  y  x - t * speed + width > dino_x
+        first = np.floor((x - self.x - dino_width) / speed).astype(np.int64) + 1
+        last = np.ceil((x + width - self.x) / speed).astype(np.int64) - 1
+        return np.maximum(first, 1), last
+
+    def safe_windows(self, x, y, width, height, speed):
+        """Análisis de muchos obstáculos a la vez; cada valor es un arreglo.
+
+        first, last: ticks de solape en x con el dinosaurio de pie o saltando.
+        stand_safe, duck_safe: si pasa sin saltar, de pie o agachado.
+        earliest, latest: ticks de despegue con las que lo salta por encima
+        (earliest > latest si no se puede); despegar fuera de esa ventana
+        puede seguir siendo seguro pasando por debajo, ver clears().
+        """
+        y = np.asarray(y, dtype=np.float64)
+        bottom = y + height
+        first, last = self.overlap_ticks(x, width, speed)
+        duck_first, duck_last = self.overlap_ticks(x, width, speed, ducking=True)
+        stand_safe = (bottom <= self.ground) | (y >= self.ground + self.height)
+        duck_top = self.ground + self.duck_offset
+        duck_safe = (bottom <= duck_top) | (y >= duck_top + self.duck_height)
+        lo, hi = self.phases_over(y)
+        # Todas las fases first - t + 1 .. last - t + 1 dentro de [lo, hi]
+        earliest = last + 1 - hi
+        latest = first + 1 - lo
+        empty = lo > hi
+        return {
+            'first': first, 'last': last,
+            'duck_first': duck_first, 'duck_last': duck_last,
+            'stand_safe': stand_safe, 'duck_safe': duck_safe,
+            'earliest': np.where(empty, 1, earliest), 'latest': np.where(empty, 0, latest),
+        }
+
+    def clears(self, takeoff, x, y, width, height, speed):
+        """Si un salto con despegue en la tick takeoff supera el obstáculo.
+
+        Cuenta las tres formas de no chocar en el aire (por encima, o por
+        debajo al despegar y al aterrizar) y, antes y después del salto, que
+        el dinosaurio pueda esperar en el suelo de pie o agachado.
+        """
+        takeoff = np.asarray(takeoff, dtype=np.int64)
+        y = np.asarray(y, dtype=np.float64)
+        bottom = y + height
+        first, last = self.overlap_ticks(x, width, speed)
+        # Fases del salto durante el solape (<= 0 antes de despegar, > airtime después)
+        start = first - takeoff + 1
+        end = last - takeoff + 1
+
+        stand_safe = (bottom <= self.ground) | (y >= self.ground + self.height)
+        duck_top = self.ground + self.duck_offset
+        duck_safe = (bottom <= duck_top) | (y >= duck_top + self.duck_height)
+        ground_safe = stand_safe | duck_safe
+        lo, hi = self.phases_over(y)
+        a, b = self.phases_under(bottom)
+
+        def hits(first_phase, last_phase):
+            return (np.maximum(start, first_phase) <= np.minimum(end, last_phase)) & \
+                   (first_phase <= last_phase)
+
+        # Fases inseguras en el aire: entre las de debajo (a + 1 .. b - 1),
+        # salvo las de encima (lo .. hi)
+        over = lo <= hi
+        unsafe = (hits(a + 1, np.where(over, np.minimum(lo - 1, b - 1), b - 1)) |
+                  hits(np.where(over, np.maximum(hi + 1, a + 1), b), b - 1))
+        # En el suelo, antes o después del salto
+        unsafe |= ~ground_safe & ((start <= 0) | (end > self.airtime))
+        # Sin solape (ya pasó) no hay nada que superar
+        return ~unsafe | (end < start)
+
+
+class LookaheadOracle:
+    """Política que decide con clears() en lugar de simular frames.
+
+    En cada tick mira los obstáculos que se solapan con el dinosaurio antes
+    de horizon ticks. Si alguno solo se supera saltando, salta en el último
+    tick en que despegar los supera a todos; a los que se esquivan
+    agachado les responde agachándose (también en el aire, para aterrizar
+    ya agachado).
+    """
+
+    def __init__(self, trajectory, horizon=None):
+        self.trajectory = trajectory
+        self.horizon = horizon or trajectory.airtime + 2
+        self.takeoffs = np.arange(1, self.horizon + 1)[:, None]
+
+    def action(self, game):
+        dino = game.dino
+        # Descarte barato antes de usar NumPy: nada al alcance en horizon ticks
+        # al que haya que responder (los que pasan por encima de pie no cuentan)
+        reach = dino.x + dino.width + game.speed * self.horizon
+        ahead = [(obs.x, obs.y, obs.width, obs.height, obs.speed) for obs in game.obstacles
+                 if not obs.destroyed and obs.x + obs.width > dino.x and obs.x < reach]
+        top = self.trajectory.ground
+        bottom = top + self.trajectory.height
+        if not any(y + height > top and y < bottom for _, y, _, height, _ in ahead):
+            return ACTION_NONE
+        x, y, width, height, speed = np.array(ahead, dtype=np.float64).T
+        windows = self.trajectory.safe_windows(x, y, width, height, speed)
+        near = windows['first'] <= self.horizon
+        danger = near & ~windows['stand_safe']
+        duck = ACTION_DUCK if (danger & windows['duck_safe'] & (windows['duck_first'] <= 1) &
+                               (windows['duck_last'] >= 1)).any() else ACTION_NONE
+        must_jump = danger & ~windows['duck_safe']
+        if dino.jumping or not must_jump.any():
+            return duck
+
+        clear = self.trajectory.clears(self.takeoffs, x[near], y[near], width[near],
+                                       height[near], speed[near]).all(axis=1)
+        if clear[0] and not clear[1]:
+            return ACTION_JUMP # Último tick de la ventana
+        if not clear.any():
+            # Ningún salto lo supera todo: al menos el próximo que obliga a saltar
+            nearest = np.flatnonzero(must_jump)[np.argmin(windows['first'][must_jump])]
+            if windows['latest'][nearest] <= 1:
+                return ACTION_JUMP
+        return duck